@@ -0,0 +1,166 @@
+"""Fleet-size benchmark: Home Assistant's state tracker vs. the shared dispatcher.
+
+Both sides are the real code, run on a real ``HomeAssistant`` instance:
+
+- ``per_entity``: one ``async_track_state_change_event`` per plug, as the
+  sensors used before ``Zen15EventDispatcher``. Home Assistant already
+  routes these through a single keyed ``state_changed`` listener, so the
+  per-event cost is one dict lookup here too.
+- ``shared``: one ``Zen15EventDispatcher`` with a source per plug.
+
+A ``baseline`` run with no subscriptions gives the cost of the state
+machine itself. The script prints, per fleet size, the setup time and
+the cost per state change above that baseline; it makes no claim about
+which side wins. It needs Home Assistant (2024.12 or newer) installed::
+
+    python benchmarks/bench_dispatcher.py
+    python benchmarks/bench_dispatcher.py --sizes 10 100 1000 --events 200000
+
+A share of the state changes (``--plug-share``) belongs to the plugs and
+the rest to unrelated entities, as in a real instance.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.zen15_cleaner.dispatcher import (  # noqa: E402
+    Zen15EventDispatcher,
+)
+
+Unsubscribe = Callable[[], None]
+Subscribe = Callable[[HomeAssistant, Sequence[str], Callable], Unsubscribe]
+
+
+def _baseline(hass: HomeAssistant, plugs: Sequence[str], handler) -> Unsubscribe:
+    return lambda: None
+
+
+def _per_entity(hass: HomeAssistant, plugs: Sequence[str], handler) -> Unsubscribe:
+    @callback
+    def _on_event(event) -> None:
+        handler(event.data["new_state"])
+
+    unsubs = [
+        async_track_state_change_event(hass, [entity_id], _on_event)
+        for entity_id in plugs
+    ]
+
+    def _unsub() -> None:
+        for unsub in unsubs:
+            unsub()
+
+    return _unsub
+
+
+def _shared(hass: HomeAssistant, plugs: Sequence[str], handler) -> Unsubscribe:
+    dispatcher = Zen15EventDispatcher(hass)
+    dispatcher.async_start()
+    for entity_id in plugs:
+        dispatcher.async_add_source(entity_id, handler)
+    return dispatcher.async_stop
+
+
+STRATEGIES: Tuple[Tuple[str, Subscribe], ...] = (
+    ("baseline", _baseline),
+    ("per_entity", _per_entity),
+    ("shared", _shared),
+)
+
+
+def _event_stream(
+    plugs: Sequence[str], events: int, plug_share: float, seed: int
+) -> List[str]:
+    rng = random.Random(seed)
+    others = [f"sensor.other_{i}" for i in range(2000)]
+    return [
+        rng.choice(plugs if rng.random() < plug_share else others)
+        for _ in range(events)
+    ]
+
+
+async def run(
+    hass: HomeAssistant, size: int, events: int, plug_share: float, seed: int
+) -> Dict[str, float]:
+    """Setup time (ms), µs per state change and handler calls per strategy."""
+    plugs = [f"sensor.zen15_{i}_electric_consumption_kwh" for i in range(size)]
+    stream = _event_stream(plugs, events, plug_share, seed)
+    async_set = hass.states.async_set
+    out: Dict[str, float] = {}
+    value = 0
+    for name, subscribe in STRATEGIES:
+        calls = 0
+
+        @callback
+        def handler(_new_state) -> None:
+            nonlocal calls
+            calls += 1
+
+        start = time.perf_counter()
+        unsub = subscribe(hass, plugs, handler)
+        out[f"{name}_setup_ms"] = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        for entity_id in stream:
+            # Every value is new, so every call fires state_changed
+            value += 1
+            async_set(entity_id, str(value))
+        out[f"{name}_us"] = (time.perf_counter() - start) * 1e6 / events
+        out[f"{name}_calls"] = calls
+        unsub()
+        await hass.async_block_till_done()
+
+    if out["per_entity_calls"] != out["shared_calls"]:
+        raise RuntimeError("strategies routed a different number of events")
+    return out
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        print(
+            f"{'plugs':>6} {'state machine µs/ev':>20} "
+            f"{'per-entity +µs/ev':>18} {'shared +µs/ev':>14} "
+            f"{'per-entity setup ms':>20} {'shared setup ms':>16}"
+        )
+        for size in args.sizes:
+            res = await run(hass, size, args.events, args.plug_share, args.seed)
+            base = res["baseline_us"]
+            print(
+                f"{size:>6} {base:>20.3f} {res['per_entity_us'] - base:>18.3f} "
+                f"{res['shared_us'] - base:>14.3f} "
+                f"{res['per_entity_setup_ms']:>20.3f} {res['shared_setup_ms']:>16.3f}"
+            )
+        await hass.async_stop(force=True)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000]
+    )
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument(
+        "--plug-share",
+        type=float,
+        default=0.2,
+        help="share of state changes that come from the plugs (default 0.2)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(_main(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,25 +1,194 @@
 from __future__ import annotations
 
+import logging
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .aggregate import Zen15FleetAggregate
+from .checkpoint import Zen15CheckpointStore
+from .const import (
+    DOMAIN,
+    DATA_CHECKPOINT,
+    DATA_DISPATCHER,
+    DATA_DISCOVERY,
+    DATA_SENSORS,
+    DATA_HEALTH_SENSORS,
+    DATA_OPTIONS,
+    DATA_PERIOD_CLOCK,
+    DATA_FLEET,
+    DATA_STATS,
+    DATA_GLITCH,
+    STATS_SENSORS,
+)
+from .correlation import Zen15GlitchMonitor
+from .discovery import Zen15DiscoveryIndex
+from .dispatcher import Zen15EventDispatcher
+from .options import Zen15Options
+from .periods import Zen15PeriodClock
+from .stats import Zen15FleetStats
+from .services import async_setup_services
 
-from .const import DOMAIN
+_LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR, Platform.BUTTON]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register domain-level services once for all entries."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ZEN15/ZEN04 Cleaner from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {}
+
+    # One state_changed subscription for every plug in this entry
+    dispatcher = Zen15EventDispatcher(hass)
+    dispatcher.async_start()
+
+    # Discover every ZEN15/ZEN04 once; sensor, button and options flow share it
+    options = Zen15Options.from_entry(entry)
+    discovery = Zen15DiscoveryIndex(entry.entry_id)
+    discovery.async_build(hass)
+
+    # All devices' checkpoints come from a single file read
+    checkpoint = Zen15CheckpointStore(hass, entry.entry_id)
+    await checkpoint.async_load()
+    checkpoint.async_prune(discovery.records)
+
+    # Fleet totals are checkpointed together with the device totals
+    fleet = Zen15FleetAggregate(options.area_totals, checkpoint.get_fleet())
+    checkpoint.async_register_fleet(fleet)
+    areas = (
+        set(fleet.areas) | {rec.area_id for rec in discovery.sources if rec.area_id}
+        if options.area_totals
+        else set()
+    )
+    discovery.async_cleanup_stale(
+        hass,
+        entry,
+        options.periods,
+        areas,
+        STATS_SENSORS if options.instrumentation else (),
+    )
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        DATA_DISPATCHER: dispatcher,
+        DATA_DISCOVERY: discovery,
+        DATA_SENSORS: {},
+        DATA_HEALTH_SENSORS: set(),
+        DATA_CHECKPOINT: checkpoint,
+        DATA_OPTIONS: options,
+        DATA_FLEET: fleet,
+    }
+
+    # One correlated-glitch monitor shared by every plug of the entry
+    glitch = Zen15GlitchMonitor()
+    _configure_glitch(glitch, options)
+
+    @callback
+    def _log_quarantine(timestamp: float, devices: int) -> None:
+        _LOGGER.warning(
+            "%s plugs jumped within %s s: holding readings for %s s",
+            devices,
+            glitch.window_s,
+            glitch.quarantine_s,
+        )
+
+    glitch.on_quarantine = _log_quarantine
+    hass.data[DOMAIN][entry.entry_id][DATA_GLITCH] = glitch
+
+    # Instrumentation only exists when enabled; sensors check for it once
+    if options.instrumentation:
+        hass.data[DOMAIN][entry.entry_id][DATA_STATS] = Zen15FleetStats()
+
+    # Period counters share one rollover timer for the whole entry
+    if options.periods:
+        clock = Zen15PeriodClock(hass, options.periods)
+        clock.async_start()
+        entry.async_on_unload(clock.async_stop)
+        hass.data[DOMAIN][entry.entry_id][DATA_PERIOD_CLOCK] = clock
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Option changes are pushed into the running filters, no reload
+    # (except for the options that add or remove entities)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    # From here on, newly paired / removed plugs are handled incrementally
+    discovery.async_start(hass, entry)
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the devices whose effective settings changed."""
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data is None:
+        return
+
+    old: Zen15Options = entry_data[DATA_OPTIONS]
+    new = Zen15Options.from_entry(entry)
+    if new == old:
+        return
+    if (
+        new.periods != old.periods
+        or new.area_totals != old.area_totals
+        or new.instrumentation != old.instrumentation
+    ):
+        # These add / remove entities (or the hot-path wrappers): reload
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+    entry_data[DATA_OPTIONS] = new
+    _configure_glitch(entry_data[DATA_GLITCH], new)
+
+    discovery = entry_data[DATA_DISCOVERY]
+    changed = 0
+    for device_id, sensor in entry_data[DATA_SENSORS].items():
+        rec = discovery.get(device_id)
+        model = rec.model if rec is not None else None
+        settings = new.for_device(device_id, model)
+        if settings == old.for_device(device_id, model):
+            continue
+        if sensor.async_apply_settings(settings):
+            changed += 1
+
+    _LOGGER.debug(
+        "Applied new options to %s of %s devices",
+        changed,
+        len(entry_data[DATA_SENSORS]),
+    )
+
+
+def _configure_glitch(glitch: Zen15GlitchMonitor, options: Zen15Options) -> None:
+    glitch.configure(
+        options.glitch_detection,
+        options.glitch_min_devices,
+        options.glitch_window_s,
+        options.glitch_quarantine_s,
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id, None) or {}
+        dispatcher = entry_data.get(DATA_DISPATCHER)
+        if dispatcher is not None:
+            dispatcher.async_stop()
+        checkpoint = entry_data.get(DATA_CHECKPOINT)
+        if checkpoint is not None:
+            await checkpoint.async_flush()
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the entry's checkpoint file."""
+    await Zen15CheckpointStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Protocol
+
+from homeassistant.core import callback
+
+
+class Zen15AggregateListener(Protocol):
+    """What the aggregate needs from a total sensor."""
+
+    def async_total_changed(self, total: float) -> None: ...
+
+
+class Zen15FleetAggregate:
+    """Accepted energy of the whole fleet (and per area), kept incrementally.
+
+    Every filtered sensor hands over the growth of its virtual total as it
+    happens, so one reading costs a couple of additions, whatever the number
+    of plugs. The totals only ever count up: ``reset_filtered`` or removing
+    a plug does not take back energy that was already used. The totals are
+    checkpointed in the same file and write as the device totals, so after a
+    restart both always come from the same moment.
+    """
+
+    def __init__(self, per_area: bool, saved: Dict[str, Any] | None = None) -> None:
+        saved = saved or {}
+        self.per_area = per_area
+        self.total = float(saved.get("total", 0.0))
+        self.areas: Dict[str, float] = {
+            area_id: float(kwh) for area_id, kwh in saved.get("areas", {}).items()
+        }
+        self._listeners: Dict[str | None, Zen15AggregateListener] = {}
+        self._on_new_area: Callable[[str], None] | None = None
+
+    @callback
+    def async_add(self, area_id: str | None, kwh: float) -> None:
+        """Count ``kwh`` of accepted energy from a plug in ``area_id``."""
+        self.total += kwh
+        listener = self._listeners.get(None)
+        if listener is not None:
+            listener.async_total_changed(self.total)
+
+        if not (self.per_area and area_id):
+            return
+        if area_id not in self.areas:
+            self.areas[area_id] = 0.0
+            if self._on_new_area is not None:
+                self._on_new_area(area_id)
+        value = self.areas[area_id] = self.areas[area_id] + kwh
+        listener = self._listeners.get(area_id)
+        if listener is not None:
+            listener.async_total_changed(value)
+
+    def value(self, area_id: str | None) -> float:
+        """Fleet total (``None``) or the total of one area."""
+        if area_id is None:
+            return self.total
+        return self.areas.get(area_id, 0.0)
+
+    @callback
+    def async_listen(
+        self,
+        area_id: str | None,
+        listener: Zen15AggregateListener,
+    ) -> Callable[[], None]:
+        self._listeners[area_id] = listener
+
+        @callback
+        def _remove() -> None:
+            if self._listeners.get(area_id) is listener:
+                del self._listeners[area_id]
+
+        return _remove
+
+    @callback
+    def async_on_new_area(self, handler: Callable[[str], None] | None) -> None:
+        """Called the first time energy is counted for an area."""
+        self._on_new_area = handler
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Checkpoint / diagnostics form."""
+        return {"total": self.total, "areas": dict(self.areas)}
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, List
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_adjust_statistics,
+    async_import_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .engine import STATUS_HEALED, STATUS_RESET, STATUS_SPIKE, Zen15FilterState
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKFILL_SOURCE_STATES = "states"
+BACKFILL_SOURCE_STATISTICS = "statistics"
+
+# Raw history is read in windows of this size so memory stays bounded
+_CHUNK = timedelta(days=7)
+_HOUR = 3600.0
+
+
+@dataclass
+class BackfillJob:
+    """One filtered sensor to rebuild hourly statistics for."""
+
+    statistic_id: str          # our *_energy_filtered entity_id
+    raw_entity_id: str
+    filter: Zen15FilterState   # fresh state with the sensor's configuration
+    start: datetime
+    end: datetime
+    source: str = BACKFILL_SOURCE_STATES
+    adjust_existing: bool = True
+
+
+@dataclass
+class _HourlyAccumulator:
+    """Feeds readings through a fresh filter and closes hourly buckets."""
+
+    flt: Zen15FilterState
+    end_ts: float
+    hour_start: float | None = None
+    spikes: int = 0
+    resets: int = 0
+    heals: int = 0
+    rows: List[StatisticData] = field(default_factory=list)
+
+    def feed(self, raw: float, ts: float) -> None:
+        if ts >= self.end_ts:
+            return
+        hour = ts - (ts % _HOUR)
+        if self.hour_start is not None and hour > self.hour_start:
+            self._close_hour()
+        self.hour_start = hour
+
+        status = self.flt.feed(raw, ts).status
+        if status == STATUS_SPIKE:
+            self.spikes += 1
+        elif status == STATUS_RESET:
+            self.resets += 1
+        elif status == STATUS_HEALED:
+            self.heals += 1
+
+    def finish(self) -> List[StatisticData]:
+        # Only hours that ended before the requested end are complete
+        if self.hour_start is not None and self.hour_start + _HOUR <= self.end_ts:
+            self._close_hour()
+        self.hour_start = None
+        return self.rows
+
+    def _close_hour(self) -> None:
+        assert self.hour_start is not None
+        total = self.flt.virtual_total
+        self.rows.append(
+            StatisticData(
+                start=dt_util.utc_from_timestamp(self.hour_start),
+                state=total,
+                sum=total,
+            )
+        )
+
+
+def _feed_states_chunk(
+    hass: HomeAssistant,
+    acc: _HourlyAccumulator,
+    raw_entity_id: str,
+    chunk_start: datetime,
+    chunk_end: datetime,
+    first: bool,
+) -> None:
+    """Executor job: read one window of raw states and feed it."""
+    states = history.state_changes_during_period(
+        hass,
+        chunk_start,
+        chunk_end,
+        raw_entity_id,
+        no_attributes=True,
+        include_start_time_state=first,
+    ).get(raw_entity_id, [])
+
+    for state in states:
+        try:
+            raw = float(state.state)
+        except (TypeError, ValueError):
+            continue
+        acc.feed(raw, state.last_updated_timestamp)
+
+
+def _feed_statistics_chunk(
+    hass: HomeAssistant,
+    acc: _HourlyAccumulator,
+    raw_entity_id: str,
+    chunk_start: datetime,
+    chunk_end: datetime,
+    first: bool,
+) -> None:
+    """Executor job: read one window of the raw sensor's hourly statistics.
+
+    Long-term statistics survive the recorder purge, so this reaches back
+    further than states, at hourly resolution.
+    """
+    rows = statistics_during_period(
+        hass,
+        chunk_start,
+        chunk_end,
+        {raw_entity_id},
+        "hour",
+        None,
+        {"state"},
+    ).get(raw_entity_id, [])
+
+    for row in rows:
+        raw = row.get("state")
+        if raw is None:
+            continue
+        # The hourly "state" is the reading at the end of that hour
+        acc.feed(float(raw), float(row["start"]) + _HOUR - 1)
+
+
+async def async_run_backfill(hass: HomeAssistant, job: BackfillJob) -> dict[str, Any]:
+    """Stream the raw history through the filter and import hourly statistics."""
+    recorder = get_instance(hass)
+
+    start = dt_util.as_utc(job.start).replace(minute=0, second=0, microsecond=0)
+    end = dt_util.as_utc(job.end).replace(minute=0, second=0, microsecond=0)
+    if end <= start:
+        raise ValueError("backfill end must be at least one hour after start")
+
+    acc = _HourlyAccumulator(
+        flt=job.filter,
+        end_ts=end.timestamp(),
+    )
+    reader = (
+        _feed_statistics_chunk
+        if job.source == BACKFILL_SOURCE_STATISTICS
+        else _feed_states_chunk
+    )
+
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + _CHUNK, end)
+        await recorder.async_add_executor_job(
+            reader,
+            hass,
+            acc,
+            job.raw_entity_id,
+            chunk_start,
+            chunk_end,
+            chunk_start == start,
+        )
+        chunk_start = chunk_end
+
+    rows = acc.finish()
+    total = acc.flt.virtual_total
+
+    if rows:
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=None,
+            source="recorder",
+            statistic_id=job.statistic_id,
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        # One bulk import per device
+        async_import_statistics(hass, metadata, rows)
+
+        if job.adjust_existing and total:
+            # Statistics recorded after the backfill window continue on top
+            async_adjust_statistics(
+                hass,
+                job.statistic_id,
+                end,
+                total,
+                UnitOfEnergy.KILO_WATT_HOUR,
+            )
+
+    result = {
+        "statistic_id": job.statistic_id,
+        "hours": len(rows),
+        "backfilled_kwh": total,
+        "spikes": acc.spikes,
+        "resets": acc.resets,
+        "heals": acc.heals,
+    }
+    _LOGGER.info(
+        "Backfilled %s hourly statistics for %s (%.3f kWh)",
+        len(rows),
+        job.statistic_id,
+        total,
+    )
+    return result
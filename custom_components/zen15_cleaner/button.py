@@ -1,27 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
-
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
-from homeassistant.helpers import entity_registry as er, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN
-
-
-@dataclass
-class Zen15ResetTarget:
-    """Represents the reset button target (the filtered sensor) for a ZEN15/ZEN04."""
-
-    zooz_device_id: str           # original Zooz device.id (same as in sensor.py)
-    device_name: str | None
-    manufacturer: str | None
-    model: str | None
-    filtered_entity_id: str       # actual entity_id of the Energy Filtered sensor
+from .const import DOMAIN, DATA_DISCOVERY, DATA_SENSORS, SIGNAL_DEVICE_ADDED
+from .discovery import (
+    Zen15DeviceRecord,
+    Zen15DiscoveryIndex,
+    button_unique_id,
+)
 
 
 async def async_setup_entry(
@@ -31,62 +22,28 @@ async def async_setup_entry(
 ) -> None:
     """Set up reset buttons for ZEN15/ZEN04 Cleaner."""
 
-    entity_reg = er.async_get(hass)
-    device_reg = dr.async_get(hass)
-
-    targets: List[Zen15ResetTarget] = []
-
-    # Discover all Zooz ZEN15/ZEN04 devices
-    for device in device_reg.devices.values():
-        manufacturer = (device.manufacturer or "").strip()
-        model = (device.model or "").strip()
-
-        if manufacturer.lower() != "zooz":
-            continue
-        if "zen15" not in model.lower() and "zen04" not in model.lower():
-            continue
+    discovery: Zen15DiscoveryIndex = hass.data[DOMAIN][entry.entry_id][
+        DATA_DISCOVERY
+    ]
 
-        # Our filtered sensor unique_id in sensor.py:
-        #   unique_id = f"{device.id}_energy_filtered"
-        sensor_uid = f"{device.id}_energy_filtered"
+    # One button per device that gets a filtered sensor. Stale buttons were
+    # already removed by the discovery cleanup in __init__.
+    targets = discovery.sources
 
-        filtered_entity_id = entity_reg.async_get_entity_id(
-            "sensor",   # domain
-            DOMAIN,     # platform
-            sensor_uid, # unique_id
-        )
-        if not filtered_entity_id:
-            # Filtered sensor for this device not found (maybe not created yet)
-            continue
-
-        targets.append(
-            Zen15ResetTarget(
-                zooz_device_id=device.id,
-                device_name=device.name or device.name_by_user,
-                manufacturer=manufacturer,
-                model=model,
-                filtered_entity_id=filtered_entity_id,
-            )
+    # Hot-plug: newly paired plugs get their button without a reload
+    @callback
+    def _async_device_added(tgt: Zen15DeviceRecord) -> None:
+        async_add_entities(
+            [Zen15ResetButton(hass=hass, target=tgt, entry_id=entry.entry_id)]
         )
 
-    # Build the set of button unique_ids we actually expect
-    expected_button_uids = {
-        f"{entry.entry_id}_{t.zooz_device_id}_reset_energy_filtered"
-        for t in targets
-    }
-
-    # Clean up old / duplicate button entities from this integration
-    for ent in list(entity_reg.entities.values()):
-        if ent.platform != DOMAIN:
-            continue
-        if ent.config_entry_id != entry.entry_id:
-            continue
-        if ent.domain != "button":
-            continue
-
-        if ent.unique_id not in expected_button_uids:
-            # Stale / duplicate reset button – remove it
-            entity_reg.async_remove(ent.entity_id)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_DEVICE_ADDED.format(entry.entry_id),
+            _async_device_added,
+        )
+    )
 
     if not targets:
         return
@@ -113,34 +70,37 @@ class Zen15ResetButton(ButtonEntity):
     def __init__(
         self,
         hass: HomeAssistant,
-        target: Zen15ResetTarget,
+        target: Zen15DeviceRecord,
         entry_id: str,
     ) -> None:
         self.hass = hass
         self._target = target
+        self._entry_id = entry_id
 
-        base_name = target.device_name or target.filtered_entity_id.split(".")[-1]
+        base_name = target.device_name or target.device_id
         self._attr_name = f"{base_name} Reset Energy Filtered"
 
         # One button per Zooz device
-        self._attr_unique_id = (
-            f"{entry_id}_{target.zooz_device_id}_reset_energy_filtered"
-        )
+        self._attr_unique_id = button_unique_id(entry_id, target.device_id)
 
         # IMPORTANT: identifiers match sensor.py: (DOMAIN, zooz_device_id)
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, target.zooz_device_id)},
+            identifiers={(DOMAIN, target.device_id)},
             manufacturer=target.manufacturer,
             model=target.model,
             name=target.device_name,
         )
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._target.button_entity_id = self.entity_id
+
     async def async_press(self) -> None:
         """Handle the button press."""
-        # Call our integration's entity service for this filtered sensor
-        await self.hass.services.async_call(
-            DOMAIN,
-            "reset_filtered",
-            {"entity_id": self._target.filtered_entity_id},
-            blocking=True,
-        )
+        # Straight to the live sensor: no service-bus round trip
+        entry_data = self.hass.data[DOMAIN].get(self._entry_id)
+        if entry_data is None:
+            return
+        sensor = entry_data[DATA_SENSORS].get(self._target.device_id)
+        if sensor is not None:
+            sensor.async_apply_reset()
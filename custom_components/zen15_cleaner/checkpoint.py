@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .aggregate import Zen15FleetAggregate
+from .const import DOMAIN
+from .engine import Zen15FilterState
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # seconds; at most one write per window for the whole entry
+
+
+class Zen15CheckpointStore:
+    """One compact checkpoint file per config entry.
+
+    Holds ``[virtual_total, last_raw_value, baseline_timestamp]`` per device,
+    plus the learned quantile estimator for devices in adaptive mode, and
+    the fleet / area totals.
+    It is loaded once at setup for every device. Live filter states are
+    registered here, and a save pulls their current values, so the per-event
+    cost is a single flag check. Saves are batched: the first change after a
+    save schedules one write ``SAVE_DELAY`` seconds later, and further
+    changes ride along with it.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[Dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.checkpoint"
+        )
+        self._saved: Dict[str, List[Any]] = {}
+        self._live: Dict[str, Zen15FilterState] = {}
+        self._fleet_saved: Dict[str, Any] = {}
+        self._fleet: Zen15FleetAggregate | None = None
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self._saved = dict(data.get("devices", {}))
+        self._fleet_saved = dict(data.get("fleet", {}))
+
+    @callback
+    def get_fleet(self) -> Dict[str, Any]:
+        """Last checkpointed fleet / area totals."""
+        return self._fleet_saved
+
+    @callback
+    def get(self, device_id: str) -> List[Any] | None:
+        """Last checkpoint ``[total, last_raw, timestamp, (learned)]`` for a device."""
+        return self._saved.get(device_id)
+
+    @callback
+    def async_prune(self, keep: Iterable[str]) -> None:
+        """Forget devices that are no longer discovered."""
+        keep = set(keep)
+        stale = [dev for dev in self._saved if dev not in keep]
+        for dev in stale:
+            del self._saved[dev]
+        if stale:
+            self.async_schedule_save()
+
+    # ---------------------------------------------------------
+    # LIVE STATES
+    # ---------------------------------------------------------
+
+    @callback
+    def async_register(self, device_id: str, flt: Zen15FilterState) -> None:
+        self._live[device_id] = flt
+
+    @callback
+    def async_unregister(self, device_id: str) -> None:
+        flt = self._live.pop(device_id, None)
+        if flt is not None:
+            # Keep its last values in the file after the entity goes away
+            self._saved[device_id] = _snapshot(flt)
+            self.async_schedule_save()
+
+    @callback
+    def async_register_fleet(self, fleet: Zen15FleetAggregate) -> None:
+        self._fleet = fleet
+
+    @callback
+    def async_schedule_save(self) -> None:
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write immediately (entry unload)."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        self._save_pending = False
+        for device_id, flt in self._live.items():
+            self._saved[device_id] = _snapshot(flt)
+        if self._fleet is not None:
+            self._fleet_saved = self._fleet.as_dict()
+        return {"devices": self._saved, "fleet": self._fleet_saved}
+
+
+def _snapshot(flt: Zen15FilterState) -> List[Any]:
+    snap = [flt.virtual_total, flt.last_raw_value, flt.baseline_timestamp]
+    learned = flt.learned_state()
+    if learned is not None:
+        snap.append(learned)
+    return snap
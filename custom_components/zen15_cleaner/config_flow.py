@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import area_registry as ar, config_validation as cv
 
 from .const import (
     DOMAIN,
@@ -17,18 +17,38 @@ from .const import (
     DEFAULT_FORWARD_THRESHOLD_KWH,
     DEFAULT_BACKWARD_THRESHOLD_KWH,
     DEFAULT_REJECT_RUN_LIMIT,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_WRITE_DEADBAND_KWH,
+    CONF_FILTER_MODE,
+    CONF_HAMPEL_WINDOW,
+    CONF_HAMPEL_K,
+    CONF_HAMPEL_MIN_KWH,
+    CONF_ADAPTIVE_QUANTILE,
+    CONF_ADAPTIVE_MARGIN,
+    CONF_ADAPTIVE_FLOOR_KWH,
+    CONF_POWER_CHECK,
+    CONF_POWER_TOLERANCE,
+    CONF_ENERGY_RESOLUTION_KWH,
+    CONF_POWER_CROSSCHECK,
+    CONF_CROSSCHECK_TOLERANCE,
+    CONF_CROSSCHECK_SLACK_KWH,
+    CONF_PERIOD_COUNTERS,
+    PERIOD_HOURLY,
+    PERIOD_DAILY,
+    PERIOD_MONTHLY,
+    CONF_AREA_TOTALS,
+    CONF_INSTRUMENTATION,
+    CONF_GLITCH_DETECTION,
+    CONF_GLITCH_MIN_DEVICES,
+    CONF_GLITCH_WINDOW_S,
+    CONF_GLITCH_QUARANTINE_S,
 )
+from .discovery import Zen15DeviceRecord, async_get_discovery
+from .engine import FILTER_MODES
+from .options import Zen15Options, prune_overrides
 
-def _is_zen15_device(device: dr.DeviceEntry) -> bool:
-    """Return True if this device looks like a Zooz ZEN15 or ZEN04."""
-    manufacturer = (device.manufacturer or "").strip().lower()
-    model = (device.model or "").strip().lower()
-    return manufacturer == "zooz" and ("zen15" in model or "zen04" in model)
+PAGE_SIZE = 25  # devices per page in the per-device threshold editor
 
-def _zen15_label(device: dr.DeviceEntry) -> str:
-    """Human-readable label for options form."""
-    base = device.name_by_user or device.name or "Zooz Device"
-    return f"{base} ({device.id})"
 
 class Zen15CleanerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for ZEN15/ZEN04 Cleaner."""
@@ -88,99 +108,359 @@ class Zen15CleanerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 
 class Zen15CleanerOptionsFlowHandler(config_entries.OptionsFlow):
-    """Handle options for ZEN15/ZEN04 Cleaner."""
+    """Handle options for ZEN15/ZEN04 Cleaner.
+
+    Multi-step so it stays usable with hundreds of plugs: a menu leads to
+    the global settings or to a filtered, paged device list where one
+    threshold can be applied to a selection (or to every match) at once.
+    Nothing is saved until "Save", and only overrides that differ from the
+    global forward threshold are stored.
+    """
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         super().__init__()
         self._config_entry = config_entry
 
-    async def async_step_init(self, user_input=None):
-        errors: Dict[str, str] = {}
-        entry = self._config_entry
-        hass: HomeAssistant = self.hass  # type: ignore[assignment]
+        opts = Zen15Options.from_entry(config_entry)
+        self._globals: Dict[str, Any] = {
+            CONF_FORWARD_THRESHOLD_KWH: opts.forward_threshold_kwh,
+            CONF_BACKWARD_THRESHOLD_KWH: opts.backward_threshold_kwh,
+            CONF_REJECT_RUN_LIMIT: opts.reject_run_limit,
+            CONF_MIN_WRITE_INTERVAL: opts.min_write_interval,
+            CONF_WRITE_DEADBAND_KWH: opts.write_deadband_kwh,
+            CONF_FILTER_MODE: opts.filter_mode,
+            CONF_HAMPEL_WINDOW: opts.hampel_window,
+            CONF_HAMPEL_K: opts.hampel_k,
+            CONF_HAMPEL_MIN_KWH: opts.hampel_min_kwh,
+            CONF_ADAPTIVE_QUANTILE: opts.adaptive_quantile,
+            CONF_ADAPTIVE_MARGIN: opts.adaptive_margin,
+            CONF_ADAPTIVE_FLOOR_KWH: opts.adaptive_floor_kwh,
+            CONF_POWER_CHECK: opts.power_check,
+            CONF_POWER_TOLERANCE: opts.power_tolerance,
+            CONF_ENERGY_RESOLUTION_KWH: opts.energy_resolution_kwh,
+            CONF_POWER_CROSSCHECK: opts.power_crosscheck,
+            CONF_CROSSCHECK_TOLERANCE: opts.crosscheck_tolerance,
+            CONF_CROSSCHECK_SLACK_KWH: opts.crosscheck_slack_kwh,
+            CONF_PERIOD_COUNTERS: list(opts.periods),
+            CONF_AREA_TOTALS: opts.area_totals,
+            CONF_INSTRUMENTATION: opts.instrumentation,
+            CONF_GLITCH_DETECTION: opts.glitch_detection,
+            CONF_GLITCH_MIN_DEVICES: opts.glitch_min_devices,
+            CONF_GLITCH_WINDOW_S: opts.glitch_window_s,
+            CONF_GLITCH_QUARANTINE_S: opts.glitch_quarantine_s,
+        }
+        self._overrides: Dict[str, float] = dict(opts.per_device_forward)
 
-        # ----- Current values / defaults -----
-        forward_default = entry.options.get(
-            CONF_FORWARD_THRESHOLD_KWH,
-            entry.data.get(CONF_FORWARD_THRESHOLD_KWH, DEFAULT_FORWARD_THRESHOLD_KWH),
-        )
-        backward_default = entry.options.get(
-            CONF_BACKWARD_THRESHOLD_KWH,
-            entry.data.get(CONF_BACKWARD_THRESHOLD_KWH, DEFAULT_BACKWARD_THRESHOLD_KWH),
-        )
-        reject_default = entry.options.get(
-            CONF_REJECT_RUN_LIMIT,
-            entry.data.get(CONF_REJECT_RUN_LIMIT, DEFAULT_REJECT_RUN_LIMIT),
-        )
+        # Device list state
+        self._search = ""
+        self._area = ""
+        self._overridden_only = False
+        self._matches: List[Zen15DeviceRecord] = []
+        self._page = 0
 
-        per_device_existing: Dict[str, float] = entry.options.get(
-            CONF_PER_DEVICE_THRESHOLDS,
-            entry.data.get(CONF_PER_DEVICE_THRESHOLDS, {}),
+    async def async_step_init(self, user_input=None):
+        return self.async_show_menu(
+            step_id="init",
+            menu_options={
+                "globals": "Global settings",
+                "devices": f"Per-device thresholds ({len(self._overrides)} overrides)",
+                "save": "Save",
+            },
         )
 
-        # Discover current ZEN15/ZEN04 devices so we can build per-device fields
-        device_reg = dr.async_get(hass)
-        zen15_devices: List[dr.DeviceEntry] = [
-            dev for dev in device_reg.devices.values() if _is_zen15_device(dev)
-        ]
+    # ---------------------------------------------------------
+    # GLOBAL SETTINGS
+    # ---------------------------------------------------------
 
+    async def async_step_globals(self, user_input=None):
         if user_input is not None:
-            # ---- Build per-device overrides from submitted form ----
-            per_device_new: Dict[str, float] = {}
+            self._globals.update(user_input)
+            return await self.async_step_init()
 
-            for device in zen15_devices:
-                label = _zen15_label(device)
-                dev_id = device.id
-
-                if label in user_input:
-                    try:
-                        per_device_new[dev_id] = float(user_input[label])
-                    except (TypeError, ValueError):
-                        # If invalid, just keep previous value (if any)
-                        if dev_id in per_device_existing:
-                            per_device_new[dev_id] = per_device_existing[dev_id]
-
-            return self.async_create_entry(
-                title="",
-                data={
-                    CONF_FORWARD_THRESHOLD_KWH: user_input.get(
-                        CONF_FORWARD_THRESHOLD_KWH, forward_default
-                    ),
-                    CONF_BACKWARD_THRESHOLD_KWH: user_input.get(
-                        CONF_BACKWARD_THRESHOLD_KWH, backward_default
-                    ),
-                    CONF_REJECT_RUN_LIMIT: user_input.get(
-                        CONF_REJECT_RUN_LIMIT, reject_default
-                    ),
-                    CONF_PER_DEVICE_THRESHOLDS: per_device_new,
-                },
-            )
-
-        # ---- Build the dynamic schema (global + per-device fields) ----
+        current = self._globals
         fields: Dict[Any, Any] = {
             vol.Optional(
                 CONF_FORWARD_THRESHOLD_KWH,
-                default=forward_default,
+                default=current[CONF_FORWARD_THRESHOLD_KWH],
             ): vol.Coerce(float),
             vol.Optional(
                 CONF_BACKWARD_THRESHOLD_KWH,
-                default=backward_default,
+                default=current[CONF_BACKWARD_THRESHOLD_KWH],
             ): vol.Coerce(float),
             vol.Optional(
                 CONF_REJECT_RUN_LIMIT,
-                default=reject_default,
+                default=current[CONF_REJECT_RUN_LIMIT],
             ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+            vol.Optional(
+                CONF_MIN_WRITE_INTERVAL,
+                default=current[CONF_MIN_WRITE_INTERVAL],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+            vol.Optional(
+                CONF_WRITE_DEADBAND_KWH,
+                default=current[CONF_WRITE_DEADBAND_KWH],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_FILTER_MODE,
+                default=current[CONF_FILTER_MODE],
+            ): vol.In(FILTER_MODES),
+            vol.Optional(
+                CONF_HAMPEL_WINDOW,
+                default=current[CONF_HAMPEL_WINDOW],
+            ): vol.All(vol.Coerce(int), vol.Range(min=3, max=101)),
+            vol.Optional(
+                CONF_HAMPEL_K,
+                default=current[CONF_HAMPEL_K],
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+            vol.Optional(
+                CONF_HAMPEL_MIN_KWH,
+                default=current[CONF_HAMPEL_MIN_KWH],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_ADAPTIVE_QUANTILE,
+                default=current[CONF_ADAPTIVE_QUANTILE],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=0.999)),
+            vol.Optional(
+                CONF_ADAPTIVE_MARGIN,
+                default=current[CONF_ADAPTIVE_MARGIN],
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+            vol.Optional(
+                CONF_ADAPTIVE_FLOOR_KWH,
+                default=current[CONF_ADAPTIVE_FLOOR_KWH],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_POWER_CHECK,
+                default=current[CONF_POWER_CHECK],
+            ): bool,
+            vol.Optional(
+                CONF_POWER_TOLERANCE,
+                default=current[CONF_POWER_TOLERANCE],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+            vol.Optional(
+                CONF_ENERGY_RESOLUTION_KWH,
+                default=current[CONF_ENERGY_RESOLUTION_KWH],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_POWER_CROSSCHECK,
+                default=current[CONF_POWER_CROSSCHECK],
+            ): bool,
+            vol.Optional(
+                CONF_CROSSCHECK_TOLERANCE,
+                default=current[CONF_CROSSCHECK_TOLERANCE],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_CROSSCHECK_SLACK_KWH,
+                default=current[CONF_CROSSCHECK_SLACK_KWH],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_PERIOD_COUNTERS,
+                default=current[CONF_PERIOD_COUNTERS],
+            ): cv.multi_select(
+                {
+                    PERIOD_HOURLY: "Hourly",
+                    PERIOD_DAILY: "Daily",
+                    PERIOD_MONTHLY: "Monthly",
+                }
+            ),
+            vol.Optional(
+                CONF_AREA_TOTALS,
+                default=current[CONF_AREA_TOTALS],
+            ): bool,
+            vol.Optional(
+                CONF_INSTRUMENTATION,
+                default=current[CONF_INSTRUMENTATION],
+            ): bool,
+            vol.Optional(
+                CONF_GLITCH_DETECTION,
+                default=current[CONF_GLITCH_DETECTION],
+            ): bool,
+            vol.Optional(
+                CONF_GLITCH_MIN_DEVICES,
+                default=current[CONF_GLITCH_MIN_DEVICES],
+            ): vol.All(vol.Coerce(int), vol.Range(min=2, max=1000)),
+            vol.Optional(
+                CONF_GLITCH_WINDOW_S,
+                default=current[CONF_GLITCH_WINDOW_S],
+            ): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+            vol.Optional(
+                CONF_GLITCH_QUARANTINE_S,
+                default=current[CONF_GLITCH_QUARANTINE_S],
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
         }
+        return self.async_show_form(step_id="globals", data_schema=vol.Schema(fields))
 
-        for device in zen15_devices:
-            label = _zen15_label(device)
-            dev_id = device.id
-            default = per_device_existing.get(dev_id, forward_default)
+    # ---------------------------------------------------------
+    # PER-DEVICE THRESHOLDS
+    # ---------------------------------------------------------
 
-            fields[vol.Optional(label, default=default)] = vol.Coerce(float)
+    async def async_step_devices(self, user_input=None):
+        """Filter the device list by name and/or area."""
+        errors: Dict[str, str] = {}
+        hass: HomeAssistant = self.hass  # type: ignore[assignment]
+        records = async_get_discovery(hass, self._config_entry).records.values()
+        area_names = _area_names(hass, records)
+
+        if user_input is not None:
+            self._search = user_input.get("search", "").strip()
+            self._area = user_input.get("area", "")
+            self._overridden_only = user_input.get("overridden_only", False)
+            self._matches = self._filter_devices(records, area_names)
+            self._page = 0
+            if self._matches:
+                return await self.async_step_device_page()
+            errors["base"] = "no_matching_devices"
 
+        areas: Dict[str, str] = {"": "All areas"}
+        areas.update(sorted(area_names.items(), key=lambda item: item[1].casefold()))
+
+        fields: Dict[Any, Any] = {
+            vol.Optional("search", default=self._search): str,
+            vol.Optional(
+                "area", default=self._area if self._area in areas else ""
+            ): vol.In(areas),
+            vol.Optional("overridden_only", default=self._overridden_only): bool,
+        }
         return self.async_show_form(
-            step_id="init",
+            step_id="devices",
             data_schema=vol.Schema(fields),
             errors=errors,
         )
+
+    async def async_step_device_page(self, user_input=None):
+        """One page of matching devices; apply a threshold to a selection."""
+        errors: Dict[str, str] = {}
+        pages = max(1, -(-len(self._matches) // PAGE_SIZE))
+        page_devices = self._matches[
+            self._page * PAGE_SIZE : (self._page + 1) * PAGE_SIZE
+        ]
+
+        if user_input is not None:
+            if user_input.get("apply_to_all_matches"):
+                targets = [rec.device_id for rec in self._matches]
+            else:
+                visible = {rec.device_id for rec in page_devices}
+                targets = [d for d in user_input.get("selected", []) if d in visible]
+
+            value = user_input.get(CONF_FORWARD_THRESHOLD_KWH)
+            clear = user_input.get("clear_override", False)
+            if targets and (clear or value is not None):
+                self._apply_override(targets, None if clear else value)
+            elif targets:
+                errors["base"] = "no_threshold_given"
+
+            action = user_input.get("action", "stay")
+            if not errors:
+                if action == "menu":
+                    return await self.async_step_init()
+                if action == "next":
+                    self._page = min(self._page + 1, pages - 1)
+                elif action == "previous":
+                    self._page = max(self._page - 1, 0)
+                page_devices = self._matches[
+                    self._page * PAGE_SIZE : (self._page + 1) * PAGE_SIZE
+                ]
+
+        forward = float(self._globals[CONF_FORWARD_THRESHOLD_KWH])
+        choices: Dict[str, str] = {}
+        for rec in page_devices:
+            value = self._overrides.get(rec.device_id)
+            if value is None:
+                shown = f"default ({forward:g} kWh)"
+            else:
+                shown = f"{value:g} kWh"
+            choices[rec.device_id] = f"{rec.label}: {shown}"
+
+        actions = {
+            "stay": f"Apply and stay on page {self._page + 1}/{pages}",
+            "next": "Apply and go to next page",
+            "previous": "Apply and go to previous page",
+            "menu": "Apply and go back to the menu",
+        }
+        fields: Dict[Any, Any] = {
+            vol.Optional("selected", default=[]): cv.multi_select(choices),
+            vol.Optional("apply_to_all_matches", default=False): bool,
+            vol.Optional(CONF_FORWARD_THRESHOLD_KWH): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Optional("clear_override", default=False): bool,
+            vol.Optional("action", default="stay"): vol.In(actions),
+        }
+        return self.async_show_form(
+            step_id="device_page",
+            data_schema=vol.Schema(fields),
+            errors=errors,
+        )
+
+    # ---------------------------------------------------------
+    # SAVE
+    # ---------------------------------------------------------
+
+    async def async_step_save(self, user_input=None):
+        hass: HomeAssistant = self.hass  # type: ignore[assignment]
+        known = async_get_discovery(hass, self._config_entry).records
+
+        per_device = prune_overrides(
+            {d: v for d, v in self._overrides.items() if d in known},
+            self._globals[CONF_FORWARD_THRESHOLD_KWH],
+        )
+        return self.async_create_entry(
+            title="",
+            data={**self._globals, CONF_PER_DEVICE_THRESHOLDS: per_device},
+        )
+
+    # ---------------------------------------------------------
+    # HELPERS
+    # ---------------------------------------------------------
+
+    def _filter_devices(
+        self,
+        records: Iterable[Zen15DeviceRecord],
+        area_names: Dict[str, str],
+    ) -> List[Zen15DeviceRecord]:
+        needle = self._search.casefold()
+        matches = []
+        for rec in records:
+            if self._area and rec.area_id != self._area:
+                continue
+            if self._overridden_only and rec.device_id not in self._overrides:
+                continue
+            if needle:
+                haystack = " ".join(
+                    filter(
+                        None,
+                        (
+                            rec.label,
+                            rec.device_name,
+                            rec.raw_entity_id,
+                            area_names.get(rec.area_id or ""),
+                        ),
+                    )
+                ).casefold()
+                if needle not in haystack:
+                    continue
+            matches.append(rec)
+        matches.sort(key=lambda rec: rec.label.casefold())
+        return matches
+
+    def _apply_override(self, device_ids: Iterable[str], value: float | None) -> None:
+        """Set (or clear, with None) the forward threshold of several devices."""
+        forward = float(self._globals[CONF_FORWARD_THRESHOLD_KWH])
+        for dev_id in device_ids:
+            if value is None or float(value) == forward:
+                self._overrides.pop(dev_id, None)
+            else:
+                self._overrides[dev_id] = float(value)
+
+
+def _area_names(
+    hass: HomeAssistant,
+    records: Iterable[Zen15DeviceRecord],
+) -> Dict[str, str]:
+    """area_id -> name for the areas that actually hold a discovered plug."""
+    area_reg = ar.async_get(hass)
+    names: Dict[str, str] = {}
+    for rec in records:
+        if rec.area_id and rec.area_id not in names:
+            area = area_reg.async_get_area(rec.area_id)
+            if area is not None:
+                names[rec.area_id] = area.name
+    return names
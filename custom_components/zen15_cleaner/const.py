@@ -13,3 +13,112 @@ DEFAULT_BACKWARD_THRESHOLD_KWH = 0.0   # Currently informational; decreases alwa
 # Self-healing reject run limit
 CONF_REJECT_RUN_LIMIT = "reject_run_limit"
 DEFAULT_REJECT_RUN_LIMIT = 12  # 12 consecutive rejections before we "self-heal"
+
+# State write scheduling (coalescing + deadband)
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_WRITE_DEADBAND_KWH = "write_deadband_kwh"
+
+DEFAULT_MIN_WRITE_INTERVAL = 5.0      # Seconds between state writes per sensor
+DEFAULT_WRITE_DEADBAND_KWH = 0.0      # Min change in filtered kWh before we write
+
+# Filter mode (see engine.FILTER_MODES) and Hampel parameters
+CONF_FILTER_MODE = "filter_mode"
+CONF_HAMPEL_WINDOW = "hampel_window"
+CONF_HAMPEL_K = "hampel_k"
+CONF_HAMPEL_MIN_KWH = "hampel_min_kwh"
+
+DEFAULT_FILTER_MODE = "threshold"
+DEFAULT_HAMPEL_WINDOW = 15            # Recent accepted deltas the median/MAD is taken over
+DEFAULT_HAMPEL_K = 5.0                # Spike = delta above median + k * sigma
+DEFAULT_HAMPEL_MIN_KWH = 0.5          # Never judge a delta this small as a spike
+
+# Adaptive mode: forward threshold learned per device from its own deltas
+CONF_ADAPTIVE_QUANTILE = "adaptive_quantile"
+CONF_ADAPTIVE_MARGIN = "adaptive_margin"
+CONF_ADAPTIVE_FLOOR_KWH = "adaptive_floor_kwh"
+
+DEFAULT_ADAPTIVE_QUANTILE = 0.99      # Quantile of accepted increases that is learned
+DEFAULT_ADAPTIVE_MARGIN = 3.0         # Threshold = margin * learned quantile
+DEFAULT_ADAPTIVE_FLOOR_KWH = 0.5      # ... but never below this
+
+# Time-normalized plausibility (implied average power between readings)
+CONF_POWER_CHECK = "power_check"
+CONF_POWER_TOLERANCE = "power_tolerance"
+CONF_ENERGY_RESOLUTION_KWH = "energy_resolution_kwh"
+
+DEFAULT_POWER_CHECK = True
+DEFAULT_POWER_TOLERANCE = 0.25        # Allowed excess over the rated load (25 %)
+DEFAULT_ENERGY_RESOLUTION_KWH = 0.01  # One meter tick, always allowed
+
+# Rated maximum load per model (kW), matched against the lower-cased model
+MODEL_MAX_POWER_KW = {
+    "zen15": 1.8,   # 15 A @ 120 V
+    "zen04": 1.8,   # 15 A @ 120 V
+}
+
+# Cross-check kWh deltas against the device's integrated W sensor
+CONF_POWER_CROSSCHECK = "power_crosscheck"
+CONF_CROSSCHECK_TOLERANCE = "crosscheck_tolerance"
+CONF_CROSSCHECK_SLACK_KWH = "crosscheck_slack_kwh"
+
+DEFAULT_POWER_CROSSCHECK = False
+DEFAULT_CROSSCHECK_TOLERANCE = 0.5    # Clamp deltas 50 % above the integrated power...
+DEFAULT_CROSSCHECK_SLACK_KWH = 0.02   # ... plus this much
+
+# Built-in period counters (sibling entities), rolled over on local time
+CONF_PERIOD_COUNTERS = "period_counters"
+
+PERIOD_HOURLY = "hourly"
+PERIOD_DAILY = "daily"
+PERIOD_MONTHLY = "monthly"
+PERIODS = (PERIOD_HOURLY, PERIOD_DAILY, PERIOD_MONTHLY)
+
+DEFAULT_PERIOD_COUNTERS: list[str] = []
+
+# Fleet aggregate: one total for every plug, optionally one per area too
+CONF_AREA_TOTALS = "area_totals"
+DEFAULT_AREA_TOTALS = False
+
+# Hot-path instrumentation (counters, latency histograms, stats sensors)
+CONF_INSTRUMENTATION = "instrumentation"
+DEFAULT_INSTRUMENTATION = False
+
+STATS_SENSORS = ("event_rate", "callback_latency")
+
+# Fleet-wide correlated glitch detection and quarantine
+CONF_GLITCH_DETECTION = "glitch_detection"
+CONF_GLITCH_MIN_DEVICES = "glitch_min_devices"
+CONF_GLITCH_WINDOW_S = "glitch_window_s"
+CONF_GLITCH_QUARANTINE_S = "glitch_quarantine_s"
+
+DEFAULT_GLITCH_DETECTION = False
+DEFAULT_GLITCH_MIN_DEVICES = 5        # Devices jumping within the window...
+DEFAULT_GLITCH_WINDOW_S = 30.0        # ... of this many seconds
+DEFAULT_GLITCH_QUARANTINE_S = 120.0   # Hold readings this long afterwards
+
+# Keys inside hass.data[DOMAIN][entry_id]
+DATA_DISPATCHER = "dispatcher"
+DATA_DISCOVERY = "discovery"
+DATA_SENSORS = "sensors"          # device_id -> Zen15CleanedEnergySensor
+DATA_HEALTH_SENSORS = "health_sensors"  # Zen15HealthSensors to refresh
+DATA_CHECKPOINT = "checkpoint"
+DATA_OPTIONS = "options"          # Zen15Options currently applied
+DATA_PERIOD_CLOCK = "period_clock"  # Zen15PeriodClock (only with period counters)
+DATA_FLEET = "fleet"              # Zen15FleetAggregate
+DATA_STATS = "stats"              # Zen15FleetStats (only with instrumentation)
+DATA_GLITCH = "glitch"            # Zen15GlitchMonitor
+
+# Dispatcher signals for hot-plug discovery (formatted with entry_id / device_id)
+SIGNAL_DEVICE_ADDED = f"{DOMAIN}_device_added_{{}}"
+SIGNAL_DEVICE_REBOUND = f"{DOMAIN}_device_rebound_{{}}_{{}}"
+SIGNAL_POWER_ADDED = f"{DOMAIN}_power_added_{{}}"
+
+# Domain-level services
+SERVICE_TUNE_THRESHOLDS = "tune_thresholds"
+SERVICE_BULK_RESET = "bulk_reset"
+SERVICE_DUMP_STATS = "dump_stats"
+
+# What a reset does to the virtual total
+RESET_MODE_ZERO = "zero"      # start again from 0 kWh
+RESET_MODE_ALIGN = "align"    # take over the raw meter's current kWh value
+RESET_MODES = (RESET_MODE_ZERO, RESET_MODE_ALIGN)
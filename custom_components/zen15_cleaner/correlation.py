@@ -0,0 +1,225 @@
+"""Fleet-wide detection of correlated glitches.
+
+When the Z-Wave controller or Z-Wave JS restarts, many plugs report
+garbage at nearly the same moment. Each filter only sees its own plug, so
+a bad delta just under the spike limit is accepted everywhere at once.
+
+``Zen15GlitchMonitor`` (one per config entry) counts, over a short sliding
+window, how many *different* devices made a suspicious jump. Once enough
+did, the whole entry goes into quarantine. ``Zen15GlitchGate`` (one per
+device) holds every suspicious reading until the window has decided,
+holds everything during a quarantine, and afterwards confirms the held
+reading only if the meter really continued from it.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Tuple
+
+from .estimators import BucketedCounters
+
+DEFAULT_GLITCH_MIN_DEVICES = 5
+DEFAULT_GLITCH_WINDOW_S = 30.0
+DEFAULT_GLITCH_QUARANTINE_S = 120.0
+
+# A rise above this share of the configured forward threshold counts as a
+# jump. Not of the effective limit: with the power check that is about what
+# the rated load uses per report, which a heavy load reaches every time.
+GLITCH_SUSPECT_RATIO = 0.5
+GLITCH_BUCKETS = 6  # the window is kept in this many time buckets
+
+Sample = Tuple[float, float]  # (raw kWh, timestamp)
+
+
+class Zen15GlitchMonitor:
+    """Sliding count of devices that jumped, and the quarantine it triggers.
+
+    ``report`` is O(1): one dict lookup, one bucket add and a running sum.
+    The quarantine ends by itself once readings are past
+    ``quarantine_until``; no timer is involved.
+    """
+
+    __slots__ = (
+        "enabled",
+        "min_devices",
+        "window_s",
+        "quarantine_s",
+        "quarantine_until",
+        "quarantines",
+        "held",
+        "confirmed",
+        "dropped",
+        "released",
+        "on_quarantine",
+        "_window",
+        "_last_counted",
+    )
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.min_devices = DEFAULT_GLITCH_MIN_DEVICES
+        self.window_s = DEFAULT_GLITCH_WINDOW_S
+        self.quarantine_s = DEFAULT_GLITCH_QUARANTINE_S
+        self.quarantine_until = 0.0
+        self.quarantines = 0
+        self.held = 0        # readings held by a gate (one per hold)
+        self.confirmed = 0   # held after a quarantine, then confirmed
+        self.dropped = 0     # held after a quarantine, then dropped
+        self.released = 0    # held, but no quarantine followed: fed as they were
+        self.on_quarantine: Callable[[float, int], None] | None = None
+        self._window = BucketedCounters(
+            GLITCH_BUCKETS, self.window_s / GLITCH_BUCKETS, 1
+        )
+        self._last_counted: Dict[str, float] = {}
+
+    def configure(
+        self,
+        enabled: bool,
+        min_devices: int = DEFAULT_GLITCH_MIN_DEVICES,
+        window_s: float = DEFAULT_GLITCH_WINDOW_S,
+        quarantine_s: float = DEFAULT_GLITCH_QUARANTINE_S,
+    ) -> None:
+        self.enabled = bool(enabled)
+        self.min_devices = max(2, int(min_devices))
+        self.quarantine_s = max(0.0, float(quarantine_s))
+        window_s = max(1.0, float(window_s))
+        if window_s != self.window_s:
+            self.window_s = window_s
+            self._window = BucketedCounters(
+                GLITCH_BUCKETS, window_s / GLITCH_BUCKETS, 1
+            )
+            self._last_counted.clear()
+        if not self.enabled:
+            self.quarantine_until = 0.0
+
+    def quarantined(self, timestamp: float) -> bool:
+        return timestamp < self.quarantine_until
+
+    def report(self, device_id: str, timestamp: float) -> bool:
+        """Count one suspicious jump; True if the entry is now quarantined."""
+        # Each device counts at most once per window
+        last = self._last_counted.get(device_id)
+        if last is None or timestamp - last >= self.window_s:
+            self._last_counted[device_id] = timestamp
+            self._window.add(timestamp, 0)
+
+        if timestamp < self.quarantine_until:
+            return True
+        devices = self._window.totals(timestamp)[0]
+        if devices < self.min_devices:
+            return False
+
+        self.quarantine_until = timestamp + self.quarantine_s
+        self.quarantines += 1
+        if self.on_quarantine is not None:
+            self.on_quarantine(timestamp, int(devices))
+        return True
+
+    def forget(self, device_id: str) -> None:
+        self._last_counted.pop(device_id, None)
+
+    def as_dict(self) -> dict:
+        """Configuration and counters, for diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "min_devices": self.min_devices,
+            "window_s": self.window_s,
+            "quarantine_s": self.quarantine_s,
+            "quarantine_until": self.quarantine_until,
+            "quarantines": self.quarantines,
+            "held": self.held,
+            "confirmed": self.confirmed,
+            "dropped": self.dropped,
+            "released": self.released,
+        }
+
+
+class Zen15GlitchGate:
+    """One device's readings on their way to its filter.
+
+    A suspicious reading (a rise above ``GLITCH_SUSPECT_RATIO`` of the
+    forward threshold, or a drop) is reported to the monitor and held, and so is
+    every reading during a quarantine. Only the latest reading is kept:
+    for a counter it covers the ones before it. The first reading outside
+    a quarantine, once ``window_s`` has passed since the hold began,
+    settles the held one and is fed right after it:
+
+    - no quarantine overlapped the hold: it was an isolated event, and the
+      held reading is fed as it was, for the filter to judge;
+    - otherwise the held reading is confirmed only if the meter continued
+      from it (``last_raw <= held <= raw`` and ``raw - held`` within the
+      spike limit). A drop to 0 or a jump that came back is dropped.
+    """
+
+    __slots__ = ("monitor", "device_id", "held", "held_since")
+
+    def __init__(self, monitor: Zen15GlitchMonitor, device_id: str) -> None:
+        self.monitor = monitor
+        self.device_id = device_id
+        self.held: Sample | None = None
+        self.held_since = 0.0
+
+    def screen(
+        self,
+        raw: float,
+        timestamp: float,
+        last_raw: float | None,
+        threshold_kwh: float,
+        forward_kwh: float,
+        backward_kwh: float,
+    ) -> Tuple[Sample, ...]:
+        """Readings to feed now, in order; () while the reading is held.
+
+        ``last_raw`` is the filter's baseline, ``threshold_kwh`` its
+        configured forward threshold, ``forward_kwh`` the spike limit that
+        applied last and ``backward_kwh`` the drop it tolerates.
+        """
+        monitor = self.monitor
+        sample = (raw, timestamp)
+        if not monitor.enabled:
+            return self._release(sample)
+
+        held = self.held
+        if (
+            held is None
+            or monitor.quarantined(timestamp)
+            or timestamp - self.held_since < monitor.window_s
+        ):
+            suspicious = last_raw is not None and (
+                raw - last_raw > GLITCH_SUSPECT_RATIO * threshold_kwh
+                or last_raw - raw > backward_kwh
+            )
+            if suspicious:
+                monitor.report(self.device_id, timestamp)
+            if held is None and not (suspicious or monitor.quarantined(timestamp)):
+                return (sample,)
+            if held is None:
+                monitor.held += 1
+                self.held_since = timestamp
+            self.held = sample
+            return ()
+
+        # The window has decided; the new reading follows the held one
+        self.held = None
+        if monitor.quarantine_until <= self.held_since:
+            monitor.released += 1
+            return (held, sample)
+        if (
+            last_raw is not None
+            and last_raw <= held[0] <= raw
+            and raw - held[0] <= forward_kwh
+        ):
+            monitor.confirmed += 1
+            return (held, sample)
+        monitor.dropped += 1
+        return (sample,)
+
+    def _release(self, sample: Sample) -> Tuple[Sample, ...]:
+        held, self.held = self.held, None
+        if held is None:
+            return (sample,)
+        self.monitor.released += 1
+        return (held, sample)
+
+    def forget(self) -> None:
+        self.held = None
+        self.monitor.forget(self.device_id)
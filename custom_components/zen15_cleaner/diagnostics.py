@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN, DATA_DISCOVERY, DATA_FLEET, DATA_GLITCH, DATA_SENSORS
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+) -> dict[str, Any]:
+    """Options, discovery results and every device's filter state."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    discovery = entry_data[DATA_DISCOVERY]
+    sensors = entry_data[DATA_SENSORS]
+
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "discovery": {
+            device_id: {
+                "model": rec.model,
+                "raw_entity_id": rec.raw_entity_id,
+                "filtered_entity_id": rec.filtered_entity_id,
+                "button_entity_id": rec.button_entity_id,
+            }
+            for device_id, rec in discovery.records.items()
+        },
+        "devices": {
+            device_id: sensor.diagnostics() for device_id, sensor in sensors.items()
+        },
+        "fleet": entry_data[DATA_FLEET].as_dict(),
+        "glitch": entry_data[DATA_GLITCH].as_dict(),
+    }
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    device: dr.DeviceEntry,
+) -> dict[str, Any]:
+    """Filter state of the ZEN15/ZEN04 behind one of our devices."""
+    sensors = hass.data[DOMAIN][entry.entry_id][DATA_SENSORS]
+
+    # Our devices are identified by (DOMAIN, zooz_device_id)
+    for domain, zooz_device_id in device.identifiers:
+        if domain == DOMAIN and zooz_device_id in sensors:
+            return sensors[zooz_device_id].diagnostics()
+
+    return {}
@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import (
+    DOMAIN,
+    DATA_DISCOVERY,
+    PERIODS,
+    SIGNAL_DEVICE_ADDED,
+    SIGNAL_POWER_ADDED,
+    SIGNAL_DEVICE_REBOUND,
+)
+
+
+def is_zen15_device(device: dr.DeviceEntry) -> bool:
+    """Return True if this device looks like a Zooz ZEN15 or ZEN04."""
+    # Our own companion devices copy the Zooz manufacturer/model – skip them
+    if any(iden[0] == DOMAIN for iden in device.identifiers):
+        return False
+    manufacturer = (device.manufacturer or "").strip().lower()
+    model = (device.model or "").strip().lower()
+    return manufacturer == "zooz" and ("zen15" in model or "zen04" in model)
+
+
+def filtered_unique_id(device_id: str) -> str:
+    """Unique id of the filtered energy sensor for a Zooz device (stable forever)."""
+    return f"{device_id}_energy_filtered"
+
+
+def power_filtered_unique_id(device_id: str) -> str:
+    """Unique id of the filtered power sensor for a Zooz device."""
+    return f"{device_id}_power_filtered"
+
+
+def period_unique_id(device_id: str, period: str) -> str:
+    """Unique id of one period counter (hourly/daily/monthly) of a Zooz device."""
+    return f"{device_id}_energy_{period}"
+
+
+def fleet_unique_id(entry_id: str, area_id: str | None = None) -> str:
+    """Unique id of the fleet energy total, or of one area's total."""
+    if area_id is None:
+        return f"{entry_id}_fleet_energy"
+    return f"{entry_id}_fleet_energy_{area_id}"
+
+
+def stats_unique_id(entry_id: str, key: str) -> str:
+    """Unique id of one instrumentation sensor of a config entry."""
+    return f"{entry_id}_stats_{key}"
+
+
+def health_unique_id(device_id: str) -> str:
+    """Unique id of the filter health sensor of a Zooz device."""
+    return f"{device_id}_filter_health"
+
+
+def button_unique_id(entry_id: str, device_id: str) -> str:
+    """Unique id of the reset button for a Zooz device."""
+    return f"{entry_id}_{device_id}_reset_energy_filtered"
+
+
+@dataclass
+class Zen15DeviceRecord:
+    """Everything we know about one discovered ZEN15/ZEN04."""
+
+    device_id: str
+    device_name: str | None
+    name_by_user: str | None
+    manufacturer: str | None
+    model: str | None
+    area_id: str | None
+    raw_entity_id: str | None        # original Z-Wave kWh sensor (None = not found)
+    power_entity_id: str | None      # original Z-Wave W sensor (None = not found)
+    filtered_entity_id: str | None   # our *_energy_filtered sensor, once registered
+    button_entity_id: str | None     # our reset button, once registered
+    added: bool = False              # entities created or SIGNAL_DEVICE_ADDED sent
+
+    @property
+    def label(self) -> str:
+        """Human-readable label for forms."""
+        base = self.name_by_user or self.device_name or "Zooz Device"
+        return f"{base} ({self.device_id})"
+
+
+class Zen15DiscoveryIndex:
+    """Discovery results for one config entry, built once and shared.
+
+    ``sensor``, ``button`` and the options flow all read from this index
+    instead of each walking the whole device registry. Once started, it
+    follows device/entity registry events and updates only the affected
+    device, so pairing one plug never requires an entry reload.
+    """
+
+    def __init__(self, entry_id: str) -> None:
+        self.entry_id = entry_id
+        self.records: Dict[str, Zen15DeviceRecord] = {}
+        self._by_source: Dict[str, str] = {}  # raw/power entity_id -> device_id
+        self._hass: HomeAssistant | None = None
+
+    def get(self, device_id: str) -> Zen15DeviceRecord | None:
+        return self.records.get(device_id)
+
+    @property
+    def sources(self) -> List[Zen15DeviceRecord]:
+        """Devices that have a raw energy sensor to wrap."""
+        return [rec for rec in self.records.values() if rec.raw_entity_id]
+
+    # ---------------------------------------------------------
+    # BUILD
+    # ---------------------------------------------------------
+
+    @callback
+    def async_build(self, hass: HomeAssistant) -> None:
+        """Single pass over the device registry; per-device entity lookups."""
+        entity_reg = er.async_get(hass)
+        device_reg = dr.async_get(hass)
+
+        self.records.clear()
+        self._by_source.clear()
+        for device in device_reg.devices.values():
+            if not is_zen15_device(device):
+                continue
+            rec = self._async_record_for_device(hass, entity_reg, device)
+            # The platforms create entities for every source found here
+            rec.added = bool(rec.raw_entity_id)
+            self.records[device.id] = rec
+            self._index_sources(rec)
+
+    @callback
+    def _async_record_for_device(
+        self,
+        hass: HomeAssistant,
+        entity_reg: er.EntityRegistry,
+        device: dr.DeviceEntry,
+    ) -> Zen15DeviceRecord:
+        candidates: list[er.RegistryEntry] = []
+
+        # Collect ONLY non-integration sensors (the original ZEN15/ZEN04 energy sensors)
+        for ent in er.async_entries_for_device(
+            entity_reg,
+            device.id,
+            include_disabled_entities=False,
+        ):
+            if ent.domain != "sensor":
+                continue
+
+            # IMPORTANT: Prevent wrapping our own sensors → avoids infinite filter chains
+            if ent.platform == DOMAIN:
+                continue
+
+            candidates.append(ent)
+
+        return Zen15DeviceRecord(
+            device_id=device.id,
+            device_name=device.name or device.name_by_user,
+            name_by_user=device.name_by_user,
+            manufacturer=(device.manufacturer or "").strip(),
+            model=(device.model or "").strip(),
+            area_id=device.area_id,
+            raw_entity_id=_find_entity_for_device(
+                hass,
+                candidates,
+                _KWH_UNITS,
+                SensorDeviceClass.ENERGY,
+                SensorStateClass.TOTAL_INCREASING,
+            ),
+            power_entity_id=_find_entity_for_device(
+                hass,
+                candidates,
+                _POWER_UNITS,
+                SensorDeviceClass.POWER,
+                SensorStateClass.MEASUREMENT,
+            ),
+            filtered_entity_id=entity_reg.async_get_entity_id(
+                "sensor", DOMAIN, filtered_unique_id(device.id)
+            ),
+            button_entity_id=entity_reg.async_get_entity_id(
+                "button", DOMAIN, button_unique_id(self.entry_id, device.id)
+            ),
+        )
+
+    # ---------------------------------------------------------
+    # HOT-PLUG
+    # ---------------------------------------------------------
+
+    @callback
+    def async_start(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Follow registry events until the entry unloads."""
+        self._hass = hass
+        entry.async_on_unload(
+            hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                self._async_device_registry_updated,
+            )
+        )
+        entry.async_on_unload(
+            hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_entity_registry_updated,
+            )
+        )
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        device_id = event.data["device_id"]
+        if event.data["action"] == "remove":
+            self._async_retire(device_id)
+        else:
+            self._async_refresh_device(device_id)
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        assert self._hass is not None
+        entity_id = event.data["entity_id"]
+
+        # A wrapped raw (or power) sensor went away or was renamed
+        old_id = event.data.get("old_entity_id", entity_id)
+        if event.data["action"] == "remove" or old_id in self._by_source:
+            device_id = self._by_source.get(old_id)
+            if device_id is not None:
+                self._async_refresh_device(device_id)
+            if event.data["action"] == "remove":
+                return
+
+        ent = er.async_get(self._hass).async_get(entity_id)
+        if ent is None or ent.domain != "sensor" or ent.platform == DOMAIN:
+            return
+        if ent.device_id is None:
+            return
+
+        self._async_refresh_device(ent.device_id)
+
+    @callback
+    def _async_refresh_device(self, device_id: str) -> None:
+        """Re-evaluate one device and add, re-bind or retire it."""
+        assert self._hass is not None
+        hass = self._hass
+
+        device = dr.async_get(hass).async_get(device_id)
+        if device is None or not is_zen15_device(device):
+            self._async_retire(device_id)
+            return
+
+        fresh = self._async_record_for_device(hass, er.async_get(hass), device)
+        rec = self.records.get(device_id)
+
+        if rec is None:
+            self.records[device_id] = fresh
+            self._index_sources(fresh)
+            if fresh.raw_entity_id:
+                fresh.added = True
+                async_dispatcher_send(
+                    hass, SIGNAL_DEVICE_ADDED.format(self.entry_id), fresh
+                )
+            return
+
+        # Update in place: entities hold a reference to this record
+        rec.device_name = fresh.device_name
+        rec.name_by_user = fresh.name_by_user
+        rec.area_id = fresh.area_id
+
+        if (
+            rec.raw_entity_id == fresh.raw_entity_id
+            and rec.power_entity_id == fresh.power_entity_id
+        ):
+            return
+
+        had_power = rec.power_entity_id is not None
+        self._unindex_sources(rec)
+        rec.raw_entity_id = fresh.raw_entity_id
+        rec.power_entity_id = fresh.power_entity_id
+        self._index_sources(rec)
+
+        if not rec.added and rec.raw_entity_id:
+            # Device was known but never had a source: first entities for it.
+            # Flag it now, not when the entity registers: registry bursts
+            # during an interview must not create the entities twice.
+            rec.added = True
+            async_dispatcher_send(
+                hass, SIGNAL_DEVICE_ADDED.format(self.entry_id), rec
+            )
+        else:
+            async_dispatcher_send(
+                hass, SIGNAL_DEVICE_REBOUND.format(self.entry_id, device_id)
+            )
+            if rec.added and rec.power_entity_id and not had_power:
+                # First W sensor of a wrapped plug: add its filtered power sensor
+                async_dispatcher_send(
+                    hass, SIGNAL_POWER_ADDED.format(self.entry_id), rec
+                )
+
+    @callback
+    def _async_retire(self, device_id: str) -> None:
+        """Remove one device's sensors, button and companion device."""
+        rec = self.records.pop(device_id, None)
+        if rec is None or self._hass is None:
+            return
+        self._unindex_sources(rec)
+
+        entity_reg = er.async_get(self._hass)
+        for domain, unique_id in (
+            ("sensor", filtered_unique_id(device_id)),
+            ("sensor", power_filtered_unique_id(device_id)),
+            ("sensor", health_unique_id(device_id)),
+            *(("sensor", period_unique_id(device_id, p)) for p in PERIODS),
+            ("button", button_unique_id(self.entry_id, device_id)),
+        ):
+            entity_id = entity_reg.async_get_entity_id(domain, DOMAIN, unique_id)
+            if entity_id:
+                entity_reg.async_remove(entity_id)
+
+        device_reg = dr.async_get(self._hass)
+        companion = device_reg.async_get_device(identifiers={(DOMAIN, device_id)})
+        if companion is not None:
+            device_reg.async_remove_device(companion.id)
+
+    def _index_sources(self, rec: Zen15DeviceRecord) -> None:
+        for entity_id in (rec.raw_entity_id, rec.power_entity_id):
+            if entity_id:
+                self._by_source[entity_id] = rec.device_id
+
+    def _unindex_sources(self, rec: Zen15DeviceRecord) -> None:
+        for entity_id in (rec.raw_entity_id, rec.power_entity_id):
+            if entity_id:
+                self._by_source.pop(entity_id, None)
+
+    # ---------------------------------------------------------
+    # CLEANUP
+    # ---------------------------------------------------------
+
+    @callback
+    def async_cleanup_stale(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        periods: Iterable[str] = (),
+        areas: Iterable[str] = (),
+        stats: Iterable[str] = (),
+    ) -> None:
+        """Remove stale entities/devices of this entry using per-entry lookups.
+
+        ``periods`` are the enabled period counters, ``areas`` the areas
+        with a fleet total and ``stats`` the enabled instrumentation
+        sensors; the others are stale.
+        """
+        entity_reg = er.async_get(hass)
+        device_reg = dr.async_get(hass)
+
+        expected: Dict[str, set[str]] = {
+            "sensor": {
+                uid
+                for rec in self.sources
+                for uid in (
+                    filtered_unique_id(rec.device_id),
+                    health_unique_id(rec.device_id),
+                    *(period_unique_id(rec.device_id, p) for p in periods),
+                )
+            }
+            | {
+                power_filtered_unique_id(rec.device_id)
+                for rec in self.sources
+                if rec.power_entity_id
+            }
+            | {fleet_unique_id(entry.entry_id)}
+            | {fleet_unique_id(entry.entry_id, area_id) for area_id in areas}
+            | {stats_unique_id(entry.entry_id, key) for key in stats},
+            "button": {
+                button_unique_id(entry.entry_id, rec.device_id)
+                for rec in self.sources
+            },
+        }
+
+        devices_with_entities: set[str] = set()
+        for ent in er.async_entries_for_config_entry(entity_reg, entry.entry_id):
+            if ent.platform != DOMAIN:
+                continue
+
+            wanted = expected.get(ent.domain)
+            if wanted is not None and ent.unique_id not in wanted:
+                # _2, _3, _4, filters-of-filters, orphaned buttons – nuke them
+                entity_reg.async_remove(ent.entity_id)
+                continue
+
+            if ent.device_id:
+                devices_with_entities.add(ent.device_id)
+
+        # Clean up old / empty zen15_cleaner devices from earlier versions
+        for device in dr.async_entries_for_config_entry(device_reg, entry.entry_id):
+            if not any(iden[0] == DOMAIN for iden in device.identifiers):
+                continue
+            if device.id not in devices_with_entities:
+                device_reg.async_remove_device(device.id)
+
+
+@callback
+def async_get_discovery(hass: HomeAssistant, entry: ConfigEntry) -> Zen15DiscoveryIndex:
+    """Return the entry's discovery index, building a throwaway one if unloaded."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is not None and DATA_DISCOVERY in entry_data:
+        return entry_data[DATA_DISCOVERY]
+
+    index = Zen15DiscoveryIndex(entry.entry_id)
+    index.async_build(hass)
+    return index
+
+
+# ---------------------------------------------------------
+# RAW SENSOR PICKER
+# ---------------------------------------------------------
+
+_KWH_UNITS = ("kwh", "kw·h", "kw/h")
+_POWER_UNITS = ("w",)
+
+
+def _find_entity_for_device(
+    hass: HomeAssistant,
+    entries: Iterable[er.RegistryEntry],
+    units: Tuple[str, ...],
+    device_class: SensorDeviceClass,
+    preferred_state_class: SensorStateClass,
+) -> str | None:
+    """Pick the device's best sensor with one of ``units`` and ``device_class``.
+
+    Decided from entity registry metadata (the integration's original unit,
+    device class and state class), so a device can be wrapped before Z-Wave
+    JS has reported any state. The live state is only consulted for entries
+    that carry no metadata at all. A sensor with ``preferred_state_class``
+    wins; otherwise the first match is used.
+    """
+    best = None
+
+    for ent in entries:
+        unit = ent.unit_of_measurement
+        ent_class = ent.device_class or ent.original_device_class
+        state_class = (ent.capabilities or {}).get("state_class")
+
+        if unit is None and ent_class is None:
+            state = hass.states.get(ent.entity_id)
+            if not state:
+                continue
+            unit = state.attributes.get("unit_of_measurement")
+            ent_class = state.attributes.get("device_class")
+            state_class = state.attributes.get("state_class")
+
+        if (unit or "").lower() not in units:
+            continue
+        if ent_class != device_class:
+            continue
+
+        if state_class == preferred_state_class:
+            return ent.entity_id
+
+        if best is None:
+            best = ent.entity_id
+
+    return best
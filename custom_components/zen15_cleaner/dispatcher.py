@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+
+SourceHandler = Callable[[State | None], None]
+
+
+class Zen15EventDispatcher:
+    """One state_changed subscription per config entry, routed by entity_id.
+
+    Every wrapped raw sensor registers a handler here instead of setting up
+    its own ``async_track_state_change_event``. The bus listener filters on a
+    plain dict lookup, as Home Assistant's own keyed tracker does, and hands
+    the handler the new state directly. A re-bound raw sensor only moves its
+    handler to another key, and ``async_stop`` drops the whole entry at once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._handlers: Dict[str, List[SourceHandler]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    # ---------------------------------------------------------
+    # LIFECYCLE
+    # ---------------------------------------------------------
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the event bus (idempotent)."""
+        if self._unsub is not None:
+            return
+        self._unsub = self._hass.bus.async_listen(
+            EVENT_STATE_CHANGED,
+            self._async_handle_event,
+            event_filter=self._async_filter,
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop the bus subscription and every registered source."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._handlers.clear()
+
+    # ---------------------------------------------------------
+    # SOURCES
+    # ---------------------------------------------------------
+
+    @property
+    def source_count(self) -> int:
+        return len(self._handlers)
+
+    @callback
+    def async_add_source(
+        self,
+        entity_id: str,
+        handler: SourceHandler,
+    ) -> CALLBACK_TYPE:
+        """Route state changes of ``entity_id`` to ``handler``.
+
+        Returns a callback that removes exactly this registration, which is
+        what entities hand to ``async_on_remove``.
+        """
+        self._handlers.setdefault(entity_id, []).append(handler)
+
+        @callback
+        def _remove() -> None:
+            self.async_remove_source(entity_id, handler)
+
+        return _remove
+
+    @callback
+    def async_remove_source(
+        self,
+        entity_id: str,
+        handler: SourceHandler | None = None,
+    ) -> None:
+        """Stop routing ``entity_id`` (one handler, or all of them)."""
+        handlers = self._handlers.get(entity_id)
+        if handlers is None:
+            return
+
+        if handler is not None:
+            try:
+                handlers.remove(handler)
+            except ValueError:
+                pass
+            if handlers:
+                return
+
+        del self._handlers[entity_id]
+
+    # ---------------------------------------------------------
+    # EVENT ROUTING
+    # ---------------------------------------------------------
+
+    @callback
+    def _async_filter(self, event_data: EventStateChangedData) -> bool:
+        return event_data["entity_id"] in self._handlers
+
+    @callback
+    def _async_handle_event(self, event: Event[EventStateChangedData]) -> None:
+        handlers = self._handlers.get(event.data["entity_id"])
+        if not handlers:
+            return
+
+        new_state = event.data["new_state"]
+        # Copy: a handler may unregister itself while we iterate
+        for handler in tuple(handlers):
+            handler(new_state)
@@ -0,0 +1,601 @@
+"""Home-Assistant-independent ZEN15/ZEN04 filter core.
+
+Everything in here is plain Python so the exact filter semantics can be
+used (and measured) without a running Home Assistant: the sensor entity is
+only a thin adapter that feeds raw readings in and publishes the result.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, NamedTuple, Tuple
+
+from .estimators import MAD_TO_SIGMA, P2Quantile, PowerIntegrator, RollingMedianMad
+
+# Outcome of a single feed()
+STATUS_BASELINE = 0   # first reading: adopted as baseline, nothing added
+STATUS_ACCEPTED = 1   # 0 <= delta <= forward threshold (positive part added)
+STATUS_RESET = 2      # big negative jump: meter reset / rollover
+STATUS_SPIKE = 3      # big positive jump: ignored, baseline kept
+STATUS_HEALED = 4     # run of consistent spikes: re-anchored on the new baseline
+
+
+# How the forward (spike) limit of each reading is decided
+FILTER_MODE_THRESHOLD = "threshold"   # fixed forward_threshold_kwh
+FILTER_MODE_HAMPEL = "hampel"         # rolling median + k * MAD of recent deltas
+FILTER_MODE_ADAPTIVE = "adaptive"     # margin * learned quantile of accepted rates
+FILTER_MODES = (FILTER_MODE_THRESHOLD, FILTER_MODE_HAMPEL, FILTER_MODE_ADAPTIVE)
+
+DEFAULT_HAMPEL_WINDOW = 15
+DEFAULT_HAMPEL_K = 5.0
+DEFAULT_HAMPEL_MIN_KWH = 0.5
+
+DEFAULT_ADAPTIVE_QUANTILE = 0.99
+DEFAULT_ADAPTIVE_MARGIN = 3.0
+DEFAULT_ADAPTIVE_FLOOR_KWH = 0.5
+ADAPTIVE_MIN_SAMPLES = 20  # accepted increases before the learned limit is used
+ADAPTIVE_STATE_KEY = "kw"  # checkpoint key; older checkpoints learned kWh per update
+
+# Time-normalized plausibility: allowance on top of the rated power, plus one
+# step of meter resolution so short intervals never reject a single tick
+DEFAULT_POWER_TOLERANCE = 0.25
+DEFAULT_ENERGY_RESOLUTION_KWH = 0.01
+
+# Power cross-check: an accepted delta more than this far above the
+# integrated power is clamped to the integral
+DEFAULT_CROSSCHECK_TOLERANCE = 0.5
+DEFAULT_CROSSCHECK_SLACK_KWH = 0.02
+
+# Filtered power: small negative readings are read as 0 W
+POWER_NOISE_W = 1.0
+
+
+class FeedResult(NamedTuple):
+    """What one raw reading did to the filter state."""
+
+    status: int
+    delta: float          # raw - previous raw (0.0 for a baseline)
+    delta_clean: float    # energy actually added to the virtual total
+    total: float          # virtual total after this reading
+
+
+class Zen15FilterState:
+    """Per-device filter state, kept compact with ``__slots__``.
+
+    ``feed`` is the hot path: a handful of float compares and one small
+    tuple allocation per reading.
+
+    Self-heal: a spike keeps the old baseline, and the rejected readings go
+    into a fixed-size buffer of ``reject_run_limit`` slots. As long as each
+    rejected reading is a plausible step from the one before it, they form
+    one run. A reading back in range of the baseline ends the run (it was a
+    glitch). A run that reaches ``reject_run_limit`` readings is a new
+    stable baseline: the filter re-anchors on it and adds only the growth
+    seen since the jump, never the jump itself.
+
+    Filter modes: in ``threshold`` mode a delta above
+    ``forward_threshold_kwh`` is a spike. In ``hampel`` mode the window
+    holds the last ``hampel_window`` positive increases as rates (kWh per
+    hour since the baseline reading), so a change of reporting interval
+    does not move it. The limit is ``median + hampel_k * sigma`` of those
+    rates (sigma estimated from their MAD) times the hours since the
+    baseline, plus one ``energy_resolution_kwh`` tick. It is never below
+    ``hampel_min_kwh``, and ``forward_threshold_kwh`` stays as a hard cap.
+    Until the window is half full the fixed threshold applies. The steps of
+    a healed run go into the window too, so it follows a new operating
+    point instead of rejecting it again.
+
+    In ``adaptive`` mode a P² estimator learns the ``adaptive_quantile`` of
+    the accepted positive increases, again as rates. ``adaptive_margin``
+    times that rate is ``learned_rate_kw``; the limit is that rate times
+    the hours since the baseline plus one tick, never below
+    ``adaptive_floor_kwh`` and again capped by ``forward_threshold_kwh``,
+    once ``ADAPTIVE_MIN_SAMPLES`` were seen. Healed runs are learned as in
+    ``hampel`` mode, so a tight estimate cannot lock out a higher load.
+
+    Plausibility: with ``max_power_kw`` set, a delta is also a spike when
+    it is more than the device could have used since the baseline reading
+    (``max_power_kw * (1 + power_tolerance) * hours``, plus
+    ``energy_resolution_kwh``). This applies in every mode.
+
+    Power cross-check: with a ``PowerIntegrator`` attached (fed through
+    ``feed_power``), every kWh reading is compared with the integrated
+    power since the previous one. An accepted delta far above it
+    (``crosscheck_tolerance`` / ``crosscheck_slack_kwh``) is clamped to the
+    integral, and a spike is replaced by the integral instead of adding
+    nothing. Energy credited that way is taken off the next accepted
+    delta, which is measured from the held baseline and covers it again.
+    """
+
+    __slots__ = (
+        "forward_threshold_kwh",
+        "backward_threshold_kwh",
+        "reject_run_limit",
+        "reject_run_count",
+        "reject_run_values",
+        "reject_run_times",
+        "virtual_total",
+        "last_raw_value",
+        "last_delta_kwh",
+        "last_timestamp",
+        "last_status",
+        "filter_mode",
+        "hampel_k",
+        "hampel_min_kwh",
+        "recent_deltas",
+        "adaptive_margin",
+        "adaptive_floor_kwh",
+        "delta_quantile",
+        "learned_rate_kw",
+        "learned_forward_kwh",
+        "effective_forward_kwh",
+        "max_power_kw",
+        "power_tolerance",
+        "energy_resolution_kwh",
+        "baseline_timestamp",
+        "implied_power_kw",
+        "power_integral",
+        "crosscheck_tolerance",
+        "crosscheck_slack_kwh",
+        "credited_kwh",
+        "run_credit_base",
+        "last_power_estimate_kwh",
+        "power_adjustments",
+    )
+
+    def __init__(
+        self,
+        forward_threshold_kwh: float,
+        backward_threshold_kwh: float,
+        reject_run_limit: int,
+        filter_mode: str = FILTER_MODE_THRESHOLD,
+        hampel_window: int = DEFAULT_HAMPEL_WINDOW,
+        hampel_k: float = DEFAULT_HAMPEL_K,
+        hampel_min_kwh: float = DEFAULT_HAMPEL_MIN_KWH,
+        adaptive_quantile: float = DEFAULT_ADAPTIVE_QUANTILE,
+        adaptive_margin: float = DEFAULT_ADAPTIVE_MARGIN,
+        adaptive_floor_kwh: float = DEFAULT_ADAPTIVE_FLOOR_KWH,
+        max_power_kw: float | None = None,
+        power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+        energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+    ) -> None:
+        self.forward_threshold_kwh = float(forward_threshold_kwh)
+        self.backward_threshold_kwh = float(backward_threshold_kwh)
+        self.reject_run_limit = int(reject_run_limit)
+        self.reject_run_count = 0
+        self.reject_run_values: List[float] = [0.0] * max(1, self.reject_run_limit)
+        self.reject_run_times: List[float] = [0.0] * max(1, self.reject_run_limit)
+
+        self.virtual_total = 0.0
+        self.last_raw_value: float | None = None
+        self.last_delta_kwh: float | None = None
+        self.last_timestamp: float | None = None
+        self.last_status = STATUS_BASELINE
+        self.baseline_timestamp: float | None = None  # when last_raw_value was read
+        self.implied_power_kw: float | None = None
+
+        self.max_power_kw: float | None = None
+        self.power_tolerance = DEFAULT_POWER_TOLERANCE
+        self.energy_resolution_kwh = DEFAULT_ENERGY_RESOLUTION_KWH
+        self.set_power_limit(max_power_kw, power_tolerance, energy_resolution_kwh)
+
+        self.power_integral: PowerIntegrator | None = None
+        self.crosscheck_tolerance = DEFAULT_CROSSCHECK_TOLERANCE
+        self.crosscheck_slack_kwh = DEFAULT_CROSSCHECK_SLACK_KWH
+        self.credited_kwh = 0.0       # replaced spike energy not yet covered by a delta
+        self.run_credit_base = 0.0    # credited_kwh when the current reject run began
+        self.last_power_estimate_kwh: float | None = None
+        self.power_adjustments = 0    # clamps + replacements
+
+        self.filter_mode = FILTER_MODE_THRESHOLD
+        self.hampel_k = DEFAULT_HAMPEL_K
+        self.hampel_min_kwh = DEFAULT_HAMPEL_MIN_KWH
+        self.recent_deltas: RollingMedianMad | None = None
+        self.adaptive_margin = DEFAULT_ADAPTIVE_MARGIN
+        self.adaptive_floor_kwh = DEFAULT_ADAPTIVE_FLOOR_KWH
+        self.delta_quantile: P2Quantile | None = None
+        self.learned_rate_kw: float | None = None
+        self.learned_forward_kwh: float | None = None  # applied to the last reading
+        self.effective_forward_kwh = self.forward_threshold_kwh
+        self.set_filter_mode(
+            filter_mode,
+            hampel_window=hampel_window,
+            hampel_k=hampel_k,
+            hampel_min_kwh=hampel_min_kwh,
+            adaptive_quantile=adaptive_quantile,
+            adaptive_margin=adaptive_margin,
+            adaptive_floor_kwh=adaptive_floor_kwh,
+        )
+
+    def set_filter_mode(
+        self,
+        filter_mode: str,
+        hampel_window: int = DEFAULT_HAMPEL_WINDOW,
+        hampel_k: float = DEFAULT_HAMPEL_K,
+        hampel_min_kwh: float = DEFAULT_HAMPEL_MIN_KWH,
+        adaptive_quantile: float = DEFAULT_ADAPTIVE_QUANTILE,
+        adaptive_margin: float = DEFAULT_ADAPTIVE_MARGIN,
+        adaptive_floor_kwh: float = DEFAULT_ADAPTIVE_FLOOR_KWH,
+    ) -> None:
+        """Switch mode; learned history is kept while its shape is unchanged."""
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"unknown filter mode {filter_mode!r}")
+        self.filter_mode = filter_mode
+        self.hampel_k = float(hampel_k)
+        self.hampel_min_kwh = float(hampel_min_kwh)
+        self.adaptive_margin = float(adaptive_margin)
+        self.adaptive_floor_kwh = float(adaptive_floor_kwh)
+
+        if filter_mode != FILTER_MODE_HAMPEL:
+            self.recent_deltas = None
+        elif self.recent_deltas is None or self.recent_deltas.size != int(hampel_window):
+            self.recent_deltas = RollingMedianMad(hampel_window)
+
+        if filter_mode != FILTER_MODE_ADAPTIVE:
+            self.delta_quantile = None
+            self.learned_rate_kw = None
+            self.learned_forward_kwh = None
+        elif self.delta_quantile is None or self.delta_quantile.p != float(
+            adaptive_quantile
+        ):
+            self.delta_quantile = P2Quantile(adaptive_quantile)
+            self.learned_rate_kw = None
+            self.learned_forward_kwh = None
+        else:
+            self._update_learned()
+
+    def set_power_limit(
+        self,
+        max_power_kw: float | None,
+        power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+        energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+    ) -> None:
+        """Configure the implied-power check (``None`` disables it)."""
+        self.max_power_kw = None if max_power_kw is None else float(max_power_kw)
+        self.power_tolerance = float(power_tolerance)
+        self.energy_resolution_kwh = float(energy_resolution_kwh)
+
+    def set_power_crosscheck(
+        self,
+        enabled: bool,
+        tolerance: float = DEFAULT_CROSSCHECK_TOLERANCE,
+        slack_kwh: float = DEFAULT_CROSSCHECK_SLACK_KWH,
+    ) -> None:
+        """Attach (or drop) the power integrator used for cross-checking."""
+        self.crosscheck_tolerance = float(tolerance)
+        self.crosscheck_slack_kwh = float(slack_kwh)
+        if not enabled:
+            self.power_integral = None
+            self.credited_kwh = 0.0
+        elif self.power_integral is None:
+            self.power_integral = PowerIntegrator()
+
+    def feed_power(self, watts: float | None, timestamp: float) -> None:
+        """Apply one power reading (W); ``None`` marks it unavailable."""
+        if self.power_integral is not None:
+            self.power_integral.push(watts, timestamp)
+
+    def like(self) -> Zen15FilterState:
+        """Fresh state (no history) with the same configuration."""
+        window = self.recent_deltas
+        est = self.delta_quantile
+        size = window.size if window is not None else DEFAULT_HAMPEL_WINDOW
+        clone = Zen15FilterState(
+            self.forward_threshold_kwh,
+            self.backward_threshold_kwh,
+            self.reject_run_limit,
+            self.filter_mode,
+            hampel_window=size,
+            hampel_k=self.hampel_k,
+            hampel_min_kwh=self.hampel_min_kwh,
+            adaptive_quantile=est.p if est is not None else DEFAULT_ADAPTIVE_QUANTILE,
+            adaptive_margin=self.adaptive_margin,
+            adaptive_floor_kwh=self.adaptive_floor_kwh,
+            max_power_kw=self.max_power_kw,
+            power_tolerance=self.power_tolerance,
+            energy_resolution_kwh=self.energy_resolution_kwh,
+        )
+        clone.set_power_crosscheck(
+            self.power_integral is not None,
+            self.crosscheck_tolerance,
+            self.crosscheck_slack_kwh,
+        )
+        return clone
+
+    def learned_state(self) -> dict | None:
+        """Learned quantile estimator, for checkpointing (None if not adaptive)."""
+        est = self.delta_quantile
+        return {ADAPTIVE_STATE_KEY: est.as_list()} if est is not None else None
+
+    def restore_learned(self, data: dict | list | None) -> None:
+        """Resume a checkpointed estimator if it matches the configured quantile.
+
+        Estimators saved as a bare list learned kWh per update, not rates;
+        they are dropped and the plug learns again.
+        """
+        est = self.delta_quantile
+        if est is None or not isinstance(data, dict):
+            return
+        try:
+            saved = P2Quantile.from_list(data[ADAPTIVE_STATE_KEY])
+        except (KeyError, TypeError, ValueError):
+            return
+        if saved.p == est.p:
+            self.delta_quantile = saved
+            self._update_learned()
+
+    def _update_learned(self) -> None:
+        est = self.delta_quantile
+        if est is None or est.count < ADAPTIVE_MIN_SAMPLES:
+            self.learned_rate_kw = None
+            self.learned_forward_kwh = None
+            return
+        self.learned_rate_kw = self.adaptive_margin * est.value()
+
+    @property
+    def reset_detected(self) -> bool:
+        return self.last_status == STATUS_RESET
+
+    @property
+    def spike_ignored(self) -> bool:
+        return self.last_status == STATUS_SPIKE
+
+    @property
+    def self_healed(self) -> bool:
+        return self.last_status == STATUS_HEALED
+
+    def feed(self, raw: float, timestamp: float) -> FeedResult:
+        """Apply one raw kWh reading taken at ``timestamp`` (epoch seconds)."""
+        last = self.last_raw_value
+        self.last_timestamp = timestamp
+
+        integral = self.power_integral
+        est = integral.take(timestamp) if integral is not None else None
+        self.last_power_estimate_kwh = est
+
+        if last is None:
+            self.last_raw_value = raw
+            self.baseline_timestamp = timestamp
+            self.last_delta_kwh = 0.0
+            self.last_status = STATUS_BASELINE
+            return FeedResult(STATUS_BASELINE, 0.0, 0.0, self.virtual_total)
+
+        delta = raw - last
+        self.last_delta_kwh = delta
+
+        # Learned limits are rates; without elapsed time they cannot apply
+        hours = None
+        since = self.baseline_timestamp
+        if since is not None and timestamp > since:
+            hours = (timestamp - since) / 3600.0
+            self.implied_power_kw = delta / hours
+
+        limit = self.forward_threshold_kwh
+        window = self.recent_deltas
+        if window is not None and hours is not None and 2 * window.count >= window.size:
+            median = window.median()
+            rate = median + self.hampel_k * MAD_TO_SIGMA * window.mad(median)
+            robust = rate * hours + self.energy_resolution_kwh
+            if robust < self.hampel_min_kwh:
+                robust = self.hampel_min_kwh
+            if robust < limit:
+                limit = robust
+        rate_kw = self.learned_rate_kw
+        if rate_kw is not None and hours is not None:
+            learned = rate_kw * hours + self.energy_resolution_kwh
+            if learned < self.adaptive_floor_kwh:
+                learned = self.adaptive_floor_kwh
+            self.learned_forward_kwh = learned
+            if learned < limit:
+                limit = learned
+
+        if hours is not None:
+            max_kw = self.max_power_kw
+            if max_kw is not None:
+                plausible = (
+                    max_kw * (1.0 + self.power_tolerance) * hours
+                    + self.energy_resolution_kwh
+                )
+                if plausible < limit:
+                    limit = plausible
+        self.effective_forward_kwh = limit
+
+        # Big positive jump = spike (the baseline stays where it was)
+        if delta > limit:
+            return self._reject(raw, delta, timestamp, est)
+
+        self.reject_run_count = 0
+        self.last_raw_value = raw
+        self.baseline_timestamp = timestamp
+
+        # Big negative jump = reset
+        if delta < -self.backward_threshold_kwh:
+            status = STATUS_RESET
+            delta_clean = 0.0
+            self.credited_kwh = 0.0
+        else:
+            status = STATUS_ACCEPTED
+            delta_clean = delta if delta > 0 else 0.0
+            if self.credited_kwh:
+                delta_clean -= self.credited_kwh
+                self.credited_kwh = 0.0
+                if delta_clean < 0:
+                    delta_clean = 0.0
+            if est is not None and delta_clean > (
+                est * (1.0 + self.crosscheck_tolerance) + self.crosscheck_slack_kwh
+            ):
+                delta_clean = est
+                self.power_adjustments += 1
+            if delta_clean:
+                self.virtual_total += delta_clean
+                if window is not None:
+                    if hours is not None:
+                        window.push(delta_clean / hours)
+                elif self.delta_quantile is not None and hours is not None:
+                    self.delta_quantile.push(delta_clean / hours)
+                    self._update_learned()
+
+        self.last_status = status
+        return FeedResult(status, delta, delta_clean, self.virtual_total)
+
+    def _reject(
+        self,
+        raw: float,
+        delta: float,
+        timestamp: float,
+        est: float | None,
+    ) -> FeedResult:
+        """Track a rejected reading; heal once the run is long enough."""
+        run = self.reject_run_values
+        times = self.reject_run_times
+        count = self.reject_run_count
+
+        if len(run) != max(1, self.reject_run_limit):
+            # Limit changed at runtime: start over with buffers of the new size
+            run = self.reject_run_values = [0.0] * max(1, self.reject_run_limit)
+            times = self.reject_run_times = [0.0] * len(run)
+            count = 0
+        elif count:
+            step = raw - run[count - 1]
+            if step > self.forward_threshold_kwh or step < -self.backward_threshold_kwh:
+                count = 0  # not the same new baseline: this reading starts a new run
+
+        run[count] = raw
+        times[count] = timestamp
+        count += 1
+
+        # Replace the spike with what the power sensor says was used
+        replaced = 0.0
+        if est is not None and est > 0:
+            replaced = est
+            self.virtual_total += est
+            self.credited_kwh += est
+            self.power_adjustments += 1
+        if count == 1:
+            self.run_credit_base = self.credited_kwh
+
+        if count < len(run):
+            self.reject_run_count = count
+            self.last_status = STATUS_SPIKE
+            return FeedResult(STATUS_SPIKE, delta, replaced, self.virtual_total)
+
+        # Stable new baseline: re-anchor, keep only what was used after the jump
+        self.reject_run_count = 0
+        self.last_raw_value = raw
+        self.baseline_timestamp = timestamp
+        # Growth since the jump, minus what was already credited for that span
+        growth = raw - run[0] - (self.credited_kwh - self.run_credit_base)
+        self.credited_kwh = 0.0
+        delta_clean = growth if growth > 0 else 0.0
+        if delta_clean:
+            self.virtual_total += delta_clean
+        delta_clean += replaced
+        self._learn_run(run, times)
+        self.last_status = STATUS_HEALED
+        return FeedResult(STATUS_HEALED, delta, delta_clean, self.virtual_total)
+
+    def _learn_run(self, run: List[float], times: List[float]) -> None:
+        """Teach the learned limits the steps of a healed run (its new level)."""
+        window = self.recent_deltas
+        est = self.delta_quantile
+        if window is None and est is None:
+            return
+        for i in range(1, len(run)):
+            step = run[i] - run[i - 1]
+            seconds = times[i] - times[i - 1]
+            if step > 0 and seconds > 0:
+                rate = step * 3600.0 / seconds
+                if window is not None:
+                    window.push(rate)
+                else:
+                    est.push(rate)  # type: ignore[union-attr]
+        if est is not None:
+            self._update_learned()
+
+    def feed_many(
+        self,
+        samples: Iterable[Tuple[float, float]],
+    ) -> List[FeedResult]:
+        """Apply ``(raw, timestamp)`` samples in order; one result per sample."""
+        feed = self.feed
+        return [feed(raw, ts) for raw, ts in samples]
+
+    def as_dict(self) -> dict:
+        """Full internal state, for diagnostics."""
+        out = {slot: getattr(self, slot) for slot in self.__slots__}
+        if self.recent_deltas is not None:
+            out["recent_deltas"] = self.recent_deltas.values()
+        out["delta_quantile"] = self.learned_state()
+        integral = self.power_integral
+        if integral is not None:
+            out["power_integral"] = {
+                slot: getattr(integral, slot) for slot in integral.__slots__
+            }
+        return out
+
+    def reset(self) -> None:
+        """Zero the virtual total; the next delta starts from the last raw value."""
+        self.virtual_total = 0.0
+        self.reject_run_count = 0
+        self.credited_kwh = 0.0
+
+    def align(self, raw: float, timestamp: float | None = None) -> None:
+        """Set the virtual total to the raw meter value and re-anchor on it."""
+        self.virtual_total = raw if raw > 0.0 else 0.0
+        self.last_raw_value = raw
+        self.reject_run_count = 0
+        self.credited_kwh = 0.0
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+            self.baseline_timestamp = timestamp
+
+
+class Zen15PowerFilter:
+    """Spike filter for the plug's instantaneous power (W).
+
+    Power is a level, not a counter, so it gets its own rules: negative
+    readings (beyond ``POWER_NOISE_W``) and readings above ``max_power_w``
+    are spikes and keep the last accepted value. Every other reading is
+    taken at once. Home Assistant sends no state change while a value
+    stays the same, so a new steady level (a plug switching off, or on to
+    a constant load) may never be followed by a confirming reading.
+    """
+
+    __slots__ = (
+        "max_power_w",
+        "value",
+        "last_status",
+        "spikes",
+    )
+
+    def __init__(self, max_power_w: float | None = None) -> None:
+        self.max_power_w = None if max_power_w is None else float(max_power_w)
+        self.value: float | None = None
+        self.last_status = STATUS_BASELINE
+        self.spikes = 0
+
+    @property
+    def spike_ignored(self) -> bool:
+        return self.last_status == STATUS_SPIKE
+
+    def feed(self, watts: float) -> int:
+        """Apply one power reading; returns the status of this reading."""
+        if watts < 0.0:
+            if watts < -POWER_NOISE_W:
+                return self._spike()
+            watts = 0.0
+        ceiling = self.max_power_w
+        if ceiling is not None and watts > ceiling:
+            return self._spike()
+
+        status = STATUS_ACCEPTED if self.value is not None else STATUS_BASELINE
+        self.value = watts
+        self.last_status = status
+        return status
+
+    def _spike(self) -> int:
+        self.spikes += 1
+        self.last_status = STATUS_SPIKE
+        return STATUS_SPIKE
+
+    def as_dict(self) -> dict:
+        """Full internal state, for diagnostics."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
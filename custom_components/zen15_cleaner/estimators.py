@@ -0,0 +1,280 @@
+"""Constant-memory streaming estimators used by the filter engine.
+
+Plain Python (no Home Assistant imports), like ``engine.py``, so the
+engine stays usable from the offline tools.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+# Scales a MAD to a standard deviation for normally distributed data
+MAD_TO_SIGMA = 1.4826
+
+
+class RollingMedianMad:
+    """Median and MAD of the last ``size`` values.
+
+    Backed by two preallocated ``array('d')`` buffers: a ring in arrival
+    order and the same values kept sorted. ``push`` is one binary search
+    plus a memmove inside the sorted buffer, ``median`` is an index
+    lookup and ``mad`` walks outwards from the median once, so the cost
+    per value depends only on ``size``, never on how many values were seen.
+    """
+
+    __slots__ = ("size", "count", "_ring", "_pos", "_sorted")
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, int(size))
+        self.count = 0
+        self._ring = array("d", bytes(8 * self.size))
+        self._pos = 0
+        self._sorted = array("d")
+
+    def push(self, value: float) -> None:
+        if self.count == self.size:
+            old = self._ring[self._pos]
+            del self._sorted[bisect_left(self._sorted, old)]
+        else:
+            self.count += 1
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+        insort(self._sorted, value)
+
+    def median(self) -> float:
+        vals, n = self._sorted, self.count
+        if not n:
+            return 0.0
+        mid = n // 2
+        if n % 2:
+            return vals[mid]
+        return 0.5 * (vals[mid - 1] + vals[mid])
+
+    def mad(self, median: float) -> float:
+        """Median absolute deviation around ``median`` (from ``median()``)."""
+        vals, n = self._sorted, self.count
+        if not n:
+            return 0.0
+
+        # Deviations grow outwards from the median on both sides of the
+        # sorted buffer: merge the two sides until the middle rank is hit
+        j = bisect_right(vals, median, 0, n)
+        i = j - 1
+        lo_rank, hi_rank = (n - 1) // 2, n // 2
+        lo = 0.0
+        for rank in range(hi_rank + 1):
+            left = median - vals[i] if i >= 0 else None
+            right = vals[j] - median if j < n else None
+            if right is None or (left is not None and left <= right):
+                dev = left
+                i -= 1
+            else:
+                dev = right
+                j += 1
+            if rank == lo_rank:
+                lo = dev
+        return 0.5 * (lo + dev)
+
+    def clear(self) -> None:
+        self.count = 0
+        self._pos = 0
+        del self._sorted[:]
+
+    def values(self) -> list[float]:
+        """Window contents, oldest first (diagnostics)."""
+        if self.count < self.size:
+            return list(self._ring[: self.count])
+        return list(self._ring[self._pos :]) + list(self._ring[: self._pos])
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile with the P² algorithm.
+
+    Jain & Chlamtac (1985): five markers whose heights are nudged by a
+    piecewise-parabolic fit as values arrive. Fixed-size state (five
+    heights and positions), O(1) per value and no stored samples, so it can
+    run for years per device.
+    """
+
+    __slots__ = ("p", "count", "_q", "_n", "_want", "_step")
+
+    def __init__(self, p: float) -> None:
+        self.p = float(p)
+        self.count = 0
+        self._q: list[float] = []           # marker heights
+        self._n = [1.0, 2.0, 3.0, 4.0, 5.0]  # marker positions
+        self._want = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def push(self, x: float) -> None:
+        self.count += 1
+        q = self._q
+        if self.count <= 5:
+            insort(q, x)
+            return
+
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        want, step = self._want, self._step
+        for i in range(5):
+            want[i] += step[i]
+
+        for i in (1, 2, 3):
+            d = want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                # Parabolic prediction; linear if it would pass a neighbour
+                qp = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = qp
+                n[i] += s
+
+    def value(self) -> float | None:
+        q = self._q
+        if not q:
+            return None
+        if self.count < 5:
+            # Too few values for the markers: nearest-rank on what we have
+            return q[min(len(q) - 1, int(self.p * len(q)))]
+        return q[2]
+
+    def as_list(self) -> list:
+        """Compact serializable state (checkpoint)."""
+        return [self.p, self.count, list(self._q), list(self._n), list(self._want)]
+
+    @classmethod
+    def from_list(cls, data: list) -> P2Quantile:
+        p, count, q, n, want = data
+        est = cls(p)
+        est.count = int(count)
+        est._q = [float(v) for v in q]
+        est._n = [float(v) for v in n]
+        est._want = [float(v) for v in want]
+        return est
+
+
+class PowerIntegrator:
+    """Running trapezoidal integral of a W sensor between kWh reports.
+
+    ``push`` adds the trapezoid since the previous power sample; ``take``
+    returns the energy since the last ``take`` (the tail after the newest
+    sample is held at its value) and starts over. Four numbers of state.
+    """
+
+    __slots__ = ("last_w", "last_ts", "energy_kwh", "valid")
+
+    def __init__(self) -> None:
+        self.last_w: float | None = None
+        self.last_ts: float | None = None
+        self.energy_kwh = 0.0
+        self.valid = False  # no gap since the last take()
+
+    def push(self, watts: float | None, timestamp: float) -> None:
+        """Add one power sample (``None`` = unavailable, which voids the period)."""
+        if watts is None:
+            self.last_w = None
+            self.valid = False
+        elif self.last_w is not None and timestamp > self.last_ts:
+            # (W + W) / 2 * s / 3.6e6 = kWh
+            self.energy_kwh += (self.last_w + watts) * (timestamp - self.last_ts) / 7.2e6
+            self.last_w = watts
+        else:
+            self.last_w = watts
+        self.last_ts = timestamp
+
+    def take(self, timestamp: float) -> float | None:
+        """Energy (kWh) since the previous take, or None if it is unknown."""
+        est = None
+        last_w, last_ts = self.last_w, self.last_ts
+        if self.valid and last_w is not None:
+            tail = last_w * (timestamp - last_ts) / 3.6e6 if timestamp > last_ts else 0.0
+            est = self.energy_kwh + tail
+
+        self.energy_kwh = 0.0
+        if last_w is not None and timestamp > last_ts:
+            self.last_ts = timestamp
+        self.valid = last_w is not None
+        return est
+
+
+class BucketedCounters:
+    """Sliding-window sums of a few counters, in fixed time buckets.
+
+    ``buckets`` buckets of ``width`` seconds each, ``fields`` counters per
+    bucket, all in one preallocated ``array('d')``. Running sums are kept
+    next to it, so adding a value and reading the window totals are O(1);
+    moving into a new bucket subtracts the expired one (at most ``buckets``
+    of them after a long silence).
+    """
+
+    __slots__ = (
+        "buckets",
+        "width",
+        "fields",
+        "_data",
+        "_sums",
+        "_head",
+        "_head_index",
+    )
+
+    def __init__(self, buckets: int, width: float, fields: int) -> None:
+        self.buckets = max(1, int(buckets))
+        self.width = float(width)
+        self.fields = max(1, int(fields))
+        self._data = array("d", bytes(8 * self.buckets * self.fields))
+        self._sums = array("d", bytes(8 * self.fields))
+        self._head = 0
+        self._head_index: int | None = None  # timestamp // width of the head bucket
+
+    def _advance(self, timestamp: float) -> None:
+        index = int(timestamp // self.width)
+        head_index = self._head_index
+        if head_index is None:
+            self._head_index = index
+            return
+        steps = index - head_index
+        if steps <= 0:
+            return  # same bucket (late values count toward the newest one)
+        data, sums, fields = self._data, self._sums, self.fields
+        head = self._head
+        for _ in range(min(steps, self.buckets)):
+            head = (head + 1) % self.buckets
+            base = head * fields
+            for f in range(fields):
+                sums[f] -= data[base + f]
+                data[base + f] = 0.0
+        self._head = head
+        self._head_index = index
+
+    def add(self, timestamp: float, field: int, amount: float = 1.0) -> None:
+        self._advance(timestamp)
+        self._data[self._head * self.fields + field] += amount
+        self._sums[field] += amount
+
+    def totals(self, timestamp: float) -> list[float]:
+        """Sums over the window ending at ``timestamp``."""
+        self._advance(timestamp)
+        return [v if v > 0.0 else 0.0 for v in self._sums]  # no float dust
+
+    def clear(self) -> None:
+        for i in range(len(self._data)):
+            self._data[i] = 0.0
+        for i in range(self.fields):
+            self._sums[i] = 0.0
+        self._head_index = None
@@ -0,0 +1,69 @@
+"""Per-device filter health from sliding-window rejection rates.
+
+Each energy sensor owns one ``Zen15DeviceHealth`` and records every
+reading's status in it; the ``*_filter_health`` sensor publishes the
+summary on a shared timer.
+"""
+from __future__ import annotations
+
+from .engine import STATUS_HEALED, STATUS_RESET, STATUS_SPIKE
+from .estimators import BucketedCounters
+
+# Counters kept per bucket
+FIELD_UPDATES = 0
+FIELD_SPIKES = 1
+FIELD_RESETS = 2
+FIELD_HEALS = 3
+FIELD_KWH = 4
+FIELDS = 5
+
+_STATUS_FIELD = {
+    STATUS_SPIKE: FIELD_SPIKES,
+    STATUS_RESET: FIELD_RESETS,
+    STATUS_HEALED: FIELD_HEALS,
+}
+
+
+class Zen15DeviceHealth:
+    """Last hour (60 x 1 min) and last day (24 x 1 h) of one device's readings.
+
+    ``record`` is a few additions per reading. The score is the share of
+    readings in the window that were neither spikes, resets nor heals,
+    as a percentage; None while the window has no readings.
+    """
+
+    __slots__ = ("hour", "day")
+
+    def __init__(self) -> None:
+        self.hour = BucketedCounters(60, 60.0, FIELDS)
+        self.day = BucketedCounters(24, 3600.0, FIELDS)
+
+    def record(self, timestamp: float, status: int, kwh: float) -> None:
+        field = _STATUS_FIELD.get(status)
+        for window in (self.hour, self.day):
+            window.add(timestamp, FIELD_UPDATES)
+            if field is not None:
+                window.add(timestamp, field)
+            if kwh:
+                window.add(timestamp, FIELD_KWH, kwh)
+
+    @staticmethod
+    def score(totals: list[float]) -> float | None:
+        updates = totals[FIELD_UPDATES]
+        if not updates:
+            return None
+        bad = totals[FIELD_SPIKES] + totals[FIELD_RESETS] + totals[FIELD_HEALS]
+        return round(100.0 * max(0.0, 1.0 - bad / updates), 1)
+
+    def summary(self, timestamp: float) -> dict:
+        """Window totals and scores as of ``timestamp``."""
+        out: dict = {}
+        for suffix, window in (("1h", self.hour), ("24h", self.day)):
+            totals = window.totals(timestamp)
+            out[f"health_{suffix}"] = self.score(totals)
+            out[f"updates_{suffix}"] = int(totals[FIELD_UPDATES])
+            out[f"spikes_{suffix}"] = int(totals[FIELD_SPIKES])
+            out[f"resets_{suffix}"] = int(totals[FIELD_RESETS])
+            out[f"heals_{suffix}"] = int(totals[FIELD_HEALS])
+            out[f"accepted_kwh_{suffix}"] = round(totals[FIELD_KWH], 3)
+        return out
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping
+
+from homeassistant.config_entries import ConfigEntry
+
+from .const import (
+    CONF_FORWARD_THRESHOLD_KWH,
+    CONF_BACKWARD_THRESHOLD_KWH,
+    CONF_PER_DEVICE_THRESHOLDS,
+    DEFAULT_FORWARD_THRESHOLD_KWH,
+    DEFAULT_BACKWARD_THRESHOLD_KWH,
+    CONF_REJECT_RUN_LIMIT,
+    DEFAULT_REJECT_RUN_LIMIT,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_WRITE_DEADBAND_KWH,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_WRITE_DEADBAND_KWH,
+    CONF_FILTER_MODE,
+    CONF_HAMPEL_WINDOW,
+    CONF_HAMPEL_K,
+    CONF_HAMPEL_MIN_KWH,
+    DEFAULT_FILTER_MODE,
+    DEFAULT_HAMPEL_WINDOW,
+    DEFAULT_HAMPEL_K,
+    DEFAULT_HAMPEL_MIN_KWH,
+    CONF_ADAPTIVE_QUANTILE,
+    CONF_ADAPTIVE_MARGIN,
+    CONF_ADAPTIVE_FLOOR_KWH,
+    DEFAULT_ADAPTIVE_QUANTILE,
+    DEFAULT_ADAPTIVE_MARGIN,
+    DEFAULT_ADAPTIVE_FLOOR_KWH,
+    CONF_POWER_CHECK,
+    CONF_POWER_TOLERANCE,
+    CONF_ENERGY_RESOLUTION_KWH,
+    DEFAULT_POWER_CHECK,
+    DEFAULT_POWER_TOLERANCE,
+    DEFAULT_ENERGY_RESOLUTION_KWH,
+    MODEL_MAX_POWER_KW,
+    CONF_POWER_CROSSCHECK,
+    CONF_CROSSCHECK_TOLERANCE,
+    CONF_CROSSCHECK_SLACK_KWH,
+    DEFAULT_POWER_CROSSCHECK,
+    DEFAULT_CROSSCHECK_TOLERANCE,
+    DEFAULT_CROSSCHECK_SLACK_KWH,
+    CONF_PERIOD_COUNTERS,
+    DEFAULT_PERIOD_COUNTERS,
+    PERIODS,
+    CONF_AREA_TOTALS,
+    DEFAULT_AREA_TOTALS,
+    CONF_INSTRUMENTATION,
+    DEFAULT_INSTRUMENTATION,
+    CONF_GLITCH_DETECTION,
+    CONF_GLITCH_MIN_DEVICES,
+    CONF_GLITCH_WINDOW_S,
+    CONF_GLITCH_QUARANTINE_S,
+    DEFAULT_GLITCH_DETECTION,
+    DEFAULT_GLITCH_MIN_DEVICES,
+    DEFAULT_GLITCH_WINDOW_S,
+    DEFAULT_GLITCH_QUARANTINE_S,
+)
+
+
+def model_max_power_kw(model: str | None) -> float | None:
+    """Rated maximum load of a Zooz model, or None if unknown."""
+    model = (model or "").lower()
+    for key, kw in MODEL_MAX_POWER_KW.items():
+        if key in model:
+            return kw
+    return None
+
+
+def _get(entry: ConfigEntry, key: str, default: Any) -> Any:
+    """Options win over data (data holds what the config flow stored)."""
+    return entry.options.get(key, entry.data.get(key, default))
+
+
+@dataclass(frozen=True)
+class Zen15DeviceSettings:
+    """Effective filter settings for one device."""
+
+    forward_threshold_kwh: float
+    backward_threshold_kwh: float
+    reject_run_limit: int
+    min_write_interval: float
+    write_deadband_kwh: float
+    filter_mode: str = DEFAULT_FILTER_MODE
+    hampel_window: int = DEFAULT_HAMPEL_WINDOW
+    hampel_k: float = DEFAULT_HAMPEL_K
+    hampel_min_kwh: float = DEFAULT_HAMPEL_MIN_KWH
+    adaptive_quantile: float = DEFAULT_ADAPTIVE_QUANTILE
+    adaptive_margin: float = DEFAULT_ADAPTIVE_MARGIN
+    adaptive_floor_kwh: float = DEFAULT_ADAPTIVE_FLOOR_KWH
+    max_power_kw: float | None = None
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH
+    power_crosscheck: bool = DEFAULT_POWER_CROSSCHECK
+    crosscheck_tolerance: float = DEFAULT_CROSSCHECK_TOLERANCE
+    crosscheck_slack_kwh: float = DEFAULT_CROSSCHECK_SLACK_KWH
+
+
+@dataclass(frozen=True)
+class Zen15Options:
+    """Parsed entry options, with per-device overrides resolved on demand."""
+
+    forward_threshold_kwh: float
+    backward_threshold_kwh: float
+    reject_run_limit: int
+    min_write_interval: float
+    write_deadband_kwh: float
+    filter_mode: str = DEFAULT_FILTER_MODE
+    hampel_window: int = DEFAULT_HAMPEL_WINDOW
+    hampel_k: float = DEFAULT_HAMPEL_K
+    hampel_min_kwh: float = DEFAULT_HAMPEL_MIN_KWH
+    adaptive_quantile: float = DEFAULT_ADAPTIVE_QUANTILE
+    adaptive_margin: float = DEFAULT_ADAPTIVE_MARGIN
+    adaptive_floor_kwh: float = DEFAULT_ADAPTIVE_FLOOR_KWH
+    power_check: bool = DEFAULT_POWER_CHECK
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH
+    power_crosscheck: bool = DEFAULT_POWER_CROSSCHECK
+    crosscheck_tolerance: float = DEFAULT_CROSSCHECK_TOLERANCE
+    crosscheck_slack_kwh: float = DEFAULT_CROSSCHECK_SLACK_KWH
+    periods: tuple[str, ...] = ()
+    area_totals: bool = DEFAULT_AREA_TOTALS
+    instrumentation: bool = DEFAULT_INSTRUMENTATION
+    glitch_detection: bool = DEFAULT_GLITCH_DETECTION
+    glitch_min_devices: int = DEFAULT_GLITCH_MIN_DEVICES
+    glitch_window_s: float = DEFAULT_GLITCH_WINDOW_S
+    glitch_quarantine_s: float = DEFAULT_GLITCH_QUARANTINE_S
+    per_device_forward: Mapping[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_entry(cls, entry: ConfigEntry) -> Zen15Options:
+        per_device: Dict[str, float] = _get(entry, CONF_PER_DEVICE_THRESHOLDS, {}) or {}
+        periods = _get(entry, CONF_PERIOD_COUNTERS, DEFAULT_PERIOD_COUNTERS) or []
+        return cls(
+            forward_threshold_kwh=float(
+                _get(entry, CONF_FORWARD_THRESHOLD_KWH, DEFAULT_FORWARD_THRESHOLD_KWH)
+            ),
+            backward_threshold_kwh=float(
+                _get(entry, CONF_BACKWARD_THRESHOLD_KWH, DEFAULT_BACKWARD_THRESHOLD_KWH)
+            ),
+            reject_run_limit=int(
+                _get(entry, CONF_REJECT_RUN_LIMIT, DEFAULT_REJECT_RUN_LIMIT)
+            ),
+            min_write_interval=float(
+                _get(entry, CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL)
+            ),
+            write_deadband_kwh=float(
+                _get(entry, CONF_WRITE_DEADBAND_KWH, DEFAULT_WRITE_DEADBAND_KWH)
+            ),
+            filter_mode=str(_get(entry, CONF_FILTER_MODE, DEFAULT_FILTER_MODE)),
+            hampel_window=int(_get(entry, CONF_HAMPEL_WINDOW, DEFAULT_HAMPEL_WINDOW)),
+            hampel_k=float(_get(entry, CONF_HAMPEL_K, DEFAULT_HAMPEL_K)),
+            hampel_min_kwh=float(
+                _get(entry, CONF_HAMPEL_MIN_KWH, DEFAULT_HAMPEL_MIN_KWH)
+            ),
+            adaptive_quantile=float(
+                _get(entry, CONF_ADAPTIVE_QUANTILE, DEFAULT_ADAPTIVE_QUANTILE)
+            ),
+            adaptive_margin=float(
+                _get(entry, CONF_ADAPTIVE_MARGIN, DEFAULT_ADAPTIVE_MARGIN)
+            ),
+            adaptive_floor_kwh=float(
+                _get(entry, CONF_ADAPTIVE_FLOOR_KWH, DEFAULT_ADAPTIVE_FLOOR_KWH)
+            ),
+            power_check=bool(_get(entry, CONF_POWER_CHECK, DEFAULT_POWER_CHECK)),
+            power_tolerance=float(
+                _get(entry, CONF_POWER_TOLERANCE, DEFAULT_POWER_TOLERANCE)
+            ),
+            energy_resolution_kwh=float(
+                _get(entry, CONF_ENERGY_RESOLUTION_KWH, DEFAULT_ENERGY_RESOLUTION_KWH)
+            ),
+            power_crosscheck=bool(
+                _get(entry, CONF_POWER_CROSSCHECK, DEFAULT_POWER_CROSSCHECK)
+            ),
+            crosscheck_tolerance=float(
+                _get(entry, CONF_CROSSCHECK_TOLERANCE, DEFAULT_CROSSCHECK_TOLERANCE)
+            ),
+            crosscheck_slack_kwh=float(
+                _get(entry, CONF_CROSSCHECK_SLACK_KWH, DEFAULT_CROSSCHECK_SLACK_KWH)
+            ),
+            # Fixed order, so equal selections compare equal
+            periods=tuple(p for p in PERIODS if p in periods),
+            area_totals=bool(_get(entry, CONF_AREA_TOTALS, DEFAULT_AREA_TOTALS)),
+            instrumentation=bool(
+                _get(entry, CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION)
+            ),
+            glitch_detection=bool(
+                _get(entry, CONF_GLITCH_DETECTION, DEFAULT_GLITCH_DETECTION)
+            ),
+            glitch_min_devices=int(
+                _get(entry, CONF_GLITCH_MIN_DEVICES, DEFAULT_GLITCH_MIN_DEVICES)
+            ),
+            glitch_window_s=float(
+                _get(entry, CONF_GLITCH_WINDOW_S, DEFAULT_GLITCH_WINDOW_S)
+            ),
+            glitch_quarantine_s=float(
+                _get(entry, CONF_GLITCH_QUARANTINE_S, DEFAULT_GLITCH_QUARANTINE_S)
+            ),
+            per_device_forward={k: float(v) for k, v in per_device.items()},
+        )
+
+    def for_device(
+        self,
+        device_id: str,
+        model: str | None = None,
+    ) -> Zen15DeviceSettings:
+        """Settings for one device; ``model`` selects its rated maximum load."""
+        return Zen15DeviceSettings(
+            forward_threshold_kwh=self.per_device_forward.get(
+                device_id, self.forward_threshold_kwh
+            ),
+            backward_threshold_kwh=self.backward_threshold_kwh,
+            reject_run_limit=self.reject_run_limit,
+            min_write_interval=self.min_write_interval,
+            write_deadband_kwh=self.write_deadband_kwh,
+            filter_mode=self.filter_mode,
+            hampel_window=self.hampel_window,
+            hampel_k=self.hampel_k,
+            hampel_min_kwh=self.hampel_min_kwh,
+            adaptive_quantile=self.adaptive_quantile,
+            adaptive_margin=self.adaptive_margin,
+            adaptive_floor_kwh=self.adaptive_floor_kwh,
+            max_power_kw=model_max_power_kw(model) if self.power_check else None,
+            power_tolerance=self.power_tolerance,
+            energy_resolution_kwh=self.energy_resolution_kwh,
+            power_crosscheck=self.power_crosscheck,
+            crosscheck_tolerance=self.crosscheck_tolerance,
+            crosscheck_slack_kwh=self.crosscheck_slack_kwh,
+        )
+
+
+def prune_overrides(
+    per_device: Mapping[str, float],
+    forward_threshold_kwh: float,
+) -> Dict[str, float]:
+    """Keep only per-device thresholds that differ from the global one."""
+    forward = float(forward_threshold_kwh)
+    return {
+        dev_id: float(value)
+        for dev_id, value in per_device.items()
+        if float(value) != forward
+    }
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Protocol, Set
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .const import PERIOD_DAILY, PERIOD_HOURLY, PERIODS
+
+
+def period_start(period: str, now: datetime) -> datetime:
+    """Local start of the hour / day / month that contains ``now``."""
+    local = dt_util.as_local(now)
+    if period == PERIOD_HOURLY:
+        return local.replace(minute=0, second=0, microsecond=0)
+    if period == PERIOD_DAILY:
+        return dt_util.start_of_local_day(local)
+    return dt_util.start_of_local_day(local.date().replace(day=1))
+
+
+def next_period_start(period: str, now: datetime) -> datetime:
+    """Local start of the period after the one that contains ``now``."""
+    start = period_start(period, now)
+    if period == PERIOD_HOURLY:
+        # Step in UTC so DST changes still give exactly one hour
+        return dt_util.as_local(dt_util.as_utc(start) + timedelta(hours=1))
+    if period == PERIOD_DAILY:
+        return dt_util.start_of_local_day(start.date() + timedelta(days=1))
+    return dt_util.start_of_local_day(
+        (start.date() + timedelta(days=32)).replace(day=1)
+    )
+
+
+class Zen15PeriodCounter(Protocol):
+    """What the clock needs from a period counter entity."""
+
+    period: str
+
+    def async_rollover(self, start: datetime) -> None: ...
+
+
+class Zen15PeriodClock:
+    """One rollover timer per config entry for every period counter.
+
+    Counters are plain accumulators fed from the energy sensor's own raw
+    update, so they need no subscription of their own. The clock only wakes
+    up on the next local boundary of any enabled period and zeroes the
+    counters of the periods that actually rolled over.
+    """
+
+    def __init__(self, hass: HomeAssistant, periods: Iterable[str]) -> None:
+        self.hass = hass
+        self.periods = tuple(p for p in PERIODS if p in set(periods))
+        self._starts: Dict[str, datetime] = {}
+        self._counters: Dict[str, Set[Zen15PeriodCounter]] = {
+            p: set() for p in self.periods
+        }
+        self._unsub = None
+
+    @callback
+    def async_start(self) -> None:
+        now = dt_util.now()
+        self._starts = {p: period_start(p, now) for p in self.periods}
+        self._async_schedule(now)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def current_start(self, period: str) -> datetime:
+        """Start of the running period (as of the last boundary)."""
+        return self._starts[period]
+
+    @callback
+    def async_register(self, counter: Zen15PeriodCounter) -> None:
+        self._counters[counter.period].add(counter)
+
+    @callback
+    def async_unregister(self, counter: Zen15PeriodCounter) -> None:
+        self._counters[counter.period].discard(counter)
+
+    @callback
+    def _async_schedule(self, now: datetime) -> None:
+        if not self.periods:
+            return
+        point = min(next_period_start(p, now) for p in self.periods)
+        self._unsub = async_track_point_in_time(self.hass, self._async_tick, point)
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        self._unsub = None
+        for period in self.periods:
+            start = period_start(period, now)
+            if start == self._starts[period]:
+                continue
+            self._starts[period] = start
+            for counter in list(self._counters[period]):
+                counter.async_rollover(start)
+        self._async_schedule(now)
@@ -0,0 +1,458 @@
+"""Vectorized offline replay of raw ZEN15/ZEN04 kWh traces.
+
+Runs the exact filter semantics of ``engine.Zen15FilterState`` over
+exported histories (many devices, millions of rows) with NumPy, e.g. to
+audit months of data or to check threshold changes before rollout.
+
+Run it as a module of the integration, from the directory that holds
+``custom_components`` (Home Assistant must be importable, as in its own
+environment)::
+
+    python -m custom_components.zen15_cleaner.replay history.csv --verify
+    python -m custom_components.zen15_cleaner.replay history.parquet --out filtered.csv
+
+The defaults are the integration's: ``threshold`` mode with the implied-power
+check on at the ZEN15/ZEN04 rating (1.8 kW). The ``hampel`` and ``adaptive``
+modes and the power cross-check are not modelled.
+
+Input columns follow Home Assistant's history export: ``entity_id``,
+``state`` and ``last_changed`` (ISO-8601 or epoch seconds). Rows whose
+state is not a number (``unknown``, ``unavailable`` …) are skipped, exactly
+like the live sensor skips them.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .const import (
+    DEFAULT_BACKWARD_THRESHOLD_KWH,
+    DEFAULT_ENERGY_RESOLUTION_KWH,
+    DEFAULT_FORWARD_THRESHOLD_KWH,
+    DEFAULT_POWER_TOLERANCE,
+    DEFAULT_REJECT_RUN_LIMIT,
+    MODEL_MAX_POWER_KW,
+)
+from .engine import (
+    STATUS_ACCEPTED,
+    STATUS_BASELINE,
+    STATUS_HEALED,
+    STATUS_RESET,
+    STATUS_SPIKE,
+    Zen15FilterState,
+)
+
+# ZEN15/ZEN04 rating; power_check is on by default
+DEFAULT_MAX_POWER_KW = MODEL_MAX_POWER_KW["zen15"]
+
+
+@dataclass
+class ReplayResult:
+    """Per-row replay output, sorted by (device, timestamp)."""
+
+    device_ids: List[str]       # code -> entity_id
+    device: np.ndarray          # int32 device code per row
+    timestamp: np.ndarray       # float64 epoch seconds
+    raw: np.ndarray             # float64 raw kWh
+    status: np.ndarray          # int8 engine STATUS_* per row
+    delta: np.ndarray           # float64 raw delta (0 for baselines)
+    delta_clean: np.ndarray     # float64 energy added
+    total: np.ndarray           # float64 virtual total after the row
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One dict per device: final total, accepted kWh, spike/reset counts."""
+        n_dev = len(self.device_ids)
+        accepted = np.bincount(self.device, weights=self.delta_clean, minlength=n_dev)
+        spikes = np.bincount(
+            self.device, weights=self.status == STATUS_SPIKE, minlength=n_dev
+        )
+        resets = np.bincount(
+            self.device, weights=self.status == STATUS_RESET, minlength=n_dev
+        )
+        heals = np.bincount(
+            self.device, weights=self.status == STATUS_HEALED, minlength=n_dev
+        )
+        rows = np.bincount(self.device, minlength=n_dev)
+
+        # Last row of each device holds its final total
+        last_idx = np.flatnonzero(np.r_[self.device[1:] != self.device[:-1], True])
+        final = np.zeros(n_dev)
+        final[self.device[last_idx]] = self.total[last_idx]
+
+        return [
+            {
+                "entity_id": self.device_ids[code],
+                "rows": int(rows[code]),
+                "virtual_total_kwh": float(final[code]),
+                "accepted_kwh": float(accepted[code]),
+                "spikes": int(spikes[code]),
+                "resets": int(resets[code]),
+                "heals": int(heals[code]),
+            }
+            for code in range(n_dev)
+        ]
+
+
+# ---------------------------------------------------------
+# VECTORIZED FILTER
+# ---------------------------------------------------------
+
+def _forward_per_device(
+    device_ids: Sequence[str],
+    forward_threshold_kwh: float,
+    per_device_forward: Mapping[str, float] | None,
+) -> np.ndarray:
+    overrides = per_device_forward or {}
+    return np.array(
+        [float(overrides.get(d, forward_threshold_kwh)) for d in device_ids]
+    )
+
+
+def replay_arrays(
+    device_ids: Sequence[str],
+    device: np.ndarray,
+    timestamp: np.ndarray,
+    raw: np.ndarray,
+    forward_threshold_kwh: float = DEFAULT_FORWARD_THRESHOLD_KWH,
+    backward_threshold_kwh: float = DEFAULT_BACKWARD_THRESHOLD_KWH,
+    per_device_forward: Mapping[str, float] | None = None,
+    reject_run_limit: int = DEFAULT_REJECT_RUN_LIMIT,
+    max_power_kw: float | None = DEFAULT_MAX_POWER_KW,
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+) -> ReplayResult:
+    """Replay every device's trace at once.
+
+    ``per_device_forward`` maps entity_id -> forward threshold for devices
+    that override the global value. ``max_power_kw`` is the rated load of
+    the engine's implied-power plausibility check (None disables it).
+
+    While no spike is pending, the engine's baseline is simply the previous
+    reading, so those rows are decided with plain array math. A spike makes
+    the state "dirty" (the baseline is held and a self-heal run may start):
+    from each such row the streaming engine takes over until the run ends,
+    and the vectorized decisions are valid again from the next row on.
+    """
+    device = np.asarray(device, dtype=np.int32)
+    timestamp = np.asarray(timestamp, dtype=np.float64)
+    raw = np.asarray(raw, dtype=np.float64)
+
+    # Non-numeric states never reach the engine
+    keep = np.isfinite(raw)
+    device, timestamp, raw = device[keep], timestamp[keep], raw[keep]
+
+    order = np.lexsort((timestamp, device))
+    device, timestamp, raw = device[order], timestamp[order], raw[order]
+
+    n = raw.shape[0]
+    first = np.ones(n, dtype=bool)
+    if n:
+        first[1:] = device[1:] != device[:-1]
+
+    delta = np.zeros(n)
+    if n:
+        delta[1:] = np.diff(raw)
+    delta[first] = 0.0
+
+    fwd_dev = _forward_per_device(device_ids, forward_threshold_kwh, per_device_forward)
+    fwd = fwd_dev[device]
+    bwd = float(backward_threshold_kwh)
+
+    limit = fwd
+    if max_power_kw is not None and n:
+        elapsed = np.zeros(n)
+        elapsed[1:] = np.diff(timestamp)
+        plausible = (
+            float(max_power_kw) * (1.0 + power_tolerance) * (elapsed / 3600.0)
+            + energy_resolution_kwh
+        )
+        limit = np.where((elapsed > 0) & (plausible < fwd), plausible, fwd)
+
+    # Same decision order as Zen15FilterState.feed
+    status = np.full(n, STATUS_ACCEPTED, dtype=np.int8)
+    status[delta < -bwd] = STATUS_RESET
+    status[delta > limit] = STATUS_SPIKE
+    status[first] = STATUS_BASELINE
+
+    delta_clean = np.where((status == STATUS_ACCEPTED) & (delta > 0), delta, 0.0)
+
+    # Dirty stretches: stream from each spike until the engine is clean again
+    clean_from = 0
+    for i in np.flatnonzero(status == STATUS_SPIKE):
+        if i < clean_from:
+            continue  # already covered by the previous stretch
+        code = int(device[i])
+        flt = Zen15FilterState(
+            fwd_dev[code],
+            bwd,
+            reject_run_limit,
+            max_power_kw=max_power_kw,
+            power_tolerance=power_tolerance,
+            energy_resolution_kwh=energy_resolution_kwh,
+        )
+        flt.last_raw_value = float(raw[i - 1])
+        flt.baseline_timestamp = float(timestamp[i - 1])
+        j = i
+        while j < n and device[j] == code:
+            res = flt.feed(float(raw[j]), float(timestamp[j]))
+            status[j], delta[j], delta_clean[j] = res.status, res.delta, res.delta_clean
+            j += 1
+            if res.status != STATUS_SPIKE:
+                break
+        clean_from = j
+
+    # Per-device running total: global cumsum minus the value at group start
+    csum = np.cumsum(delta_clean)
+    start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    total = csum - csum[start] if n else csum
+
+    return ReplayResult(
+        device_ids=list(device_ids),
+        device=device,
+        timestamp=timestamp,
+        raw=raw,
+        status=status,
+        delta=delta,
+        delta_clean=delta_clean,
+        total=total,
+    )
+
+
+# ---------------------------------------------------------
+# STREAMING EQUIVALENCE CHECK
+# ---------------------------------------------------------
+
+def verify_against_streaming(
+    result: ReplayResult,
+    forward_threshold_kwh: float = DEFAULT_FORWARD_THRESHOLD_KWH,
+    backward_threshold_kwh: float = DEFAULT_BACKWARD_THRESHOLD_KWH,
+    per_device_forward: Mapping[str, float] | None = None,
+    reject_run_limit: int = DEFAULT_REJECT_RUN_LIMIT,
+    max_power_kw: float | None = DEFAULT_MAX_POWER_KW,
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+    atol: float = 1e-6,
+) -> List[str]:
+    """Re-run ``result`` through the streaming engine; return mismatch messages."""
+    ids = result.device_ids
+    fwd = _forward_per_device(ids, forward_threshold_kwh, per_device_forward)
+
+    states: Dict[int, Zen15FilterState] = {}
+    problems: List[str] = []
+
+    for i in range(result.raw.shape[0]):
+        code = int(result.device[i])
+        flt = states.get(code)
+        if flt is None:
+            flt = states[code] = Zen15FilterState(
+                fwd[code],
+                backward_threshold_kwh,
+                reject_run_limit,
+                max_power_kw=max_power_kw,
+                power_tolerance=power_tolerance,
+                energy_resolution_kwh=energy_resolution_kwh,
+            )
+
+        res = flt.feed(float(result.raw[i]), float(result.timestamp[i]))
+
+        if res.status != result.status[i] or abs(res.total - result.total[i]) > atol:
+            problems.append(
+                f"{ids[code]} row {i}: streaming status={res.status} "
+                f"total={res.total:.6f}, vectorized status={int(result.status[i])} "
+                f"total={result.total[i]:.6f}"
+            )
+            if len(problems) >= 20:
+                break
+
+    return problems
+
+
+# ---------------------------------------------------------
+# TRACE LOADING
+# ---------------------------------------------------------
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_state(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def load_trace(path: str) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Load a CSV or Parquet export into (device_ids, device, timestamp, raw).
+
+    Parquet (and fast CSV parsing) use pandas when it is installed; plain
+    CSV falls back to the standard library.
+    """
+    if path.endswith(".parquet"):
+        import pandas as pd  # Parquet support is optional
+
+        frame = pd.read_parquet(path, columns=["entity_id", "state", "last_changed"])
+        return _from_frame(frame)
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        frame = pd.read_csv(path, usecols=["entity_id", "state", "last_changed"])
+        return _from_frame(frame)
+
+    codes: Dict[str, int] = {}
+    device: List[int] = []
+    timestamp: List[float] = []
+    raw: List[float] = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            device.append(codes.setdefault(row["entity_id"], len(codes)))
+            timestamp.append(_parse_time(row["last_changed"]))
+            raw.append(_parse_state(row["state"]))
+
+    return (
+        list(codes),
+        np.array(device, dtype=np.int32),
+        np.array(timestamp, dtype=np.float64),
+        np.array(raw, dtype=np.float64),
+    )
+
+
+def _from_frame(frame) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    import pandas as pd
+
+    codes, uniques = pd.factorize(frame["entity_id"])
+    raw = pd.to_numeric(frame["state"], errors="coerce").to_numpy(dtype=np.float64)
+
+    when = frame["last_changed"]
+    if pd.api.types.is_numeric_dtype(when):
+        timestamp = when.to_numpy(dtype=np.float64)
+    else:
+        timestamp = (
+            pd.to_datetime(when, utc=True, format="ISO8601").astype("int64").to_numpy()
+            / 1e9
+        )
+
+    return [str(u) for u in uniques], codes.astype(np.int32), timestamp, raw
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay raw ZEN15/ZEN04 kWh histories through the ZEN15 Cleaner filter.",
+    )
+    parser.add_argument("trace", help="CSV or Parquet export (entity_id, state, last_changed)")
+    parser.add_argument("--forward", type=float, default=DEFAULT_FORWARD_THRESHOLD_KWH)
+    parser.add_argument("--backward", type=float, default=DEFAULT_BACKWARD_THRESHOLD_KWH)
+    parser.add_argument(
+        "--per-device",
+        help="JSON file mapping entity_id -> forward threshold (kWh)",
+    )
+    parser.add_argument("--reject-run-limit", type=int, default=DEFAULT_REJECT_RUN_LIMIT)
+    parser.add_argument(
+        "--max-power-kw",
+        type=float,
+        default=DEFAULT_MAX_POWER_KW,
+        help="Rated load of the implied-power check (default: 1.8, ZEN15/ZEN04)",
+    )
+    parser.add_argument(
+        "--no-power-check",
+        action="store_true",
+        help="Disable the implied-power check (like power_check: off)",
+    )
+    parser.add_argument("--power-tolerance", type=float, default=DEFAULT_POWER_TOLERANCE)
+    parser.add_argument(
+        "--energy-resolution", type=float, default=DEFAULT_ENERGY_RESOLUTION_KWH
+    )
+    parser.add_argument("--out", help="Write per-row results to this CSV file")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Cross-check every row against the streaming engine",
+    )
+    args = parser.parse_args(argv)
+    if args.no_power_check:
+        args.max_power_kw = None
+
+    per_device: Dict[str, float] | None = None
+    if args.per_device:
+        with open(args.per_device, encoding="utf-8") as fh:
+            per_device = {k: float(v) for k, v in json.load(fh).items()}
+
+    device_ids, device, timestamp, raw = load_trace(args.trace)
+    result = replay_arrays(
+        device_ids,
+        device,
+        timestamp,
+        raw,
+        args.forward,
+        args.backward,
+        per_device,
+        args.reject_run_limit,
+        args.max_power_kw,
+        args.power_tolerance,
+        args.energy_resolution,
+    )
+
+    writer = csv.DictWriter(
+        sys.stdout,
+        fieldnames=[
+            "entity_id", "rows", "virtual_total_kwh", "accepted_kwh", "spikes", "resets", "heals",
+        ],
+    )
+    writer.writeheader()
+    writer.writerows(result.summary())
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as fh:
+            out = csv.writer(fh)
+            out.writerow(["entity_id", "timestamp", "raw", "status", "delta", "delta_clean", "total"])
+            for i in range(result.raw.shape[0]):
+                out.writerow([
+                    result.device_ids[result.device[i]],
+                    result.timestamp[i],
+                    result.raw[i],
+                    int(result.status[i]),
+                    result.delta[i],
+                    result.delta_clean[i],
+                    result.total[i],
+                ])
+
+    if args.verify:
+        problems = verify_against_streaming(
+            result,
+            args.forward,
+            args.backward,
+            per_device,
+            args.reject_run_limit,
+            args.max_power_kw,
+            args.power_tolerance,
+            args.energy_resolution,
+        )
+        for line in problems:
+            print(line, file=sys.stderr)
+        if problems:
+            return 1
+        print(f"verified {result.raw.shape[0]} rows against the streaming engine", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, List, Dict
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import voluptuous as vol
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -9,29 +13,89 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
+    EVENT_HOMEASSISTANT_STOP,
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
+    PERCENTAGE,
     UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
 )
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers import entity_registry as er, device_registry as dr
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
 from homeassistant.helpers import entity_platform
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
-    CONF_FORWARD_THRESHOLD_KWH,
-    CONF_BACKWARD_THRESHOLD_KWH,
-    CONF_PER_DEVICE_THRESHOLDS,
-    DEFAULT_FORWARD_THRESHOLD_KWH,
-    DEFAULT_BACKWARD_THRESHOLD_KWH,
-    CONF_REJECT_RUN_LIMIT,
-    DEFAULT_REJECT_RUN_LIMIT,
+    DATA_DISPATCHER,
+    DATA_DISCOVERY,
+    DATA_SENSORS,
+    DATA_HEALTH_SENSORS,
+    DATA_CHECKPOINT,
+    DATA_OPTIONS,
+    DATA_PERIOD_CLOCK,
+    DATA_FLEET,
+    DATA_STATS,
+    DATA_GLITCH,
+    STATS_SENSORS,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    RESET_MODE_ALIGN,
+    RESET_MODE_ZERO,
+    RESET_MODES,
+    SIGNAL_DEVICE_ADDED,
+    SIGNAL_DEVICE_REBOUND,
+    SIGNAL_POWER_ADDED,
+)
+from .aggregate import Zen15FleetAggregate
+from .backfill import (
+    BACKFILL_SOURCE_STATES,
+    BACKFILL_SOURCE_STATISTICS,
+    BackfillJob,
+    async_run_backfill,
+)
+from .checkpoint import Zen15CheckpointStore
+from .correlation import Zen15GlitchGate
+from .discovery import (
+    Zen15DeviceRecord,
+    Zen15DiscoveryIndex,
+    filtered_unique_id,
+    fleet_unique_id,
+    health_unique_id,
+    period_unique_id,
+    power_filtered_unique_id,
+    stats_unique_id,
 )
+from .dispatcher import Zen15EventDispatcher
+from .engine import (
+    STATUS_HEALED,
+    STATUS_RESET,
+    STATUS_SPIKE,
+    FeedResult,
+    Zen15FilterState,
+    Zen15PowerFilter,
+)
+from .options import Zen15DeviceSettings
+from .health import Zen15DeviceHealth
+from .periods import Zen15PeriodClock
+from .stats import Zen15DeviceStats, Zen15FleetStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Only the instrumentation sensors poll; everything else is push-only
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# Health scores drift as the windows slide: one refresh pass for all plugs
+HEALTH_REFRESH_INTERVAL = timedelta(minutes=5)
 
 
 def _slug(text: str) -> str:
@@ -43,16 +107,6 @@ def _slug(text: str) -> str:
     )
 
 
-@dataclass
-class Zen15EnergySource:
-    """Represents the raw ZEN15/ZEN04 kWh sensor we wrap."""
-    device_id: str
-    device_name: str | None
-    manufacturer: str | None
-    model: str | None
-    raw_entity_id: str
-
-
 # ---------------------------------------------------------
 # PLATFORM SETUP
 # ---------------------------------------------------------
@@ -64,232 +118,441 @@ async def async_setup_entry(
 ) -> None:
     """Set up ZEN15/ZEN04 virtual filtered energy sensors."""
 
-    data = entry.data
-    opts = entry.options
+    dispatcher: Zen15EventDispatcher = hass.data[DOMAIN][entry.entry_id][
+        DATA_DISPATCHER
+    ]
 
-    global_forward = float(
-        opts.get(
-            CONF_FORWARD_THRESHOLD_KWH,
-            data.get(CONF_FORWARD_THRESHOLD_KWH, DEFAULT_FORWARD_THRESHOLD_KWH),
-        )
-    )
-    global_backward = float(
-        opts.get(
-            CONF_BACKWARD_THRESHOLD_KWH,
-            data.get(CONF_BACKWARD_THRESHOLD_KWH, DEFAULT_BACKWARD_THRESHOLD_KWH),
+    discovery: Zen15DiscoveryIndex = hass.data[DOMAIN][entry.entry_id][
+        DATA_DISCOVERY
+    ]
+
+    # Energy sensor per device, and the devices that have a power sensor
+    energy_sensors: Dict[str, Zen15CleanedEnergySensor] = {}
+    with_power: set[str] = set()
+
+    def _base_name(src: Zen15DeviceRecord) -> str:
+        return src.device_name or src.raw_entity_id.split(".")[-1]
+
+    def _settings(src: Zen15DeviceRecord) -> Zen15DeviceSettings:
+        # Read at build time so hot-plugged devices see the latest options
+        return hass.data[DOMAIN][entry.entry_id][DATA_OPTIONS].for_device(
+            src.device_id, src.model
         )
-    )
 
-    # kept only for compatibility
-    global_reject_run_limit = int(
-        opts.get(
-            CONF_REJECT_RUN_LIMIT,
-            data.get(CONF_REJECT_RUN_LIMIT, DEFAULT_REJECT_RUN_LIMIT),
+    def _build_power_sensor(
+        src: Zen15DeviceRecord, energy: Zen15CleanedEnergySensor
+    ) -> Zen15FilteredPowerSensor:
+        # The power sensor rides on the energy sensor's power subscription
+        with_power.add(src.device_id)
+        return Zen15FilteredPowerSensor(
+            energy=energy,
+            name=f"{_base_name(src)} Power Filtered",
+            unique_id=power_filtered_unique_id(src.device_id),
+            settings=_settings(src),
         )
-    )
 
-    per_device: Dict[str, float] = opts.get(
-        CONF_PER_DEVICE_THRESHOLDS,
-        data.get(CONF_PER_DEVICE_THRESHOLDS, {}),
-    ) or {}
+    def _build_sensors(src: Zen15DeviceRecord) -> List[SensorEntity]:
+        base_name = _base_name(src)
+        settings = _settings(src)
 
-    entity_reg = er.async_get(hass)
-    device_reg = dr.async_get(hass)
+        name = f"{base_name} Energy Filtered"
+        unique_id = filtered_unique_id(src.device_id)  # stable forever
+
+        energy = Zen15CleanedEnergySensor(
+            hass=hass,
+            dispatcher=dispatcher,
+            entry_id=entry.entry_id,
+            source=src,
+            name=name,
+            unique_id=unique_id,
+            settings=settings,
+        )
+        energy_sensors[src.device_id] = energy
+        with_power.discard(src.device_id)
+        health = Zen15HealthSensor(
+            energy=energy,
+            name=f"{base_name} Filter Health",
+            unique_id=health_unique_id(src.device_id),
+        )
+        entities: List[SensorEntity] = [energy, health]
+        # Only plugs with a W sensor get one; a later one arrives via hot-plug
+        if src.power_entity_id:
+            entities.append(_build_power_sensor(src, energy))
+
+        # Period counters are fed from the energy sensor's raw update too
+        clock: Zen15PeriodClock | None = hass.data[DOMAIN][entry.entry_id].get(
+            DATA_PERIOD_CLOCK
+        )
+        for period in clock.periods if clock is not None else ():
+            entities.append(
+                Zen15PeriodEnergySensor(
+                    energy=energy,
+                    clock=clock,
+                    period=period,
+                    name=f"{base_name} Energy {period.capitalize()}",
+                    unique_id=period_unique_id(src.device_id, period),
+                    settings=settings,
+                )
+            )
+        return entities
 
-    zen15_sources: List[Zen15EnergySource] = []
+    # Create the real filtered sensor entities
+    entities: List[SensorEntity] = [
+        ent for src in discovery.sources for ent in _build_sensors(src)
+    ]
 
-    # Discovery: find every Zooz ZEN15/ZEN04 and its ORIGINAL energy sensor.
-    for device in device_reg.devices.values():
-        manufacturer = (device.manufacturer or "").strip()
-        model = (device.model or "").strip()
+    # Health sensors are refreshed together; they never write per reading
+    @callback
+    def _async_refresh_health(_now) -> None:
+        for ent in list(hass.data[DOMAIN][entry.entry_id][DATA_HEALTH_SENSORS]):
+            ent.async_refresh()
 
-        if manufacturer.lower() != "zooz":
-            continue
-        if "zen15" not in model.lower() and "zen04" not in model.lower():
-            continue
+    entry.async_on_unload(
+        async_track_time_interval(hass, _async_refresh_health, HEALTH_REFRESH_INTERVAL)
+    )
 
-        candidates: list[str] = []
+    # Fleet total (and per-area totals), fed by every filtered sensor
+    fleet: Zen15FleetAggregate = hass.data[DOMAIN][entry.entry_id][DATA_FLEET]
 
-        # Collect ONLY non-integration sensors (the original ZEN15/ZEN04 energy sensors)
-        for ent in er.async_entries_for_device(
-            entity_reg,
-            device.id,
-            include_disabled_entities=False,
-        ):
-            if ent.domain != "sensor":
-                continue
-
-            # IMPORTANT: Prevent wrapping our own sensors → avoids infinite filter chains
-            if ent.platform == DOMAIN:
-                continue
-
-            candidates.append(ent.entity_id)
-
-        raw_entity_id = await _find_energy_entity_for_device(hass, candidates)
-        if not raw_entity_id:
-            continue
-
-        zen15_sources.append(
-            Zen15EnergySource(
-                device_id=device.id,
-                device_name=device.name or device.name_by_user,
-                manufacturer=manufacturer,
-                model=model,
-                raw_entity_id=raw_entity_id,
-            )
+    def _build_fleet_sensor(area_id: str | None) -> Zen15FleetEnergySensor:
+        if area_id is None:
+            name = "Zooz Plug Loads Energy"
+        else:
+            area = ar.async_get(hass).async_get_area(area_id)
+            name = f"Zooz Plug Loads {area.name if area else area_id} Energy"
+        return Zen15FleetEnergySensor(
+            fleet=fleet,
+            area_id=area_id,
+            name=name,
+            unique_id=fleet_unique_id(entry.entry_id, area_id),
         )
 
-    # Build expected filtered sensors BEFORE entity creation
-    expected_sensor_uids = {
-        f"{src.device_id}_energy_filtered" for src in zen15_sources
-    }
-
-    # AUTO-CLEANUP: Remove stale duplicate filtered sensors
-    for ent in list(entity_reg.entities.values()):
-        if ent.platform != DOMAIN:
-            continue
-        if ent.config_entry_id != entry.entry_id:
-            continue
-        if ent.domain != "sensor":
-            continue
-
-        if ent.unique_id not in expected_sensor_uids:
-            # _2, _3, _4, filters-of-filters – nuke them
-            entity_reg.async_remove(ent.entity_id)
-
-    # Clean up old / empty zen15_cleaner devices from earlier versions
-    for device in list(device_reg.devices.values()):
-        # Only touch devices that belong to this config entry
-        if entry.entry_id not in device.config_entries:
-            continue
-
-        # Only touch devices owned by our integration
-        if not any(iden[0] == DOMAIN for iden in device.identifiers):
-            continue
-
-        # Does this device still have any zen15_cleaner entities?
-        ents = er.async_entries_for_device(
-            entity_reg,
-            device.id,
-            include_disabled_entities=True,
-        )
-        has_our_entities = any(ent.platform == DOMAIN for ent in ents)
+    entities.append(_build_fleet_sensor(None))
+    if fleet.per_area:
+        areas = set(fleet.areas)
+        areas.update(src.area_id for src in discovery.sources if src.area_id)
+        entities.extend(_build_fleet_sensor(area_id) for area_id in sorted(areas))
 
-        if not has_our_entities:
-            # No more entities for this zen15_cleaner device → safe to delete
-            device_reg.async_remove_device(device.id)
+        @callback
+        def _async_new_area(area_id: str) -> None:
+            async_add_entities([_build_fleet_sensor(area_id)])
+
+        fleet.async_on_new_area(_async_new_area)
+        entry.async_on_unload(lambda: fleet.async_on_new_area(None))
+
+    # Throttled instrumentation sensors (polled, never written per event)
+    stats: Zen15FleetStats | None = hass.data[DOMAIN][entry.entry_id].get(DATA_STATS)
+    if stats is not None:
+        entities.extend(
+            Zen15StatsSensor(stats, key, stats_unique_id(entry.entry_id, key))
+            for key in STATS_SENSORS
+        )
 
-    # Create the real filtered sensor entities
-    entities: List[SensorEntity] = []
+    if entities:
+        async_add_entities(entities)
 
-    for src in zen15_sources:
-        base_name = src.device_name or src.raw_entity_id.split(".")[-1]
+    # Hot-plug: a newly paired plug only costs its own entities
+    @callback
+    def _async_device_added(src: Zen15DeviceRecord) -> None:
+        async_add_entities(_build_sensors(src))
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_DEVICE_ADDED.format(entry.entry_id),
+            _async_device_added,
+        )
+    )
 
-        forward = per_device.get(src.device_id, global_forward)
-        backward = global_backward
+    @callback
+    def _async_power_added(src: Zen15DeviceRecord) -> None:
+        energy = energy_sensors.get(src.device_id)
+        if energy is None or src.device_id in with_power:
+            return
+        async_add_entities([_build_power_sensor(src, energy)])
 
-        name = f"{base_name} Energy Filtered"
-        unique_id = f"{src.device_id}_energy_filtered"  # stable forever
-
-        entities.append(
-            Zen15CleanedEnergySensor(
-                hass=hass,
-                source=src,
-                name=name,
-                unique_id=unique_id,
-                forward_threshold_kwh=forward,
-                backward_threshold_kwh=backward,
-                reject_run_limit=global_reject_run_limit,
-            )
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_POWER_ADDED.format(entry.entry_id),
+            _async_power_added,
         )
-
-    if entities:
-        async_add_entities(entities)
+    )
 
     # Register our public entity service
     platform = entity_platform.async_get_current_platform()
     platform.async_register_entity_service(
         "reset_filtered",
-        {},
+        {vol.Optional("mode", default=RESET_MODE_ZERO): vol.In(RESET_MODES)},
         "async_reset_filtered",
     )
+    platform.async_register_entity_service(
+        "backfill_statistics",
+        {
+            vol.Required("start"): cv.datetime,
+            vol.Optional("end"): cv.datetime,
+            vol.Optional("source", default=BACKFILL_SOURCE_STATES): vol.In(
+                [BACKFILL_SOURCE_STATES, BACKFILL_SOURCE_STATISTICS]
+            ),
+            vol.Optional("adjust_existing", default=True): cv.boolean,
+        },
+        "async_backfill_statistics",
+    )
+
+
+def _state_watts(state) -> float | None:
+    """Numeric W value of a power state, or None if it has none."""
+    if state is None:
+        return None
+    try:
+        return float(state.state)
+    except (TypeError, ValueError):
+        return None
+
+
+def _max_power_w(settings: Zen15DeviceSettings) -> float | None:
+    """Hard ceiling of the filtered power sensor (None without a rated load)."""
+    if settings.max_power_kw is None:
+        return None
+    return settings.max_power_kw * 1000.0 * (1.0 + settings.power_tolerance)
 
 
 # ---------------------------------------------------------
-# RAW SENSOR PICKER
+# RESTORE DATA
 # ---------------------------------------------------------
 
-async def _find_energy_entity_for_device(
-    hass: HomeAssistant,
-    entity_ids: list[str],
-) -> str | None:
-    """Pick the best candidate raw kWh energy sensor."""
-    best = None
+class Zen15RestoreData(ExtraStoredData):
+    """Restore-critical filter values, kept out of state attributes."""
+
+    def __init__(self, virtual_total: float, last_raw_value: float | None) -> None:
+        self.virtual_total = virtual_total
+        self.last_raw_value = last_raw_value
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "virtual_total": self.virtual_total,
+            "last_raw_value": self.last_raw_value,
+        }
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Zen15RestoreData | None:
+        try:
+            total = float(restored["virtual_total"])
+            last_raw = restored.get("last_raw_value")
+            return cls(total, None if last_raw is None else float(last_raw))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+# ---------------------------------------------------------
+# WRITE SCHEDULER
+# ---------------------------------------------------------
+
+class _CoalescedWriter(SensorEntity):
+    """State-write scheduler shared by the filtered energy and power sensors.
+
+    Subclasses set ``_native_value`` and report their status flags through
+    ``_write_flags``; every state write goes through ``_async_schedule_write``.
+    """
+
+    # Push-only: periodic polling would write state behind the scheduler's back
+    _attr_should_poll = False
+    _native_value: float | None = None
+    _write_stats: Zen15DeviceStats | None = None  # set with instrumentation on
+
+    def _init_write_scheduler(self, min_write_interval: float, deadband: float) -> None:
+        self._min_write_interval = max(0.0, float(min_write_interval))
+        self._write_deadband = max(0.0, float(deadband))
+        self._last_write_monotonic: float | None = None
+        self._written_value: float | None = None
+        self._written_flags: tuple[bool, ...] | None = None
+        self._unsub_write_timer = None
+        self._writes_performed = 0
+        self._writes_saved = 0
+
+    def _write_flags(self) -> tuple[bool, ...]:
+        """Status flags; a change in any of them is always written."""
+        return ()
+
+    @callback
+    def _async_schedule_write(self, force: bool = False) -> None:
+        """Write state now, later, or not at all.
+
+        Writes are skipped when neither the value (beyond the deadband) nor
+        the status flags changed, and bursts inside ``min_write_interval``
+        collapse into a single delayed write.
+        """
+        if force:
+            self._async_write_now()
+            return
 
-    for entity_id in entity_ids:
-        state = hass.states.get(entity_id)
-        if not state:
-            continue
+        if self._written_value is not None and self._native_value is not None:
+            moved = abs(self._native_value - self._written_value)
+            if self._write_flags() == self._written_flags and (
+                moved == 0.0 or moved < self._write_deadband
+            ):
+                self._writes_saved += 1
+                return
+
+        if self._unsub_write_timer is not None:
+            # A write is already queued; it will pick up the latest values
+            self._writes_saved += 1
+            return
+
+        now = time.monotonic()
+        if self._last_write_monotonic is None:
+            wait = 0.0
+        else:
+            wait = self._min_write_interval - (now - self._last_write_monotonic)
 
-        attrs = state.attributes
+        if wait <= 0:
+            self._async_write_now()
+            return
 
-        if attrs.get("unit_of_measurement", "").lower() not in ("kwh", "kw·h", "kw/h"):
-            continue
-        if attrs.get("device_class") != SensorDeviceClass.ENERGY:
-            continue
+        self._unsub_write_timer = async_call_later(
+            self.hass, wait, self._async_write_timer_fired
+        )
 
-        if attrs.get("state_class") == SensorStateClass.TOTAL_INCREASING:
-            return entity_id
+    @callback
+    def _async_write_timer_fired(self, _now) -> None:
+        self._unsub_write_timer = None
+        self._async_write_now()
 
-        if best is None:
-            best = entity_id
+    @callback
+    def _async_flush_write(self) -> None:
+        """Write immediately if a change is still waiting on the timer."""
+        if self._unsub_write_timer is None:
+            return
+        self._async_write_now()
 
-    return best
+    @callback
+    def _async_write_now(self) -> None:
+        if self._unsub_write_timer is not None:
+            self._unsub_write_timer()
+            self._unsub_write_timer = None
+
+        self._last_write_monotonic = time.monotonic()
+        self._written_value = self._native_value
+        self._written_flags = self._write_flags()
+        self._writes_performed += 1
+
+        stats = self._write_stats
+        if stats is None:
+            self.async_write_ha_state()
+            return
+        start = time.perf_counter()
+        self.async_write_ha_state()
+        stats.record_write(time.perf_counter() - start)
 
 
 # ---------------------------------------------------------
 # FILTERED VIRTUAL ENERGY SENSOR
 # ---------------------------------------------------------
 
-class Zen15CleanedEnergySensor(RestoreEntity, SensorEntity):
+class Zen15CleanedEnergySensor(RestoreEntity, _CoalescedWriter):
     """Zero-based, spike-filtered virtual energy sensor for a ZEN15."""
 
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
 
+    # Diagnostics change on nearly every update; keep them out of the recorder
+    _unrecorded_attributes = frozenset(
+        {
+            "raw_entity_id",
+            "virtual_total_kwh",
+            "last_raw_value",
+            "last_delta_kwh",
+            "forward_threshold_kwh",
+            "backward_threshold_kwh",
+            "filter_mode",
+            "effective_forward_threshold_kwh",
+            "learned_forward_threshold_kwh",
+            "learned_rate_kw",
+            "max_power_kw",
+            "implied_power_kw",
+            "power_entity_id",
+            "power_estimate_kwh",
+            "power_adjustments",
+            "reset_detected",
+            "spike_ignored",
+            "self_healed",
+            "reject_run_count",
+            "reject_run_limit",
+            "glitch_held",
+            "state_writes",
+            "state_writes_saved",
+        }
+    )
+
     def __init__(
         self,
         hass: HomeAssistant,
-        source: Zen15EnergySource,
+        dispatcher: Zen15EventDispatcher,
+        entry_id: str,
+        source: Zen15DeviceRecord,
         name: str,
         unique_id: str,
-        forward_threshold_kwh: float,
-        backward_threshold_kwh: float,
-        reject_run_limit: int = DEFAULT_REJECT_RUN_LIMIT,
+        settings: Zen15DeviceSettings,
     ) -> None:
         self.hass = hass
+        self._dispatcher = dispatcher
+        self._entry_id = entry_id
         self._source = source
         self._attr_name = name
         self._attr_unique_id = unique_id
 
-        self._forward_threshold_kwh = float(forward_threshold_kwh)
-        self._backward_threshold_kwh = float(backward_threshold_kwh)
-
-        self._reject_run_limit = reject_run_limit  # kept for compatibility
-        self._reject_run_count = 0
+        # All filtering math lives in the HA-independent engine
+        self._settings = settings
+        self._filter = Zen15FilterState(
+            forward_threshold_kwh=settings.forward_threshold_kwh,
+            backward_threshold_kwh=settings.backward_threshold_kwh,
+            reject_run_limit=settings.reject_run_limit,
+            filter_mode=settings.filter_mode,
+            hampel_window=settings.hampel_window,
+            hampel_k=settings.hampel_k,
+            hampel_min_kwh=settings.hampel_min_kwh,
+            adaptive_quantile=settings.adaptive_quantile,
+            adaptive_margin=settings.adaptive_margin,
+            adaptive_floor_kwh=settings.adaptive_floor_kwh,
+            max_power_kw=settings.max_power_kw,
+            power_tolerance=settings.power_tolerance,
+            energy_resolution_kwh=settings.energy_resolution_kwh,
+        )
+        self._filter.set_power_crosscheck(
+            settings.power_crosscheck,
+            settings.crosscheck_tolerance,
+            settings.crosscheck_slack_kwh,
+        )
 
         self._raw_entity_id = source.raw_entity_id
+        # Bound while the cross-check or the filtered power sensor needs it
+        self._power_entity_id: str | None = None
+        self._power_sensor: Zen15FilteredPowerSensor | None = None
+        self._period_sensors: List[Zen15PeriodEnergySensor] = []
 
-        self._virtual_total = 0.0
-        self._last_raw_value: float | None = None
-        self._last_delta_kwh: float | None = None
-
-        self._reset_detected = False
-        self._spike_ignored = False
+        # Hour / day sliding windows of spikes, resets and accepted energy
+        self.health = Zen15DeviceHealth()
 
         self._native_value: float | None = None
-        self._unsub_state = None
+        self._unsub_source = None
+        self._unsub_power = None
+        self._backfill_task = None
+        self._checkpoint: Zen15CheckpointStore | None = None
+        self._fleet: Zen15FleetAggregate | None = None
+
+        # Our gate on the entry-wide glitch monitor
+        self._glitch: Zen15GlitchGate | None = None
+
+        # Swapped for the timed wrapper when instrumentation is on, so the
+        # plain path pays nothing for it
+        self._stats: Zen15DeviceStats | None = None
+        self._raw_handler = self._apply_raw_state
+
+        # Write scheduler: coalesce bursts and skip invisible updates
+        self._init_write_scheduler(
+            settings.min_write_interval, settings.write_deadband_kwh
+        )
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, source.device_id)},
@@ -304,32 +567,169 @@ class Zen15CleanedEnergySensor(RestoreEntity, SensorEntity):
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
+        flt = self._filter
         return {
             "raw_entity_id": self._raw_entity_id,
-            "virtual_total_kwh": self._virtual_total,
-            "last_raw_value": self._last_raw_value,
-            "last_delta_kwh": self._last_delta_kwh,
-            "forward_threshold_kwh": self._forward_threshold_kwh,
-            "backward_threshold_kwh": self._backward_threshold_kwh,
-            "reset_detected": self._reset_detected,
-            "spike_ignored": self._spike_ignored,
-            "reject_run_count": self._reject_run_count,
-            "reject_run_limit": self._reject_run_limit,
+            "virtual_total_kwh": flt.virtual_total,
+            "last_raw_value": flt.last_raw_value,
+            "last_delta_kwh": flt.last_delta_kwh,
+            "forward_threshold_kwh": flt.forward_threshold_kwh,
+            "backward_threshold_kwh": flt.backward_threshold_kwh,
+            "filter_mode": flt.filter_mode,
+            "effective_forward_threshold_kwh": flt.effective_forward_kwh,
+            "learned_forward_threshold_kwh": flt.learned_forward_kwh,
+            "learned_rate_kw": flt.learned_rate_kw,
+            "max_power_kw": flt.max_power_kw,
+            "implied_power_kw": flt.implied_power_kw,
+            "power_entity_id": self._power_entity_id,
+            "power_estimate_kwh": flt.last_power_estimate_kwh,
+            "power_adjustments": flt.power_adjustments,
+            "reset_detected": flt.reset_detected,
+            "spike_ignored": flt.spike_ignored,
+            "self_healed": flt.self_healed,
+            "reject_run_count": flt.reject_run_count,
+            "reject_run_limit": flt.reject_run_limit,
+            "glitch_held": (
+                None
+                if self._glitch is None or self._glitch.held is None
+                else self._glitch.held[0]
+            ),
+            "state_writes": self._writes_performed,
+            "state_writes_saved": self._writes_saved,
+        }
+
+    @property
+    def entry_id(self) -> str:
+        return self._entry_id
+
+    @property
+    def power_entity_id(self) -> str | None:
+        """Power entity currently subscribed for this device, if any."""
+        return self._power_entity_id
+
+    def _write_flags(self) -> tuple[bool, ...]:
+        flt = self._filter
+        return (flt.reset_detected, flt.spike_ignored, flt.self_healed)
+
+    @property
+    def extra_restore_state_data(self) -> Zen15RestoreData:
+        return Zen15RestoreData(self._filter.virtual_total, self._filter.last_raw_value)
+
+    @callback
+    def diagnostics(self) -> dict[str, Any]:
+        """Full per-device internal state for the diagnostics download."""
+        return {
+            "entity_id": self.entity_id,
+            "device_id": self._source.device_id,
+            "raw_entity_id": self._raw_entity_id,
+            "filter": self._filter.as_dict(),
+            "native_value": self._native_value,
+            "write_scheduler": {
+                "min_write_interval": self._min_write_interval,
+                "write_deadband_kwh": self._write_deadband,
+                "written_value": self._written_value,
+                "write_pending": self._unsub_write_timer is not None,
+                "state_writes": self._writes_performed,
+                "state_writes_saved": self._writes_saved,
+            },
+            "health": self.health.summary(time.time()),
+            "power_sensor": (
+                self._power_sensor.diagnostics()
+                if self._power_sensor is not None
+                else None
+            ),
         }
 
+    # ---------------------------------------------------------
+    # LIVE RECONFIGURATION
+    # ---------------------------------------------------------
+
+    @callback
+    def async_apply_settings(self, settings: Zen15DeviceSettings) -> bool:
+        """Push new options into the running filter; True if anything changed."""
+        if settings == self._settings:
+            return False
+        self._settings = settings
+
+        flt = self._filter
+        flt.forward_threshold_kwh = float(settings.forward_threshold_kwh)
+        flt.backward_threshold_kwh = float(settings.backward_threshold_kwh)
+        flt.reject_run_limit = int(settings.reject_run_limit)
+        flt.set_filter_mode(
+            settings.filter_mode,
+            hampel_window=settings.hampel_window,
+            hampel_k=settings.hampel_k,
+            hampel_min_kwh=settings.hampel_min_kwh,
+            adaptive_quantile=settings.adaptive_quantile,
+            adaptive_margin=settings.adaptive_margin,
+            adaptive_floor_kwh=settings.adaptive_floor_kwh,
+        )
+        flt.set_power_limit(
+            settings.max_power_kw,
+            settings.power_tolerance,
+            settings.energy_resolution_kwh,
+        )
+        flt.set_power_crosscheck(
+            settings.power_crosscheck,
+            settings.crosscheck_tolerance,
+            settings.crosscheck_slack_kwh,
+        )
+        self._async_bind_power()
+        self._min_write_interval = max(0.0, float(settings.min_write_interval))
+        self._write_deadband = max(0.0, float(settings.write_deadband_kwh))
+        if self._power_sensor is not None:
+            self._power_sensor.async_apply_settings(settings)
+        for period_sensor in self._period_sensors:
+            period_sensor.async_apply_settings(settings)
+
+        if self.hass is not None and self.entity_id:
+            self._async_schedule_write(force=True)
+        return True
+
     # ---------------------------------------------------------
     # ENTITY LIFECYCLE
     # ---------------------------------------------------------
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
-
-        # Restore last virtual total
-        last = await self.async_get_last_state()
-        if last and last.state not in (None, "", STATE_UNKNOWN, STATE_UNAVAILABLE):
+        self._source.filtered_entity_id = self.entity_id
+        entry_data = self.hass.data[DOMAIN][self._entry_id]
+        entry_data[DATA_SENSORS][self._source.device_id] = self
+        self._checkpoint = entry_data[DATA_CHECKPOINT]
+        self._fleet = entry_data[DATA_FLEET]
+        self._glitch = Zen15GlitchGate(
+            entry_data[DATA_GLITCH], self._source.device_id
+        )
+        stats: Zen15FleetStats | None = entry_data.get(DATA_STATS)
+        if stats is not None:
+            self._stats = self._write_stats = stats.device(self._source.device_id)
+            self._raw_handler = self._apply_raw_state_timed
+
+        # Restore: entry checkpoint first (loaded once for all devices), then
+        # our restore data, then the state written by older versions
+        saved = self._checkpoint.get(self._source.device_id)
+        restored = None
+        if saved is None:
+            extra = await self.async_get_last_extra_data()
+            restored = Zen15RestoreData.from_dict(extra.as_dict()) if extra else None
+        last = None if saved or restored else await self.async_get_last_state()
+        if saved is not None:
+            total, last_raw, last_ts = saved[:3]
+            self._filter.virtual_total = float(total)
+            self._filter.last_raw_value = None if last_raw is None else float(last_raw)
+            self._filter.last_timestamp = last_ts
+            self._filter.baseline_timestamp = last_ts
+            if len(saved) > 3:
+                self._filter.restore_learned(saved[3])
+            self._native_value = self._filter.virtual_total
+        elif restored is not None:
+            self._filter.virtual_total = restored.virtual_total
+            self._filter.last_raw_value = restored.last_raw_value
+            self._native_value = restored.virtual_total
+        elif last and last.state not in (None, "", STATE_UNKNOWN, STATE_UNAVAILABLE):
             try:
                 val = float(last.state)
-                self._virtual_total = val
+                self._filter.virtual_total = val
                 self._native_value = val
             except Exception:
                 pass
@@ -338,79 +738,761 @@ class Zen15CleanedEnergySensor(RestoreEntity, SensorEntity):
             lr = last.attributes.get("last_raw_value")
             if lr is not None:
                 try:
-                    self._last_raw_value = float(lr)
+                    self._filter.last_raw_value = float(lr)
                 except Exception:
                     pass
 
+        self._checkpoint.async_register(self._source.device_id, self._filter)
+
+        # The record may have been re-bound while this entity was pending
+        if self._source.raw_entity_id:
+            self._raw_entity_id = self._source.raw_entity_id
+
+        # Power first, so the cross-check integral starts with the baseline
+        self._async_bind_power()
+
         # Prime with current raw reading
-        self._apply_raw_state(self.hass.states.get(self._raw_entity_id), initial=True)
+        self._raw_handler(self.hass.states.get(self._raw_entity_id), initial=True)
+
+        # Raw updates arrive through the entry-wide dispatcher
+        self._unsub_source = self._dispatcher.async_add_source(
+            self._raw_entity_id,
+            self._raw_handler,
+        )
+
+        # Discovery tells us when the device's raw sensor changes
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_REBOUND.format(self._entry_id, self._source.device_id),
+                self._async_rebind,
+            )
+        )
 
+        # Never lose a coalesced write on shutdown
         @callback
-        def _listener(event):
-            self._apply_raw_state(event.data.get("new_state"))
+        def _flush_on_stop(_event) -> None:
+            self._async_flush_write()
 
-        self._unsub_state = async_track_state_change_event(
-            self.hass,
-            [self._raw_entity_id],
-            _listener,
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _flush_on_stop)
         )
 
     async def async_will_remove_from_hass(self) -> None:
-        if self._unsub_state:
-            self._unsub_state()
-            self._unsub_state = None
+        entry_data = self.hass.data[DOMAIN].get(self._entry_id)
+        if entry_data and entry_data[DATA_SENSORS].get(self._source.device_id) is self:
+            del entry_data[DATA_SENSORS][self._source.device_id]
+        if self._checkpoint is not None:
+            self._checkpoint.async_unregister(self._source.device_id)
+        if self._glitch is not None:
+            self._glitch.forget()
+
+        if self._unsub_source:
+            self._unsub_source()
+            self._unsub_source = None
+        if self._unsub_power:
+            self._unsub_power()
+            self._unsub_power = None
+        self._async_flush_write()
+
+    @callback
+    def _async_rebind(self) -> None:
+        """Follow the device onto a new (or no) raw energy / power sensor."""
+        self._async_bind_power()
+
+        new_raw = self._source.raw_entity_id
+        if new_raw == self._raw_entity_id and self._unsub_source is not None:
+            return  # only the power sensor changed
+
+        if self._unsub_source:
+            self._unsub_source()
+            self._unsub_source = None
+
+        if not new_raw:
+            # Raw sensor gone: keep the virtual total, wait for a new source
+            self._attr_available = False
+            self.async_write_ha_state()
+            return
+
+        # New source, new baseline: never add the jump between two meters
+        self._raw_entity_id = new_raw
+        self._filter.last_raw_value = None
+        self._attr_available = True
+        self._unsub_source = self._dispatcher.async_add_source(
+            new_raw,
+            self._raw_handler,
+        )
+        writes = self._writes_performed
+        self._raw_handler(self.hass.states.get(new_raw), initial=True)
+        if self._writes_performed == writes:
+            # No usable raw state yet; still publish that we're available
+            self._async_schedule_write(force=True)
+
+    @callback
+    def _async_bind_power(self) -> None:
+        """(Re)subscribe to the power sensor while anything consumes it.
+
+        One subscription serves both the cross-check and the filtered power
+        sensor.
+        """
+        wanted = (
+            self._source.power_entity_id
+            if self._filter.power_integral is not None
+            or self._power_sensor is not None
+            else None
+        )
+        if wanted == self._power_entity_id and (
+            wanted is None or self._unsub_power is not None
+        ):
+            return
+
+        if self._unsub_power:
+            self._unsub_power()
+            self._unsub_power = None
+        self._power_entity_id = wanted
+        if wanted is None:
+            if self._power_sensor is not None:
+                self._power_sensor.async_apply_power(None)
+            return
+
+        self._apply_power_state(self.hass.states.get(wanted))
+        self._unsub_power = self._dispatcher.async_add_source(
+            wanted,
+            self._apply_power_state,
+        )
+
+    @callback
+    def async_attach_power_sensor(self, sensor: Zen15FilteredPowerSensor) -> None:
+        """Start feeding the device's filtered power sensor."""
+        self._power_sensor = sensor
+        if self._power_entity_id is not None and self._unsub_power is not None:
+            # Already subscribed for the cross-check: just prime the sensor
+            state = self.hass.states.get(self._power_entity_id)
+            sensor.async_apply_power(_state_watts(state))
+        else:
+            self._async_bind_power()
+
+    @callback
+    def async_detach_power_sensor(self, sensor: Zen15FilteredPowerSensor) -> None:
+        if self._power_sensor is sensor:
+            self._power_sensor = None
+            self._async_bind_power()
+
+    @callback
+    def async_attach_period_sensor(self, sensor: Zen15PeriodEnergySensor) -> None:
+        """Start adding accepted energy to a period counter."""
+        self._period_sensors.append(sensor)
+
+    @callback
+    def async_detach_period_sensor(self, sensor: Zen15PeriodEnergySensor) -> None:
+        if sensor in self._period_sensors:
+            self._period_sensors.remove(sensor)
 
     # ---------------------------------------------------------
     # FILTER LOGIC
     # ---------------------------------------------------------
 
     @callback
-    def _apply_raw_state(self, state, initial: bool = False) -> None:
+    def _apply_raw_state(self, state, initial: bool = False) -> FeedResult | None:
         if not state or state.state in (None, "", STATE_UNKNOWN, STATE_UNAVAILABLE):
-            return
+            return None
 
         try:
             raw = float(state.state)
         except Exception:
-            return
+            return None
+
+        timestamp = state.last_updated_timestamp
+        samples: tuple[tuple[float, float], ...] = ((raw, timestamp),)
+        flt = self._filter
+        gate = self._glitch
+        if (
+            gate is not None
+            and not initial
+            and (gate.monitor.enabled or gate.held is not None)
+        ):
+            samples = gate.screen(
+                raw,
+                timestamp,
+                flt.last_raw_value,
+                flt.forward_threshold_kwh,
+                flt.effective_forward_kwh,
+                max(flt.backward_threshold_kwh, flt.energy_resolution_kwh),
+            )
+            if not samples:
+                return None
+
+        before = flt.virtual_total
+        # Resets, spikes and heals are always published right away
+        force = initial
+        for raw, timestamp in samples:
+            start = flt.virtual_total
+            result = flt.feed(raw, timestamp)
+            self.health.record(timestamp, result.status, flt.virtual_total - start)
+            if result.status in (STATUS_RESET, STATUS_SPIKE, STATUS_HEALED):
+                force = True
+        total = flt.virtual_total
+        self._native_value = total
+        if self._checkpoint is not None:
+            self._checkpoint.async_schedule_save()
+
+        # Period counters and fleet totals ride on this same update
+        added = total - before
+        if added > 0:
+            for period_sensor in self._period_sensors:
+                period_sensor.async_add_energy(added)
+            if self._fleet is not None:
+                self._fleet.async_add(self._source.area_id, added)
+
+        self._async_schedule_write(force=force)
+        return result
 
-        self._reset_detected = False
-        self._spike_ignored = False
+    @callback
+    def _apply_raw_state_timed(self, state, initial: bool = False) -> None:
+        """``_apply_raw_state`` with its status and latency recorded."""
+        start = time.perf_counter()
+        result = self._apply_raw_state(state, initial)
+        self._stats.record_feed(  # type: ignore[union-attr]
+            None if result is None else result.status,
+            time.perf_counter() - start,
+        )
 
-        if self._last_raw_value is None:
-            self._last_raw_value = raw
-            self._last_delta_kwh = 0.0
-            self._native_value = self._virtual_total
-            self.async_write_ha_state()
+    @callback
+    def _apply_power_state(self, state) -> None:
+        if state is None:
             return
+        # unknown / unavailable: the cross-check period can't be trusted
+        watts = _state_watts(state)
+        self._filter.feed_power(watts, state.last_updated_timestamp)
+        if self._power_sensor is not None:
+            self._power_sensor.async_apply_power(watts)
 
-        delta = raw - self._last_raw_value
-        self._last_delta_kwh = delta
-        delta_clean = 0.0
-
-        # Big negative jump = reset
-        if delta < -self._backward_threshold_kwh:
-            self._reset_detected = True
-        # Big positive jump = spike
-        elif delta > self._forward_threshold_kwh:
-            self._spike_ignored = True
-        else:
-            if delta > 0:
-                delta_clean = delta
+    # ---------------------------------------------------------
+    # SERVICE: reset_filtered
+    # ---------------------------------------------------------
 
-        if delta_clean > 0:
-            self._virtual_total += delta_clean
+    async def async_reset_filtered(self, mode: str = RESET_MODE_ZERO) -> None:
+        if not self.async_apply_reset(mode):
+            raise HomeAssistantError(
+                f"{self._raw_entity_id} has no usable kWh value to align with"
+            )
 
-        self._native_value = self._virtual_total
-        self._last_raw_value = raw
-        self.async_write_ha_state()
+    @callback
+    def async_apply_reset(self, mode: str = RESET_MODE_ZERO) -> bool:
+        """Zero the total, or align it with the raw meter, in memory.
+
+        Used by the entity service, the reset button and the bulk service.
+        Ends in one state write. Returns False if there was nothing to align to.
+        """
+        flt = self._filter
+        if mode == RESET_MODE_ALIGN:
+            state = self.hass.states.get(self._raw_entity_id)
+            try:
+                raw = float(state.state)  # type: ignore[union-attr]
+            except (AttributeError, TypeError, ValueError):
+                return False
+            flt.align(raw, state.last_updated_timestamp)
+        else:
+            flt.reset()
+        self._native_value = flt.virtual_total
+        if self._checkpoint is not None:
+            self._checkpoint.async_schedule_save()
+        self._async_schedule_write(force=True)
+        return True
 
     # ---------------------------------------------------------
-    # SERVICE: reset_filtered
+    # SERVICE: backfill_statistics
     # ---------------------------------------------------------
 
-    async def async_reset_filtered(self) -> None:
-        self._virtual_total = 0.0
+    async def async_backfill_statistics(
+        self,
+        start: datetime,
+        end: datetime | None = None,
+        source: str = BACKFILL_SOURCE_STATES,
+        adjust_existing: bool = True,
+    ) -> None:
+        """Rebuild hourly long-term statistics from the raw sensor's history.
+
+        Runs as a background task; the service call returns immediately.
+        """
+        if self._backfill_task is not None and not self._backfill_task.done():
+            _LOGGER.warning("Backfill already running for %s", self.entity_id)
+            return
+
+        if end is None:
+            # Default: everything before this filtered sensor existed
+            reg_entry = er.async_get(self.hass).async_get(self.entity_id)
+            end = reg_entry.created_at if reg_entry else dt_util.utcnow()
+
+        if dt_util.as_utc(end) - dt_util.as_utc(start) < timedelta(hours=1):
+            raise HomeAssistantError("Backfill range must cover at least one hour")
+
+        job = BackfillJob(
+            statistic_id=self.entity_id,
+            raw_entity_id=self._raw_entity_id,
+            filter=self._filter.like(),
+            start=start,
+            end=end,
+            source=source,
+            adjust_existing=adjust_existing,
+        )
+        self._backfill_task = self.hass.async_create_background_task(
+            async_run_backfill(self.hass, job),
+            f"{DOMAIN} backfill {self.entity_id}",
+        )
+
+
+# ---------------------------------------------------------
+# FILTERED POWER SENSOR
+# ---------------------------------------------------------
+
+class Zen15FilteredPowerSensor(_CoalescedWriter):
+    """Spike-filtered instantaneous power of a ZEN15.
+
+    Has no subscription of its own: the device's energy sensor forwards
+    every reading of the power entity it already listens to.
+    """
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _unrecorded_attributes = frozenset(
+        {
+            "power_entity_id",
+            "last_raw_watts",
+            "max_power_w",
+            "spike_ignored",
+            "spikes_ignored",
+            "state_writes",
+            "state_writes_saved",
+        }
+    )
+
+    def __init__(
+        self,
+        energy: Zen15CleanedEnergySensor,
+        name: str,
+        unique_id: str,
+        settings: Zen15DeviceSettings,
+    ) -> None:
+        self._energy = energy
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_device_info = energy.device_info  # same companion device
+        self._attr_available = False  # until the first usable reading
+
+        self._settings = settings
+        self._filter = Zen15PowerFilter(_max_power_w(settings))
+        self._last_raw_watts: float | None = None
+
+        # W readings only skip writes when nothing changed at all
+        self._init_write_scheduler(settings.min_write_interval, 0.0)
+
+    @property
+    def native_value(self) -> float | None:
+        return self._native_value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        flt = self._filter
+        return {
+            "power_entity_id": self._energy.power_entity_id,
+            "last_raw_watts": self._last_raw_watts,
+            "max_power_w": flt.max_power_w,
+            "spike_ignored": flt.spike_ignored,
+            "spikes_ignored": flt.spikes,
+            "state_writes": self._writes_performed,
+            "state_writes_saved": self._writes_saved,
+        }
+
+    def _write_flags(self) -> tuple[bool, ...]:
+        return (self._filter.spike_ignored, self._attr_available)
+
+    @callback
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "entity_id": self.entity_id,
+            "filter": self._filter.as_dict(),
+            "native_value": self._native_value,
+            "last_raw_watts": self._last_raw_watts,
+        }
+
+    @callback
+    def async_apply_settings(self, settings: Zen15DeviceSettings) -> None:
+        if settings == self._settings:
+            return
+        self._settings = settings
+        self._filter.max_power_w = _max_power_w(settings)
+        self._min_write_interval = max(0.0, float(settings.min_write_interval))
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._energy.async_attach_power_sensor(self)
+
+        @callback
+        def _flush_on_stop(_event) -> None:
+            self._async_flush_write()
+
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _flush_on_stop)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._energy.async_detach_power_sensor(self)
+        self._async_flush_write()
+
+    @callback
+    def async_apply_power(self, watts: float | None) -> None:
+        """One reading of the power entity (None: unknown / unavailable / gone)."""
+        if self.hass is None or not self.entity_id:
+            return
+        if watts is None:
+            if self._attr_available:
+                self._attr_available = False
+                self._async_schedule_write(force=True)
+            return
+
+        self._last_raw_watts = watts
+        status = self._filter.feed(watts)
+        was_available = self._attr_available
+        self._attr_available = self._filter.value is not None
+        self._native_value = self._filter.value
+
+        self._async_schedule_write(force=not was_available or status == STATUS_SPIKE)
+
+
+# ---------------------------------------------------------
+# FILTER HEALTH
+# ---------------------------------------------------------
+
+class Zen15HealthSensor(SensorEntity):
+    """Share of a plug's readings in the last day that were not rejected.
+
+    Reads the energy sensor's sliding windows; refreshed by one timer per
+    entry and only written when the summary changed.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_should_poll = False
+    _attr_icon = "mdi:heart-pulse"
+
+    _unrecorded_attributes = frozenset(
+        {
+            f"{name}_{suffix}"
+            for name in (
+                "health",
+                "updates",
+                "spikes",
+                "resets",
+                "heals",
+                "accepted_kwh",
+            )
+            for suffix in ("1h", "24h")
+        }
+    )
+
+    def __init__(
+        self,
+        energy: Zen15CleanedEnergySensor,
+        name: str,
+        unique_id: str,
+    ) -> None:
+        self._energy = energy
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_device_info = energy.device_info
+        self._summary: dict[str, Any] = {}
+
+    @property
+    def native_value(self) -> float | None:
+        return self._summary.get("health_24h")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self._summary
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._summary = self._energy.health.summary(time.time())
+        self.hass.data[DOMAIN][self._energy.entry_id][DATA_HEALTH_SENSORS].add(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        entry_data = self.hass.data[DOMAIN].get(self._energy.entry_id)
+        if entry_data is not None:
+            entry_data[DATA_HEALTH_SENSORS].discard(self)
+
+    @callback
+    def async_refresh(self) -> None:
+        summary = self._energy.health.summary(time.time())
+        if summary != self._summary:
+            self._summary = summary
+            self.async_write_ha_state()
+
+
+# ---------------------------------------------------------
+# PERIOD COUNTERS (hourly / daily / monthly)
+# ---------------------------------------------------------
+
+class Zen15PeriodRestoreData(ExtraStoredData):
+    """Value of a period counter and the start of the period it belongs to."""
+
+    def __init__(self, value: float, period_start: datetime | None) -> None:
+        self.value = value
+        self.period_start = period_start
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "value": self.value,
+            "period_start": (
+                self.period_start.isoformat() if self.period_start else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Zen15PeriodRestoreData | None:
+        try:
+            start = restored.get("period_start")
+            return cls(
+                float(restored["value"]),
+                dt_util.parse_datetime(start) if start else None,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class Zen15PeriodEnergySensor(RestoreEntity, _CoalescedWriter):
+    """Filtered energy of the current hour, day or month.
+
+    A plain accumulator: the device's energy sensor adds every accepted
+    increase in its own raw update, and the entry's period clock zeroes it
+    on the local boundary.
+    """
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+
+    _unrecorded_attributes = frozenset({"state_writes", "state_writes_saved"})
+
+    def __init__(
+        self,
+        energy: Zen15CleanedEnergySensor,
+        clock: Zen15PeriodClock,
+        period: str,
+        name: str,
+        unique_id: str,
+        settings: Zen15DeviceSettings,
+    ) -> None:
+        self._energy = energy
+        self._clock = clock
+        self.period = period
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_device_info = energy.device_info
+        self._settings = settings
         self._native_value = 0.0
-        self._reject_run_count = 0
-        self.async_write_ha_state()
+
+        self._init_write_scheduler(
+            settings.min_write_interval, settings.write_deadband_kwh
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        return self._native_value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {
+            "state_writes": self._writes_performed,
+            "state_writes_saved": self._writes_saved,
+        }
+
+    @property
+    def extra_restore_state_data(self) -> Zen15PeriodRestoreData:
+        return Zen15PeriodRestoreData(self._native_value or 0.0, self._attr_last_reset)
+
+    @callback
+    def async_apply_settings(self, settings: Zen15DeviceSettings) -> None:
+        self._settings = settings
+        self._min_write_interval = max(0.0, float(settings.min_write_interval))
+        self._write_deadband = max(0.0, float(settings.write_deadband_kwh))
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        start = self._clock.current_start(self.period)
+        self._attr_last_reset = start
+
+        # Keep the restored value only if it belongs to the running period
+        extra = await self.async_get_last_extra_data()
+        restored = Zen15PeriodRestoreData.from_dict(extra.as_dict()) if extra else None
+        if restored is not None and restored.period_start == start:
+            self._native_value = restored.value
+
+        self._clock.async_register(self)
+        self._energy.async_attach_period_sensor(self)
+
+        @callback
+        def _flush_on_stop(_event) -> None:
+            self._async_flush_write()
+
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _flush_on_stop)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._clock.async_unregister(self)
+        self._energy.async_detach_period_sensor(self)
+        self._async_flush_write()
+
+    @callback
+    def async_add_energy(self, kwh: float) -> None:
+        self._native_value = (self._native_value or 0.0) + kwh
+        self._async_schedule_write()
+
+    @callback
+    def async_rollover(self, start: datetime) -> None:
+        """Start a new period at ``start`` (called by the entry's clock)."""
+        self._native_value = 0.0
+        self._attr_last_reset = start
+        self._async_schedule_write(force=True)
+
+
+# ---------------------------------------------------------
+# FLEET TOTALS
+# ---------------------------------------------------------
+
+class Zen15FleetEnergySensor(_CoalescedWriter):
+    """Accepted energy of every plug in the entry, or of one area.
+
+    Reads its value from the entry's ``Zen15FleetAggregate``, which the
+    filtered sensors update in O(1) per reading; nothing is summed here.
+    """
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+
+    _unrecorded_attributes = frozenset(
+        {"area_id", "state_writes", "state_writes_saved"}
+    )
+
+    def __init__(
+        self,
+        fleet: Zen15FleetAggregate,
+        area_id: str | None,
+        name: str,
+        unique_id: str,
+    ) -> None:
+        self._fleet = fleet
+        self._area_id = area_id
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._native_value = fleet.value(area_id)
+
+        # Many plugs feed one total: always coalesce
+        self._init_write_scheduler(DEFAULT_MIN_WRITE_INTERVAL, 0.0)
+
+    @property
+    def native_value(self) -> float | None:
+        return self._native_value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {
+            "area_id": self._area_id,
+            "state_writes": self._writes_performed,
+            "state_writes_saved": self._writes_saved,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._native_value = self._fleet.value(self._area_id)
+        self.async_on_remove(self._fleet.async_listen(self._area_id, self))
+
+        @callback
+        def _flush_on_stop(_event) -> None:
+            self._async_flush_write()
+
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _flush_on_stop)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._async_flush_write()
+
+    @callback
+    def async_total_changed(self, total: float) -> None:
+        self._native_value = total
+        self._async_schedule_write()
+
+
+# ---------------------------------------------------------
+# INSTRUMENTATION SENSORS
+# ---------------------------------------------------------
+
+class Zen15StatsSensor(SensorEntity):
+    """Fleet event rate or callback latency, refreshed every ``SCAN_INTERVAL``.
+
+    Polled on purpose: the counters change on every event, the sensor only
+    publishes a snapshot once a minute.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, stats: Zen15FleetStats, key: str, unique_id: str) -> None:
+        self._stats = stats
+        self._key = key
+        self._attr_unique_id = unique_id
+        self._last_events = stats.events
+        self._last_poll = time.monotonic()
+
+        if key == "event_rate":
+            self._attr_name = "Zooz Cleaner Event Rate"
+            self._attr_native_unit_of_measurement = "events/min"
+        else:
+            self._attr_name = "Zooz Cleaner Callback Latency"
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_native_unit_of_measurement = UnitOfTime.MICROSECONDS
+
+    async def async_update(self) -> None:
+        stats = self._stats
+        if self._key == "event_rate":
+            # Rate over the last poll interval, not since startup
+            now = time.monotonic()
+            elapsed = now - self._last_poll
+            events = stats.events
+            if elapsed > 0:
+                self._attr_native_value = round(
+                    60.0 * (events - self._last_events) / elapsed, 2
+                )
+            self._last_events, self._last_poll = events, now
+            snap = stats.as_dict()
+            self._attr_extra_state_attributes = {
+                key: snap[key]
+                for key in (
+                    "events",
+                    "ignored",
+                    "accepted",
+                    "spike",
+                    "reset",
+                    "healed",
+                    "state_writes",
+                )
+            }
+            return
+
+        callback_latency = stats.callback.as_dict()
+        write_latency = stats.write.as_dict()
+        p95 = callback_latency["p95_us"]
+        self._attr_native_value = None if p95 is None else round(p95, 1)
+        self._attr_extra_state_attributes = {
+            "mean_us": callback_latency["mean_us"],
+            "p50_us": callback_latency["p50_us"],
+            "p99_us": callback_latency["p99_us"],
+            "max_us": callback_latency["max_us"],
+            "write_p95_us": write_latency["p95_us"],
+            "write_max_us": write_latency["max_us"],
+        }
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_DISCOVERY,
+    DATA_SENSORS,
+    DATA_STATS,
+    CONF_PER_DEVICE_THRESHOLDS,
+    SERVICE_TUNE_THRESHOLDS,
+    SERVICE_BULK_RESET,
+    SERVICE_DUMP_STATS,
+    RESET_MODE_ZERO,
+    RESET_MODES,
+)
+from .discovery import Zen15DeviceRecord
+from .options import Zen15Options, model_max_power_kw, prune_overrides
+
+TUNE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("entity_id"): cv.entity_ids,
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("forward_candidates"): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0))]
+        ),
+        vol.Optional("backward_candidates"): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0))]
+        ),
+        vol.Optional("apply", default=False): cv.boolean,
+    }
+)
+
+BULK_RESET_SCHEMA = vol.Schema(
+    {
+        vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("area_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("entity_id"): cv.entity_ids,
+        vol.Optional("all", default=False): cv.boolean,
+        vol.Optional("mode", default=RESET_MODE_ZERO): vol.In(RESET_MODES),
+    }
+)
+
+
+def _resolve_targets(
+    hass: HomeAssistant,
+    call: ServiceCall,
+) -> List[Tuple[ConfigEntry, Zen15DeviceRecord]]:
+    """Map device_id / area_id / entity_id (raw or filtered) to discovered devices.
+
+    No target means every wrapped device of every loaded entry.
+    """
+    device_ids = set(call.data.get("device_id", []))
+    area_ids = set(call.data.get("area_id", []))
+    entity_ids = set(call.data.get("entity_id", []))
+
+    targets: List[Tuple[ConfigEntry, Zen15DeviceRecord]] = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if entry_data is None:
+            continue  # not loaded
+        discovery = entry_data[DATA_DISCOVERY]
+        for rec in discovery.sources:
+            if (device_ids or area_ids or entity_ids) and not (
+                rec.device_id in device_ids
+                or (rec.area_id is not None and rec.area_id in area_ids)
+                or rec.raw_entity_id in entity_ids
+                or rec.filtered_entity_id in entity_ids
+            ):
+                continue
+            targets.append((entry, rec))
+    return targets
+
+
+async def _async_handle_tune(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    try:
+        # numpy is only needed here, so keep it out of the startup path
+        tuning = await async_import_module(hass, f"{__package__}.tuning")
+    except ImportError as err:  # numpy missing
+        raise HomeAssistantError(f"Threshold tuning needs numpy: {err}") from err
+
+    end = call.data.get("end") or dt_util.utcnow()
+    start = call.data.get("start") or end - timedelta(days=30)
+    forward = call.data.get("forward_candidates") or tuning.DEFAULT_FORWARD_CANDIDATES_KWH
+    backward = (
+        call.data.get("backward_candidates") or tuning.DEFAULT_BACKWARD_CANDIDATES_KWH
+    )
+
+    devices: Dict[str, Any] = {}
+    recommended: Dict[str, Dict[str, float]] = {}  # entry_id -> {device_id: kwh}
+
+    targets = _resolve_targets(hass, call)
+    # The grid is judged with each entry's own filter settings
+    options = {
+        entry.entry_id: Zen15Options.from_entry(entry) for entry, _rec in targets
+    }
+    results = await asyncio.gather(
+        *(
+            tuning.async_tune_device(
+                hass,
+                rec.raw_entity_id,
+                start,
+                end,
+                forward,
+                backward,
+                model_max_power_kw(rec.model),
+                options[entry.entry_id].power_check,
+                options[entry.entry_id].reject_run_limit,
+                options[entry.entry_id].power_tolerance,
+                options[entry.entry_id].energy_resolution_kwh,
+            )
+            for entry, rec in targets
+        )
+    )
+
+    for (entry, rec), result in zip(targets, results):
+        devices[rec.device_id] = {
+            "name": rec.name_by_user or rec.device_name,
+            "raw_entity_id": rec.raw_entity_id,
+            "samples": result.samples,
+            "recommended_forward_threshold_kwh": result.recommended_forward,
+            "recommendation_reason": result.recommendation_reason,
+            "report_interval_s": result.report_interval_s,
+            "power_floor_kwh": result.floor_kwh,
+            "grid": result.as_rows(),
+        }
+        if result.recommended_forward is not None:
+            recommended.setdefault(entry.entry_id, {})[rec.device_id] = (
+                result.recommended_forward
+            )
+
+    if call.data["apply"]:
+        for entry_id, values in recommended.items():
+            entry = hass.config_entries.async_get_entry(entry_id)
+            assert entry is not None
+            opts = Zen15Options.from_entry(entry)
+            per_device = prune_overrides(
+                {**opts.per_device_forward, **values}, opts.forward_threshold_kwh
+            )
+            hass.config_entries.async_update_entry(
+                entry,
+                options={**entry.options, CONF_PER_DEVICE_THRESHOLDS: per_device},
+            )
+
+    return {"devices": devices, "applied": bool(call.data["apply"])}
+
+
+async def _async_handle_bulk_reset(
+    hass: HomeAssistant,
+    call: ServiceCall,
+) -> ServiceResponse:
+    """Zero or align many filtered sensors in one pass over the live states."""
+    if not call.data["all"] and not any(
+        call.data.get(key) for key in ("device_id", "area_id", "entity_id")
+    ):
+        raise HomeAssistantError(
+            "Pick devices, areas or entities, or set all: true to reset every plug"
+        )
+
+    mode = call.data["mode"]
+    done: List[str] = []
+    skipped: List[str] = []
+    for entry, rec in _resolve_targets(hass, call):
+        sensor = hass.data[DOMAIN][entry.entry_id][DATA_SENSORS].get(rec.device_id)
+        # In memory, one state write per sensor, one checkpoint save overall
+        if sensor is not None and sensor.async_apply_reset(mode):
+            done.append(sensor.entity_id)
+        else:
+            skipped.append(rec.filtered_entity_id or rec.device_id)
+
+    return {"mode": mode, "reset": done, "skipped": skipped}
+
+
+def _handle_dump_stats(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Snapshot of every loaded entry's instrumentation counters."""
+    entries: Dict[str, Any] = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if entry_data is None:
+            continue  # not loaded
+        stats = entry_data.get(DATA_STATS)
+        entries[entry.entry_id] = (
+            {"enabled": True, **stats.snapshot()}
+            if stats is not None
+            else {"enabled": False}
+        )
+    return {"entries": entries}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's domain-level services."""
+
+    async def _tune(call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_tune(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_TUNE_THRESHOLDS,
+        _tune,
+        schema=TUNE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _bulk_reset(call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_bulk_reset(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_RESET,
+        _bulk_reset,
+        schema=BULK_RESET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    @callback
+    def _dump_stats(call: ServiceCall) -> ServiceResponse:
+        return _handle_dump_stats(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_STATS,
+        _dump_stats,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,159 @@
+"""Optional runtime counters for the filter hot path.
+
+Nothing in here runs unless instrumentation is enabled: the sensors only
+route their raw updates through the timed wrapper when a
+``Zen15DeviceStats`` exists. ``dump_stats`` and the two stats sensors read
+the snapshots.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Dict
+
+from .engine import STATUS_HEALED
+
+# Upper bounds (microseconds) of the latency histogram buckets; one more
+# bucket collects everything slower
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Index = engine status (baseline, accepted, reset, spike, healed)
+STATUS_NAMES = ("baseline", "accepted", "reset", "spike", "healed")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram: one bisect and two adds per sample."""
+
+    __slots__ = ("counts", "total_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_US) + 1)
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, seconds: float) -> None:
+        us = seconds * 1e6
+        self.counts[bisect_left(LATENCY_BUCKETS_US, us)] += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile_us(self, q: float) -> float | None:
+        """Upper bound of the bucket holding quantile ``q`` (None if empty)."""
+        n = self.count
+        if not n:
+            return None
+        rank = q * n
+        seen = 0
+        for bound, c in zip(LATENCY_BUCKETS_US, self.counts):
+            seen += c
+            if seen >= rank and c:
+                return float(bound)
+        return self.max_us  # in the open-ended bucket
+
+    def as_dict(self) -> dict:
+        n = self.count
+        buckets = {f"le_{b}us": c for b, c in zip(LATENCY_BUCKETS_US, self.counts)}
+        buckets["slower"] = self.counts[-1]
+        return {
+            "count": n,
+            "mean_us": self.total_us / n if n else None,
+            "p50_us": self.quantile_us(0.5),
+            "p95_us": self.quantile_us(0.95),
+            "p99_us": self.quantile_us(0.99),
+            "max_us": self.max_us,
+            "buckets": buckets,
+        }
+
+
+class _Counters:
+    """Event, status and write counters plus latency histograms."""
+
+    __slots__ = (
+        "started",
+        "events",
+        "ignored",
+        "statuses",
+        "writes",
+        "callback",
+        "write",
+    )
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.events = 0
+        self.ignored = 0  # unknown / unavailable / non-numeric raw states
+        self.statuses = [0] * (STATUS_HEALED + 1)
+        self.writes = 0
+        self.callback = LatencyHistogram()
+        self.write = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        out = {
+            "uptime_s": elapsed,
+            "events": self.events,
+            "events_per_minute": 60.0 * self.events / elapsed if elapsed > 0 else None,
+            "ignored": self.ignored,
+            "state_writes": self.writes,
+            "callback_latency": self.callback.as_dict(),
+            "write_latency": self.write.as_dict(),
+        }
+        out.update(zip(STATUS_NAMES, self.statuses))
+        return out
+
+
+class Zen15DeviceStats(_Counters):
+    """Counters of one device; every record also lands in the fleet totals."""
+
+    __slots__ = ("fleet",)
+
+    def __init__(self, fleet: Zen15FleetStats) -> None:
+        super().__init__()
+        self.fleet = fleet
+
+    def record_feed(self, status: int | None, seconds: float) -> None:
+        """One raw update: its engine status (None if not fed) and latency."""
+        fleet = self.fleet
+        self.events += 1
+        fleet.events += 1
+        if status is None:
+            self.ignored += 1
+            fleet.ignored += 1
+        else:
+            self.statuses[status] += 1
+            fleet.statuses[status] += 1
+        self.callback.record(seconds)
+        fleet.callback.record(seconds)
+
+    def record_write(self, seconds: float) -> None:
+        self.writes += 1
+        self.fleet.writes += 1
+        self.write.record(seconds)
+        self.fleet.write.record(seconds)
+
+
+class Zen15FleetStats(_Counters):
+    """Fleet-wide counters, plus the per-device ones by device id."""
+
+    __slots__ = ("devices",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.devices: Dict[str, Zen15DeviceStats] = {}
+
+    def device(self, device_id: str) -> Zen15DeviceStats:
+        stats = self.devices.get(device_id)
+        if stats is None:
+            stats = self.devices[device_id] = Zen15DeviceStats(self)
+        return stats
+
+    def snapshot(self) -> dict:
+        return {
+            "fleet": self.as_dict(),
+            "devices": {dev: st.as_dict() for dev, st in self.devices.items()},
+        }
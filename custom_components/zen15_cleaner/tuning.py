@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+import numpy as np
+
+from .const import (
+    DEFAULT_ENERGY_RESOLUTION_KWH,
+    DEFAULT_POWER_TOLERANCE,
+    DEFAULT_REJECT_RUN_LIMIT,
+)
+from .engine import STATUS_HEALED, STATUS_RESET, STATUS_SPIKE
+from .replay import replay_arrays
+
+if TYPE_CHECKING:
+    # The sweep itself runs without Home Assistant (and is tested that way)
+    from homeassistant.core import HomeAssistant
+
+DEFAULT_FORWARD_CANDIDATES_KWH = (
+    0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0,
+)
+DEFAULT_BACKWARD_CANDIDATES_KWH = (0.0, 0.01, 0.1, 1.0)
+
+# Recommendation: smallest candidate above MARGIN x this quantile of the
+# device's positive deltas (spikes are rare, so the quantile is "normal" use)
+RECOMMEND_QUANTILE = 0.99
+RECOMMEND_MARGIN = 2.0
+
+# Why a threshold was recommended
+REASON_QUANTILE = "quantile"            # margin x quantile of positive deltas
+REASON_POWER_FLOOR = "power_floor"      # rated load over the median report interval
+REASON_LARGEST = "largest_candidate"    # no candidate was large enough
+
+
+@dataclass
+class SweepResult:
+    """Grid of filter outcomes, indexed [forward, backward]."""
+
+    forward: np.ndarray
+    backward: np.ndarray
+    accepted_kwh: np.ndarray
+    rejected_kwh: np.ndarray
+    spikes: np.ndarray
+    resets: np.ndarray
+    heals: np.ndarray
+    samples: int
+    recommended_forward: float | None
+    recommendation_reason: str | None = None
+    report_interval_s: float | None = None  # median time between readings
+    floor_kwh: float | None = None          # rated load over that interval
+
+    def as_rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for i, fwd in enumerate(self.forward):
+            for j, bwd in enumerate(self.backward):
+                rows.append(
+                    {
+                        "forward_threshold_kwh": float(fwd),
+                        "backward_threshold_kwh": float(bwd),
+                        "accepted_kwh": round(float(self.accepted_kwh[i, j]), 4),
+                        "rejected_kwh": round(float(self.rejected_kwh[i, j]), 4),
+                        "spikes": int(self.spikes[i, j]),
+                        "resets": int(self.resets[i, j]),
+                        "heals": int(self.heals[i, j]),
+                    }
+                )
+        return rows
+
+
+def sweep_thresholds(
+    raw: np.ndarray,
+    forward_candidates: Sequence[float] = DEFAULT_FORWARD_CANDIDATES_KWH,
+    backward_candidates: Sequence[float] = DEFAULT_BACKWARD_CANDIDATES_KWH,
+    timestamp: np.ndarray | None = None,
+    max_power_kw: float | None = None,
+    power_check: bool = True,
+    reject_run_limit: int = DEFAULT_REJECT_RUN_LIMIT,
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+) -> SweepResult:
+    """Evaluate every (forward, backward) pair over one device's raw series.
+
+    Each grid point is one ``replay.replay_arrays`` run, so the counts are
+    what ``Zen15FilterState`` does with those thresholds in ``threshold``
+    mode: the baseline is held after a spike, consistent runs self-heal,
+    and with ``power_check`` the rated-load limit applies. ``rejected_kwh``
+    is the raw meter growth (sum of positive steps between readings) that
+    was not accepted. The ``hampel``/``adaptive`` modes and the power
+    cross-check are not modelled.
+
+    ``max_power_kw`` is the device's rated load. Without ``timestamp`` the
+    readings are taken as evenly spaced, and the power check and floor are
+    skipped. With it, the recommendation is never below what the rated load
+    can use in the device's median reporting interval (with the power
+    tolerance and one meter tick). A plug that was idle in the history
+    would otherwise get a threshold that rejects its first real load.
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    keep = np.isfinite(raw)
+    raw = raw[keep]
+    delta = np.diff(raw)
+    pos = np.sort(delta[delta > 0])
+    growth = float(pos.sum())
+
+    interval = None
+    floor = None
+    if timestamp is None:
+        when = np.arange(raw.shape[0], dtype=np.float64)
+        check_kw = None
+    else:
+        when = np.asarray(timestamp, dtype=np.float64)[keep]
+        check_kw = max_power_kw if power_check else None
+        elapsed = np.diff(when)
+        elapsed = elapsed[elapsed > 0]
+        if elapsed.shape[0]:
+            interval = float(np.median(elapsed))
+            if max_power_kw is not None:
+                floor = (
+                    max_power_kw * (1.0 + power_tolerance) * interval / 3600.0
+                    + energy_resolution_kwh
+                )
+
+    fwd = np.asarray(sorted(forward_candidates), dtype=np.float64)
+    bwd = np.asarray(sorted(backward_candidates), dtype=np.float64)
+
+    shape = (fwd.shape[0], bwd.shape[0])
+    accepted = np.zeros(shape)
+    spikes = np.zeros(shape, dtype=np.int64)
+    resets = np.zeros(shape, dtype=np.int64)
+    heals = np.zeros(shape, dtype=np.int64)
+    device = np.zeros(raw.shape[0], dtype=np.int32)
+    for i, forward in enumerate(fwd):
+        for j, backward in enumerate(bwd):
+            res = replay_arrays(
+                ["device"],
+                device,
+                when,
+                raw,
+                float(forward),
+                float(backward),
+                reject_run_limit=reject_run_limit,
+                max_power_kw=check_kw,
+                power_tolerance=power_tolerance,
+                energy_resolution_kwh=energy_resolution_kwh,
+            )
+            accepted[i, j] = float(res.delta_clean.sum())
+            spikes[i, j] = int(np.count_nonzero(res.status == STATUS_SPIKE))
+            resets[i, j] = int(np.count_nonzero(res.status == STATUS_RESET))
+            heals[i, j] = int(np.count_nonzero(res.status == STATUS_HEALED))
+
+    recommended = None
+    reason = None
+    if pos.shape[0] or floor is not None:
+        target = 0.0
+        reason = REASON_QUANTILE
+        if pos.shape[0]:
+            target = RECOMMEND_MARGIN * float(np.quantile(pos, RECOMMEND_QUANTILE))
+        if floor is not None and floor > target:
+            target = floor
+            reason = REASON_POWER_FLOOR
+        above = fwd[fwd >= target]
+        if above.shape[0]:
+            recommended = float(above[0])
+        else:
+            recommended = float(fwd[-1])
+            reason = REASON_LARGEST
+
+    return SweepResult(
+        forward=fwd,
+        backward=bwd,
+        accepted_kwh=accepted,
+        rejected_kwh=np.maximum(growth - accepted, 0.0),
+        spikes=spikes,
+        resets=resets,
+        heals=heals,
+        samples=int(raw.shape[0]),
+        recommended_forward=recommended,
+        recommendation_reason=reason,
+        report_interval_s=interval,
+        floor_kwh=floor,
+    )
+
+
+def _load_raw_series(
+    hass: HomeAssistant,
+    entity_id: str,
+    start: datetime,
+    end: datetime,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Executor job: one history read, straight into (timestamp, raw) arrays."""
+    from homeassistant.components.recorder import history
+
+    states = history.state_changes_during_period(
+        hass,
+        start,
+        end,
+        entity_id,
+        no_attributes=True,
+        include_start_time_state=True,
+    ).get(entity_id, [])
+
+    when = np.empty(len(states), dtype=np.float64)
+    out = np.empty(len(states), dtype=np.float64)
+    for i, state in enumerate(states):
+        when[i] = state.last_updated_timestamp
+        try:
+            out[i] = float(state.state)
+        except (TypeError, ValueError):
+            out[i] = np.nan
+    return when, out
+
+
+async def async_tune_device(
+    hass: HomeAssistant,
+    raw_entity_id: str,
+    start: datetime,
+    end: datetime,
+    forward_candidates: Sequence[float],
+    backward_candidates: Sequence[float],
+    max_power_kw: float | None = None,
+    power_check: bool = True,
+    reject_run_limit: int = DEFAULT_REJECT_RUN_LIMIT,
+    power_tolerance: float = DEFAULT_POWER_TOLERANCE,
+    energy_resolution_kwh: float = DEFAULT_ENERGY_RESOLUTION_KWH,
+) -> SweepResult:
+    """Load a device's raw history once and sweep the whole grid on it."""
+    from homeassistant.components.recorder import get_instance
+
+    recorder = get_instance(hass)
+    timestamp, raw = await recorder.async_add_executor_job(
+        _load_raw_series, hass, raw_entity_id, start, end
+    )
+    return await hass.async_add_executor_job(
+        sweep_thresholds,
+        raw,
+        forward_candidates,
+        backward_candidates,
+        timestamp,
+        max_power_kw,
+        power_check,
+        reject_run_limit,
+        power_tolerance,
+        energy_resolution_kwh,
+    )
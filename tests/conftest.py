@@ -0,0 +1,22 @@
+"""Make the integration's plain-Python modules importable without Home Assistant.
+
+``custom_components/zen15_cleaner/__init__.py`` imports Home Assistant, but
+the filter engine, estimators, replay and correlation modules do not. The
+package is registered here under its own name with only its search path,
+so ``from zen15_cleaner import engine`` loads those modules (and their
+relative imports) without running the integration's ``__init__``.
+"""
+from __future__ import annotations
+
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "zen15_cleaner"
+
+if "zen15_cleaner" not in sys.modules:
+    _spec = importlib.machinery.ModuleSpec("zen15_cleaner", None, is_package=True)
+    _spec.submodule_search_locations = [str(PACKAGE_DIR)]
+    _package = importlib.util.module_from_spec(_spec)
+    sys.modules["zen15_cleaner"] = _package
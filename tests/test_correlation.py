@@ -0,0 +1,146 @@
+"""Correlated glitches: what the per-device gates hold, confirm and drop."""
+from __future__ import annotations
+
+import pytest
+
+from zen15_cleaner.correlation import Zen15GlitchGate, Zen15GlitchMonitor
+from zen15_cleaner.engine import STATUS_RESET, Zen15FilterState
+
+FORWARD_KWH = 10.0
+BACKWARD_KWH = 0.01
+
+
+def _fleet(size=6, min_devices=5):
+    monitor = Zen15GlitchMonitor()
+    monitor.configure(True, min_devices, window_s=30.0, quarantine_s=120.0)
+    devices = []
+    for i in range(size):
+        flt = Zen15FilterState(FORWARD_KWH, 0.0, 12)
+        flt.feed(100.0, 0.0)
+        devices.append((Zen15GlitchGate(monitor, f"dev{i}"), flt))
+    return monitor, devices
+
+
+def _apply(gate, flt, raw, ts):
+    """What ``_apply_raw_state`` does with one reading; the statuses fed."""
+    samples = gate.screen(
+        raw,
+        ts,
+        flt.last_raw_value,
+        flt.forward_threshold_kwh,
+        flt.effective_forward_kwh,
+        BACKWARD_KWH,
+    )
+    return [flt.feed(*sample).status for sample in samples]
+
+
+def test_fleet_drop_to_zero_is_dropped_on_every_device():
+    monitor, devices = _fleet()
+    # The controller restarts: every plug reports 0 within a few seconds
+    for i, (gate, flt) in enumerate(devices):
+        _apply(gate, flt, 0.0, 1000.0 + i)
+    assert monitor.quarantines == 1
+    # Back to the real meter reading, still inside the quarantine
+    for i, (gate, flt) in enumerate(devices):
+        _apply(gate, flt, 100.05, 1060.0 + i)
+    # And the next regular report after it
+    statuses = []
+    for i, (gate, flt) in enumerate(devices):
+        statuses += _apply(gate, flt, 100.3, 1300.0 + i)
+
+    assert STATUS_RESET not in statuses
+    for gate, flt in devices:
+        assert gate.held is None
+        assert flt.virtual_total == pytest.approx(0.3)
+    assert monitor.confirmed == len(devices)
+    assert monitor.dropped == 0
+
+
+def test_drop_to_zero_that_recovers_after_quarantine_is_dropped():
+    monitor, devices = _fleet()
+    for i, (gate, flt) in enumerate(devices):
+        _apply(gate, flt, 0.0, 1000.0 + i)
+    # The first reading after the quarantine is back above the old value:
+    # the held 0 is not between the two and must not be fed as a reset
+    statuses = []
+    for i, (gate, flt) in enumerate(devices):
+        statuses += _apply(gate, flt, 100.3, 1300.0 + i)
+
+    assert STATUS_RESET not in statuses
+    for gate, flt in devices:
+        assert flt.virtual_total == pytest.approx(0.3)
+    assert monitor.dropped == len(devices)
+    assert monitor.confirmed == 0
+
+
+def test_first_devices_are_held_before_the_window_trips():
+    monitor, devices = _fleet()
+    (first_gate, first), (second_gate, second) = devices[0], devices[1]
+    # Under the spike limit, so the engine alone would accept it
+    jump = 0.8 * FORWARD_KWH
+    _apply(first_gate, first, 100.0 + jump, 1000.0)
+    _apply(second_gate, second, 100.0 + jump, 1001.0)
+    assert not monitor.quarantined(1001.0)
+    assert first_gate.held is not None
+    assert first.virtual_total == 0.0
+
+    # Enough other devices follow: the window trips with the first two held
+    for i, (gate, flt) in enumerate(devices[2:]):
+        _apply(gate, flt, 100.0 + jump, 1002.0 + i)
+    assert monitor.quarantined(1010.0)
+
+    # The meters come back to where they were
+    for i, (gate, flt) in enumerate(devices):
+        _apply(gate, flt, 100.2, 1300.0 + i)
+    for gate, flt in devices:
+        assert flt.virtual_total == pytest.approx(0.2)
+    assert monitor.dropped == len(devices)
+
+
+def test_isolated_event_is_released_to_the_filter():
+    monitor, devices = _fleet()
+    gate, flt = devices[0]
+    # A genuine meter reset on one plug; nobody else jumps
+    _apply(gate, flt, 0.0, 1000.0)
+    assert gate.held is not None
+    assert _apply(gate, flt, 0.1, 1010.0) == []  # still inside the window
+    statuses = _apply(gate, flt, 0.2, 1100.0)
+
+    assert monitor.quarantines == 0
+    assert monitor.released == 1
+    assert gate.held is None
+    assert statuses[0] == STATUS_RESET
+    assert flt.last_raw_value == pytest.approx(0.2)
+
+
+def test_disabling_releases_the_held_reading():
+    monitor, devices = _fleet()
+    gate, flt = devices[0]
+    _apply(gate, flt, 106.0, 1000.0)
+    assert gate.held is not None
+
+    monitor.configure(False)
+    _apply(gate, flt, 106.1, 1010.0)
+    assert gate.held is None
+    assert flt.virtual_total == pytest.approx(6.1)
+
+
+def test_steady_heavy_loads_never_trip_the_window():
+    monitor = Zen15GlitchMonitor()
+    monitor.configure(True)
+    # Six plugs at 1.2 kW, reporting every 5 minutes, with the power check:
+    # each step is more than half the rated-load limit for the interval
+    devices = []
+    for i in range(6):
+        flt = Zen15FilterState(FORWARD_KWH, 0.0, 12, max_power_kw=1.8)
+        flt.feed(100.0, float(i))
+        devices.append((Zen15GlitchGate(monitor, f"dev{i}"), flt))
+
+    for step in range(1, 25):
+        for i, (gate, flt) in enumerate(devices):
+            _apply(gate, flt, 100.0 + step * 0.1, step * 300.0 + i)
+
+    assert monitor.quarantines == 0
+    assert monitor.held == 0
+    for gate, flt in devices:
+        assert flt.virtual_total == pytest.approx(2.4)
@@ -0,0 +1,131 @@
+"""Filter engine behaviour that the vectorized replay does not cover."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from zen15_cleaner.engine import (
+    FILTER_MODE_ADAPTIVE,
+    FILTER_MODE_HAMPEL,
+    FILTER_MODE_THRESHOLD,
+    STATUS_ACCEPTED,
+    STATUS_HEALED,
+    STATUS_SPIKE,
+    Zen15FilterState,
+    Zen15PowerFilter,
+)
+
+
+def _steady_load_trace(kw=1.5, fast_s=60.0, fast_hours=2, slow_s=1800.0, hours=48):
+    """A constant load, first reported every minute, then every 30 minutes."""
+    out = []
+    t = energy = 0.0
+    while t < fast_hours * 3600:
+        out.append((round(energy, 2), t))
+        t += fast_s
+        energy += kw * fast_s / 3600
+    while t <= hours * 3600:
+        out.append((round(energy, 2), t))
+        t += slow_s
+        energy += kw * slow_s / 3600
+    return out
+
+
+def _level_shift_trace(seed=1):
+    """Slow reporting with a jump from 0.2 kW to 1.5 kW, then faster reports."""
+    rnd = random.Random(seed)
+    out = []
+    t = energy = 0.0
+    for kw, hours, step in ((0.2, 24, 1800), (1.5, 24, 1800), (1.2, 12, 60)):
+        end = t + hours * 3600
+        while t < end:
+            out.append((round(energy, 2), t))
+            t += step
+            energy += kw * rnd.uniform(0.9, 1.1) * step / 3600
+    out.append((round(energy, 2), t))
+    return out
+
+
+def _run(mode, trace, max_power_kw=1.8):
+    flt = Zen15FilterState(10.0, 0.0, 12, mode, max_power_kw=max_power_kw)
+    results = [flt.feed(raw, ts) for raw, ts in trace]
+    return flt, results
+
+
+def _count(results, status):
+    return sum(1 for res in results if res.status == status)
+
+
+@pytest.mark.parametrize("mode", [FILTER_MODE_HAMPEL, FILTER_MODE_ADAPTIVE])
+def test_reporting_interval_change_is_not_a_spike(mode):
+    trace = _steady_load_trace()
+    reference, _ = _run(FILTER_MODE_THRESHOLD, trace)
+    flt, results = _run(mode, trace)
+
+    assert _count(results, STATUS_SPIKE) == 0
+    assert _count(results, STATUS_HEALED) == 0
+    assert flt.virtual_total == pytest.approx(reference.virtual_total)
+    assert flt.virtual_total == pytest.approx(trace[-1][0] - trace[0][0])
+
+
+@pytest.mark.parametrize("mode", [FILTER_MODE_HAMPEL, FILTER_MODE_ADAPTIVE])
+def test_heal_teaches_the_new_operating_point(mode):
+    trace = _level_shift_trace()
+    flt, results = _run(mode, trace)
+
+    # One run of spikes at the jump, healed once, then the new level is normal
+    assert _count(results, STATUS_HEALED) == 1
+    healed_at = next(i for i, r in enumerate(results) if r.status == STATUS_HEALED)
+    assert _count(results[healed_at:], STATUS_SPIKE) == 0
+    # Only the step into the new level is lost
+    assert trace[-1][0] - trace[0][0] - flt.virtual_total < 1.0
+
+
+def test_hampel_still_rejects_a_spike():
+    trace = _steady_load_trace(hours=6)
+    raw, ts = trace[-1]
+    # Without the power check, so only the Hampel limit can catch it
+    flt, _ = _run(FILTER_MODE_HAMPEL, trace, max_power_kw=None)
+    total = flt.virtual_total
+
+    assert flt.feed(raw + 2.0, ts + 1800).status == STATUS_SPIKE
+    assert flt.virtual_total == total
+
+
+def test_adaptive_checkpoint_round_trip_and_old_format():
+    flt, _ = _run(FILTER_MODE_ADAPTIVE, _steady_load_trace(hours=24))
+    assert flt.learned_rate_kw is not None
+
+    restored = flt.like()
+    restored.restore_learned(flt.learned_state())
+    assert restored.learned_rate_kw == pytest.approx(flt.learned_rate_kw)
+
+    # Estimators saved as a bare list learned kWh per update: start over
+    old = flt.like()
+    old.restore_learned(flt.delta_quantile.as_list())
+    assert old.learned_rate_kw is None
+
+
+def test_power_filter_follows_a_new_steady_level_at_once():
+    flt = Zen15PowerFilter(max_power_w=2250.0)
+    for watts in (1500.0, 1503.0, 1497.0, 1502.0, 1499.0, 1503.0):
+        flt.feed(watts)
+
+    # Home Assistant sends no further state change while a level holds
+    assert flt.feed(0.0) == STATUS_ACCEPTED
+    assert flt.value == 0.0
+    assert flt.feed(1200.0) == STATUS_ACCEPTED
+    assert flt.value == 1200.0
+
+
+def test_power_filter_drops_implausible_readings():
+    flt = Zen15PowerFilter(max_power_w=2250.0)
+    flt.feed(800.0)
+
+    assert flt.feed(65535.0) == STATUS_SPIKE
+    assert flt.feed(-40.0) == STATUS_SPIKE
+    assert flt.value == 800.0
+    assert flt.spikes == 2
+    assert flt.feed(-0.5) == STATUS_ACCEPTED  # noise around 0 W
+    assert flt.value == 0.0
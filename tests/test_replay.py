@@ -0,0 +1,158 @@
+"""The vectorized replay must match the streaming engine row for row.
+
+The live sensor (``_apply_raw_state``) feeds every numeric raw state into
+``Zen15FilterState.feed``; replay has to reproduce exactly that.
+"""
+from __future__ import annotations
+
+import csv
+
+import numpy as np
+import pytest
+
+from zen15_cleaner import const, replay
+from zen15_cleaner.engine import (
+    STATUS_HEALED,
+    STATUS_RESET,
+    STATUS_SPIKE,
+    Zen15FilterState,
+)
+
+STEP_S = 300.0  # one report every 5 minutes
+KWH_PER_STEP = 0.1  # 1.2 kW load
+
+
+def _synthetic_trace():
+    """Three plugs with spikes, resets, a heal, an implausible jump and gaps."""
+    ids = ["sensor.plug_a", "sensor.plug_b", "sensor.plug_c"]
+    rows: list[tuple[int, float, float]] = []
+
+    # Plug A: single spikes, a meter reset to 0, and unavailable states
+    raw = 100.0
+    for i in range(200):
+        ts = i * STEP_S
+        if i in (20, 90):
+            rows.append((0, ts, raw + 500.0))  # single spike
+            continue
+        if i == 60:
+            raw = 0.0  # meter reset
+        elif i == 120:
+            rows.append((0, ts, float("nan")))  # unavailable
+            continue
+        else:
+            raw += KWH_PER_STEP
+        rows.append((0, ts, raw))
+
+    # Plug B: jumps to a new baseline and stays there (self-heal)
+    raw = 50.0
+    for i in range(200):
+        ts = i * STEP_S
+        raw += KWH_PER_STEP
+        if i == 40:
+            raw += 250.0
+        rows.append((1, ts, raw))
+
+    # Plug C: a jump below the forward threshold but above the rated load,
+    # and a long gap that makes a large delta plausible again
+    raw = 10.0
+    ts = 0.0
+    for i in range(150):
+        ts += STEP_S if i != 100 else 6 * 3600.0
+        if i == 30:
+            rows.append((2, ts, raw + 3.0))
+            continue
+        raw += KWH_PER_STEP if i != 100 else 8.0
+        rows.append((2, ts, raw))
+
+    rng = np.random.default_rng(7)
+    order = rng.permutation(len(rows))  # replay must not rely on input order
+    device = np.array([rows[i][0] for i in order], dtype=np.int32)
+    timestamp = np.array([rows[i][1] for i in order])
+    values = np.array([rows[i][2] for i in order])
+    return ids, device, timestamp, values
+
+
+def _stream(ids, device, timestamp, raw, **kwargs):
+    """Feed rows in time order through one engine per device."""
+    states = {}
+    totals = {}
+    for i in np.lexsort((timestamp, device)):
+        if not np.isfinite(raw[i]):
+            continue
+        code = int(device[i])
+        flt = states.get(code)
+        if flt is None:
+            flt = states[code] = Zen15FilterState(
+                kwargs.get("forward", replay.DEFAULT_FORWARD_THRESHOLD_KWH),
+                replay.DEFAULT_BACKWARD_THRESHOLD_KWH,
+                replay.DEFAULT_REJECT_RUN_LIMIT,
+                max_power_kw=kwargs.get("max_power_kw", replay.DEFAULT_MAX_POWER_KW),
+            )
+        totals[ids[code]] = flt.feed(float(raw[i]), float(timestamp[i])).total
+    return totals
+
+
+@pytest.mark.parametrize("max_power_kw", [replay.DEFAULT_MAX_POWER_KW, None])
+def test_replay_matches_streaming_engine(max_power_kw):
+    ids, device, timestamp, raw = _synthetic_trace()
+    result = replay.replay_arrays(
+        ids, device, timestamp, raw, max_power_kw=max_power_kw
+    )
+
+    assert replay.verify_against_streaming(result, max_power_kw=max_power_kw) == []
+
+    # The trace really exercises every non-trivial path
+    statuses = set(result.status.tolist())
+    assert {STATUS_SPIKE, STATUS_RESET, STATUS_HEALED} <= statuses
+
+    summary = {row["entity_id"]: row for row in result.summary()}
+    expected = _stream(ids, device, timestamp, raw, max_power_kw=max_power_kw)
+    for entity_id, total in expected.items():
+        assert summary[entity_id]["virtual_total_kwh"] == pytest.approx(total)
+
+
+def test_power_check_rejects_implausible_jump():
+    ids, device, timestamp, raw = _synthetic_trace()
+    with_check = replay.replay_arrays(ids, device, timestamp, raw)
+    without = replay.replay_arrays(ids, device, timestamp, raw, max_power_kw=None)
+
+    plug_c = {r["entity_id"]: r for r in with_check.summary()}["sensor.plug_c"]
+    plug_c_off = {r["entity_id"]: r for r in without.summary()}["sensor.plug_c"]
+    # 3 kWh in 5 minutes is a spike at 1.8 kW, but not at a 10 kWh threshold
+    assert plug_c["spikes"] == plug_c_off["spikes"] + 1
+
+
+def test_per_device_forward_threshold():
+    ids, device, timestamp, raw = _synthetic_trace()
+    per_device = {"sensor.plug_c": 1.0}
+    result = replay.replay_arrays(
+        ids, device, timestamp, raw, per_device_forward=per_device
+    )
+    assert replay.verify_against_streaming(result, per_device_forward=per_device) == []
+
+
+def test_power_check_default_matches_the_integration():
+    # The thresholds come from const; the power check is the one default
+    # replay has to mirror, as a rating instead of an on/off option
+    assert const.DEFAULT_POWER_CHECK
+    assert replay.DEFAULT_MAX_POWER_KW == const.MODEL_MAX_POWER_KW["zen15"]
+
+
+def test_cli_verify_with_defaults(tmp_path, capsys):
+    ids, device, timestamp, raw = _synthetic_trace()
+    path = tmp_path / "history.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        out = csv.writer(fh)
+        out.writerow(["entity_id", "state", "last_changed"])
+        for code, ts, value in zip(device, timestamp, raw):
+            state = "unavailable" if np.isnan(value) else repr(float(value))
+            out.writerow([ids[code], state, ts])
+
+    assert replay.main([str(path), "--verify"]) == 0
+
+    rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    expected = _stream(ids, device, timestamp, raw)
+    for row in rows:
+        assert float(row["virtual_total_kwh"]) == pytest.approx(
+            expected[row["entity_id"]]
+        )
@@ -0,0 +1,101 @@
+"""The threshold sweep must count what the streaming engine does."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from zen15_cleaner.engine import (
+    STATUS_HEALED,
+    STATUS_RESET,
+    STATUS_SPIKE,
+    Zen15FilterState,
+)
+from zen15_cleaner.tuning import (
+    REASON_POWER_FLOOR,
+    sweep_thresholds,
+)
+
+STEP_S = 300.0
+FORWARD = (0.05, 0.2, 1.0, 10.0)
+BACKWARD = (0.0, 0.1, 5.0)
+
+
+def _trace():
+    """One plug at 1.2 kW with glitches, a reset, a new baseline and a gap."""
+    raw, ts = 100.0, 0.0
+    out = []
+    for i in range(400):
+        ts += STEP_S if i != 300 else 4 * 3600.0
+        if i in (20, 150):
+            out.append((ts, raw + 500.0))  # single glitch
+            continue
+        if i == 60:
+            out.append((ts, raw - 3.0))  # a glitch downwards
+            continue
+        if i == 100:
+            raw = 0.0  # meter reset
+        elif i == 200:
+            raw += 40.0  # jumps and stays (self-heal)
+        elif i == 300:
+            raw += 4.0  # plausible after the gap
+        else:
+            raw += 0.1
+        if i == 250:
+            out.append((ts, float("nan")))  # unavailable
+            continue
+        out.append((ts, raw))
+    ts, raw = np.array(out).T
+    return ts, raw
+
+
+def _stream(ts, raw, forward, backward, max_power_kw):
+    flt = Zen15FilterState(forward, backward, 12, max_power_kw=max_power_kw)
+    statuses = [
+        flt.feed(float(r), float(t)).status
+        for t, r in zip(ts, raw)
+        if np.isfinite(r)
+    ]
+    return flt.virtual_total, statuses
+
+
+@pytest.mark.parametrize("power_check", [True, False])
+def test_sweep_matches_streaming_engine(power_check):
+    ts, raw = _trace()
+    result = sweep_thresholds(
+        raw, FORWARD, BACKWARD, ts, max_power_kw=1.8, power_check=power_check
+    )
+
+    for i, forward in enumerate(FORWARD):
+        for j, backward in enumerate(BACKWARD):
+            total, statuses = _stream(
+                ts, raw, forward, backward, 1.8 if power_check else None
+            )
+            assert result.accepted_kwh[i, j] == pytest.approx(total)
+            assert result.spikes[i, j] == statuses.count(STATUS_SPIKE)
+            assert result.resets[i, j] == statuses.count(STATUS_RESET)
+            assert result.heals[i, j] == statuses.count(STATUS_HEALED)
+
+
+def test_rejected_glitch_is_not_counted_as_reset():
+    ts, raw = _trace()
+    result = sweep_thresholds(raw, FORWARD, BACKWARD, ts, max_power_kw=1.8)
+    rows = {
+        (row["forward_threshold_kwh"], row["backward_threshold_kwh"]): row
+        for row in result.as_rows()
+    }
+    # The glitches come back to the held baseline: only the real reset and
+    # the downward glitch (below a 0.1 kWh tolerance) are resets
+    assert rows[(1.0, 0.1)]["resets"] == 2
+    assert rows[(1.0, 5.0)]["resets"] == 1
+
+
+def test_recommendation_floor():
+    # An idle-ish plug (0.6 kW) reporting every 5 minutes
+    ts = np.arange(200) * STEP_S
+    raw = 10.0 + np.arange(200) * 0.05
+    result = sweep_thresholds(raw, FORWARD, BACKWARD, ts, max_power_kw=1.8)
+
+    # 1.8 kW * 1.25 over 5 minutes is ~0.2 kWh: above twice the normal step
+    assert result.report_interval_s == STEP_S
+    assert result.recommendation_reason == REASON_POWER_FLOOR
+    assert result.recommended_forward == 0.2